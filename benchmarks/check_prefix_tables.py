@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2016 Institute of Computer Science of the Foundation for Research and Technology - Hellas (FORTH)
+# Authors: Michalis Bamiedakis, Dimitris Mavrommatis and George Nomikos
+#
+# Contact Author: George Nomikos
+# Contact Email: gnomikos [at] ics.forth.gr
+#
+# This file is part of traIXroute.
+#
+# traIXroute is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# traIXroute is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with traIXroute.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+Checks the prefix lookups that replace SubnetTree against SubnetTree, on random sets of nested and adjacent prefixes,
+including /0 and /32 prefixes. The checks are:
+    a) snapshot: The longest prefix match of the prefix tables of the database snapshot (db_snapshot.prefix_table),
+       for the addresses around the boundaries of every prefix and random addresses.
+    b) subnet_tree: The merging of the IXP subprefixes into their prefixes (Subnet_handle.Subnet_tree), which finds
+       the covering prefix of a subprefix by integer comparison, against the same merging with the covering prefixes
+       looked up in a SubnetTree.
+The checks need the SubnetTree module (pysubnettree).
+For example:
+    python3 benchmarks/check_prefix_tables.py --trials 500 --seed 1
+'''
+
+import argparse
+import copy
+import tempfile
+import random
+import shutil
+import sys
+import os
+
+LIBDIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib'))
+sys.path.insert(0, LIBDIR)
+
+import SubnetTree
+from traixroute.handler import db_snapshot, handle_complementary
+from traixroute.controller import string_handler
+
+# The largest IPv4 address in integer format.
+MAX_ADDRESS = 0xffffffff
+# The [IXP long name, IXP short name] pairs of the random IXP prefixes, with similar and empty names.
+IXP_NAMES = [['Amsterdam Internet Exchange', 'AMS-IX'], ['Amsterdam Internet Exchange Hong Kong', 'AMS-IX Hong Kong'],
+             ['Stockholm Open Local Internet Exchange', 'SOLIX'], ['Vienna Internet Exchange', 'VIX'],
+             ['', 'VIX'], ['', ''], ['London Internet Exchange', '']]
+
+
+def random_prefixes(rng, count):
+    '''
+    Generates random IPv4 prefixes, most of them within a small address block so that they are nested or adjacent.
+    Input:
+        a) rng: The random.Random instance.
+        b) count: The number of prefixes.
+    Output:
+        a) A list with the prefixes in Subnet format, or as plain IPs for some /32 prefixes.
+    '''
+
+    base = rng.choice([0, MAX_ADDRESS & ~0xffff, rng.getrandbits(32) & ~0xffff])
+    prefixes = []
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.05:
+            length = 0
+        elif kind < 0.1:
+            length = rng.randint(1, 15)
+        else:
+            length = rng.randint(16, 32)
+        address = base | rng.getrandbits(16) if length >= 16 else rng.getrandbits(32)
+        address &= (MAX_ADDRESS << (32 - length)) & MAX_ADDRESS
+        if length == 32 and rng.random() < 0.5:
+            prefixes.append(string_handler.int2ip(address))
+        else:
+            prefixes.append(string_handler.int2ip(address) + '/' + str(length))
+
+    # Adds the halves, the last address and the adjacent prefix of some prefixes.
+    for prefix in rng.sample(prefixes, len(prefixes) // 4):
+        length = int(prefix.split('/')[1]) if '/' in prefix else 32
+        start = db_snapshot.ip2int(prefix)
+        end = start | (MAX_ADDRESS >> length)
+        if length < 32:
+            prefixes.append(string_handler.int2ip(start) + '/' + str(length + 1))
+            prefixes.append(string_handler.int2ip(start + ((end - start + 1) >> 1)) + '/' + str(length + 1))
+            prefixes.append(string_handler.int2ip(end) + '/32')
+        if length > 0 and end < MAX_ADDRESS:
+            prefixes.append(string_handler.int2ip(end + 1) + '/' + str(length))
+    return prefixes
+
+
+def probe_addresses(rng, prefixes):
+    '''
+    Returns the addresses to look up: the first and last address of every prefix and their neighbours, the
+    lowest and highest addresses and random addresses.
+    Input:
+        a) rng: The random.Random instance.
+        b) prefixes: The list with the prefixes.
+    Output:
+        a) A list with the IP addresses in string format.
+    '''
+
+    addresses = {0, MAX_ADDRESS}
+    for prefix in prefixes:
+        length = int(prefix.split('/')[1]) if '/' in prefix else 32
+        start = db_snapshot.ip2int(prefix)
+        end = start | (MAX_ADDRESS >> length)
+        for address in (start - 1, start, start + 1, end - 1, end, end + 1):
+            if 0 <= address <= MAX_ADDRESS:
+                addresses.add(address)
+    addresses.update(rng.getrandbits(32) for _ in range(len(prefixes)))
+    return [string_handler.int2ip(address) for address in sorted(addresses)]
+
+
+def check_snapshot(rng, trials, count):
+    '''
+    Compares the prefix tables of the snapshot with SubnetTrees holding the same prefixes.
+    Input:
+        a) rng: The random.Random instance.
+        b) trials: The number of random prefix sets.
+        c) count: The maximum number of prefixes per set.
+    Output:
+        a) The number of mismatches.
+    '''
+
+    mismatches = 0
+    folder = tempfile.mkdtemp()
+    try:
+        for trial in range(trials):
+            prefixes = random_prefixes(rng, rng.randint(1, count))
+            table = {prefix: [rng.choice(['a', 'b', 'c']), rng.randint(0, 3)] for prefix in prefixes}
+            tree = SubnetTree.SubnetTree()
+            for prefix in table:
+                tree[prefix] = table[prefix]
+
+            snapshot = db_snapshot.db_snapshot()
+            filename = os.path.join(folder, 'snapshot')
+            snapshot.export_snapshot(filename, {'table': table}, {}, {})
+            if not snapshot.import_snapshot(filename, {}):
+                print('snapshot: trial', trial, 'could not load the snapshot.')
+                return mismatches + 1
+            prefix_table = snapshot.tables['table']
+
+            addresses = probe_addresses(rng, prefixes)
+            positions = prefix_table.find_all(db_snapshot.ip2int_all(addresses))
+            for address, pos in zip(addresses, positions):
+                expected = tree[address] if address in tree else None
+                found = prefix_table[address] if address in prefix_table else None
+                found_all = prefix_table.value(pos) if pos >= 0 else None
+                if expected != found or expected != found_all:
+                    mismatches += 1
+                    if mismatches <= 5:
+                        print('snapshot: trial', trial, 'address', address, 'SubnetTree:', expected,
+                              'prefix_table:', found, 'find_all:', found_all, 'prefixes:', sorted(table))
+            snapshot.close()
+    finally:
+        shutil.rmtree(folder)
+    return mismatches
+
+
+def reference_subnet_tree(Sub, additional_tree, reserved_sub_tree, final_subnet2country):
+    '''
+    Merges the IXP subprefixes into their prefixes as Subnet_handle.Subnet_tree does, visiting the Subnets in network
+    order, but finding whether a Subnet is covered, and by which prefix, with a SubnetTree of the kept prefixes.
+    Input:
+        a) Sub, additional_tree, reserved_sub_tree, final_subnet2country: As for Subnet_handle.Subnet_tree.
+    Output:
+        a) Sub: A dictionary with {Subnet}=[IXP long name,IXP short name] of the kept prefixes.
+    '''
+
+    handle_string = string_handler.string_handler()
+    help_tree = SubnetTree.SubnetTree()
+    for subnet in sorted(Sub, key=lambda subnet: (db_snapshot.ip2int(subnet), int(subnet.split('/')[1]))):
+        if handle_string.sub_prefix_check(subnet, help_tree):
+            prefix = help_tree[subnet]
+            assign_tuple = []
+            for IXP1 in Sub[prefix]:
+                for IXP2 in Sub[subnet]:
+                    assign_tuple = assign_tuple + handle_string.assign_names(IXP1[1], IXP2[1], IXP1[0], IXP2[0])
+            # Deletes the IXP names similar to earlier ones.
+            deleted = set()
+            for i in range(0, len(assign_tuple) - 1):
+                for j in range(i + 1, len(assign_tuple)):
+                    if len(handle_string.assign_names(assign_tuple[i][0], assign_tuple[j][0], assign_tuple[i][1], assign_tuple[j][1])) == 1:
+                        deleted.add(j)
+            for node in sorted(deleted, reverse=True):
+                del assign_tuple[node]
+            Sub[prefix] = assign_tuple
+            Sub.pop(subnet)
+            final_subnet2country.pop(subnet, None)
+        elif handle_string.sub_prefix_check(subnet, additional_tree) or handle_string.sub_prefix_check(subnet, reserved_sub_tree):
+            Sub.pop(subnet)
+            final_subnet2country.pop(subnet, None)
+        else:
+            help_tree[subnet] = subnet
+    return Sub
+
+
+def check_subnet_tree(rng, trials, count):
+    '''
+    Compares Subnet_handle.Subnet_tree with the reference merging of reference_subnet_tree.
+    Input:
+        a) rng: The random.Random instance.
+        b) trials: The number of random prefix sets.
+        c) count: The maximum number of prefixes per set.
+    Output:
+        a) The number of mismatches.
+    '''
+
+    mismatches = 0
+    for trial in range(trials):
+        prefixes = [prefix if '/' in prefix else prefix + '/32' for prefix in random_prefixes(rng, rng.randint(1, count))]
+        Sub = {prefix: rng.sample(IXP_NAMES, rng.randint(1, 2)) for prefix in prefixes}
+        final_subnet2country = {prefix: ['GR', 'Heraklion'] for prefix in prefixes}
+        additional_tree = SubnetTree.SubnetTree()
+        reserved_sub_tree = SubnetTree.SubnetTree()
+        for tree in (additional_tree, reserved_sub_tree):
+            for prefix in rng.sample(prefixes, min(len(prefixes), rng.randint(0, 2))):
+                tree[prefix] = prefix
+
+        expected_cc = copy.deepcopy(final_subnet2country)
+        expected = reference_subnet_tree(copy.deepcopy(Sub), additional_tree, reserved_sub_tree, expected_cc)
+        found_cc = copy.deepcopy(final_subnet2country)
+        [Stree, found, help_tree] = handle_complementary.Subnet_handle().Subnet_tree(
+            copy.deepcopy(Sub), additional_tree, reserved_sub_tree, found_cc)
+
+        # The kept prefixes do not overlap, so each one is its own longest match in the returned trees.
+        consistent = all(Stree[prefix] == found[prefix] and help_tree[prefix] == prefix for prefix in found)
+        if expected != found or expected_cc != found_cc or not consistent:
+            mismatches += 1
+            if mismatches <= 5:
+                print('subnet_tree: trial', trial, 'SubnetTree:', expected, 'Subnet_tree:', found, 'input:', Sub)
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Checks the prefix lookups that replace SubnetTree against SubnetTree.')
+    parser.add_argument('--trials', type=int, default=500, help='The number of random prefix sets per check.')
+    parser.add_argument('--prefixes', type=int, default=40, help='The maximum number of prefixes per set.')
+    parser.add_argument('--seed', type=int, default=1, help='The random seed.')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    failed = False
+    for name, check in [('snapshot', check_snapshot), ('subnet_tree', check_subnet_tree)]:
+        mismatches = check(rng, args.trials, args.prefixes)
+        print(name + ':', mismatches, 'mismatches')
+        failed = failed or mismatches > 0
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
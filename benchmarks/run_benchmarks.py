@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2016 Institute of Computer Science of the Foundation for Research and Technology - Hellas (FORTH)
+# Authors: Michalis Bamiedakis, Dimitris Mavrommatis and George Nomikos
+#
+# Contact Author: George Nomikos
+# Contact Email: gnomikos [at] ics.forth.gr
+#
+# This file is part of traIXroute.
+#
+# traIXroute is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# traIXroute is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with traIXroute.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+Times the hot paths of traIXroute on a synthetic corpus, generated by synthetic_corpus.py from the bundled Default
+database. Each measurement runs in a fresh interpreter with HOME pointing to a scratch folder, so that the user's
+traIXroute folder is not touched and no dataset is downloaded. The measurements are:
+    a) build: Merging the PDB/PCH/RouteViews datasets into the merged database and compiling the snapshot.
+    b) cold_load: Loading the merged .json files when there is no snapshot, which also compiles the snapshot.
+    c) warm_load: Loading the memory-mapped snapshot.
+    d) detection: Resolving the hops and applying the detection rules on all the paths in one thread.
+    e) import_thread, import_process: The end-to-end import mode (traixroute -thread/-process import -json).
+For example:
+    python3 benchmarks/run_benchmarks.py --paths 20000 --repeat 3 --report report.json
+'''
+
+from statistics import median
+import subprocess
+import argparse
+import tempfile
+import shutil
+import json
+import time
+import sys
+import os
+
+import synthetic_corpus
+
+LIBDIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib'))
+# The prefix of the line with the result of a measurement in the output of a child interpreter.
+RESULT = 'BENCHMARK '
+
+
+def load_database(homepath, cores):
+    '''
+    Builds or loads the database of the given traIXroute home folder, as traIXroute does.
+    Input:
+        a) homepath: The traIXroute home folder.
+        b) cores: The number of cores in the config.
+    Output:
+        a) parser: The traixroute_parser instance.
+        b) db_extract: The database instance.
+    '''
+
+    sys.path.insert(0, LIBDIR)
+    from traixroute.controller import traixroute_parser
+    from traixroute.downloader import download_files
+    from traixroute.handler import database_extract, handle_json
+
+    [config, flag] = handle_json.handle_json().import_IXP_dict(homepath + '/configuration/config')
+    if flag:
+        print('Could not read the config file of', homepath)
+        sys.exit(1)
+    config['num_of_cores'] = cores
+    parser = traixroute_parser.traixroute_parser('benchmark')
+    parser.flags['silent'] = True
+    downloader = download_files.download_files(config, homepath)
+    db_extract = database_extract.database(parser, downloader, config, True, synthetic_corpus.LIBPATH)
+    db_extract.dbextract()
+    return parser, db_extract
+
+
+def step_database(homepath, cores):
+    '''
+    Measures the building or the loading of the database, depending on the files left in the home folder.
+    '''
+
+    start = time.perf_counter()
+    load_database(homepath, cores)
+    return {'seconds': time.perf_counter() - start}
+
+
+def step_detection(homepath, cores, corpus, chunk_size=20):
+    '''
+    Measures the per-path detection throughput, i.e., the hop resolution and the detection rules, in one thread.
+    '''
+
+    [parser, db_extract] = load_database(homepath, cores)
+    from traixroute.controller import traixroute_output
+    from traixroute.detector import detection_rules
+    from traixroute.handler import handle_json
+    from traixroute.pathinfo import path_info_extraction
+
+    rules = detection_rules.detection_rules()
+    rules.rules_extract(homepath)
+    json_handle = handle_json.handle_json()
+    with open(corpus) as f:
+        traces = [json_handle.export_trace_from_file(entry)[0] for entry in json.load(f)]
+
+    hits = 0
+    start = time.perf_counter()
+    for pos in range(0, len(traces), chunk_size):
+        chunk = traces[pos:pos + chunk_size]
+        output = traixroute_output.traixroute_output()
+        for ip_path, path_info in zip(chunk, path_info_extraction.extract_paths(db_extract, chunk)):
+            if len(ip_path):
+                hits += sum(rules.resolve_path(ip_path, output, path_info, db_extract, parser))
+    seconds = time.perf_counter() - start
+    return {'seconds': seconds, 'paths': len(traces), 'paths_per_second': len(traces) / seconds, 'rule_hits': hits}
+
+
+def run_child(step, workdir, cores, corpus):
+    '''
+    Runs a measurement in a fresh interpreter.
+    Output:
+        a) The result of the measurement.
+    '''
+
+    command = [sys.executable, os.path.abspath(__file__), '--step', step, '--workdir', workdir, '--cores', str(cores), '--corpus', corpus]
+    completed = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True, env=child_env(workdir))
+    for line in completed.stdout.splitlines():
+        if line.startswith(RESULT):
+            return json.loads(line[len(RESULT):])
+    print(completed.stdout)
+    raise RuntimeError('The ' + step + ' measurement failed.')
+
+
+def run_import(mode, workdir, cores, corpus):
+    '''
+    Measures the end-to-end import mode of traIXroute.
+    '''
+
+    command = [sys.executable, os.path.join(LIBDIR, 'traixroute', 'application.py'), '-' + mode, '-silent', 'import', '-json', corpus]
+    start = time.perf_counter()
+    completed = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True, env=child_env(workdir))
+    seconds = time.perf_counter() - start
+    if completed.returncode or 'Exiting.' in completed.stdout:
+        print(completed.stdout)
+        raise RuntimeError('The import_' + mode + ' measurement failed.')
+    return {'seconds': seconds}
+
+
+def child_env(workdir):
+    '''
+    Returns the environment of the child interpreters, with HOME set to the scratch folder.
+    '''
+
+    env = dict(os.environ)
+    env['HOME'] = workdir
+    env['PYTHONPATH'] = LIBDIR + os.pathsep + env.get('PYTHONPATH', '')
+    return env
+
+
+def set_cores(homepath, cores):
+    '''
+    Sets the number of cores in the config file of the scratch folder, used by the end-to-end measurements.
+    '''
+
+    filename = homepath + '/configuration/config'
+    with open(filename) as f:
+        config = json.load(f)
+    config['num_of_cores'] = cores
+    with open(filename, 'w') as f:
+        json.dump(config, f, indent=4)
+
+
+def remove(filename):
+    if os.path.isdir(filename):
+        shutil.rmtree(filename)
+    elif os.path.exists(filename):
+        os.remove(filename)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Times the hot paths of traIXroute on a synthetic traceroute corpus.')
+    parser.add_argument('--paths', type=int, default=10000, help='The number of traceroute paths of the corpus.')
+    parser.add_argument('--seed', type=int, default=1, help='The random seed of the corpus.')
+    parser.add_argument('--ixp-ratio', type=float, default=0.25, help='The ratio of the paths crossing an IXP.')
+    parser.add_argument('--cores', type=int, default=os.cpu_count(), help='The number of threads or processes of the end-to-end runs.')
+    parser.add_argument('--repeat', type=int, default=3, help='The number of repetitions of each measurement.')
+    parser.add_argument('--skip-import', action='store_true', help='Skips the end-to-end import measurements.')
+    parser.add_argument('--workdir', help='The scratch folder, a temporary folder by default.')
+    parser.add_argument('--report', help='Writes the results to a .json file.')
+    parser.add_argument('--step', help=argparse.SUPPRESS)
+    parser.add_argument('--corpus', help=argparse.SUPPRESS)
+    options = parser.parse_args()
+
+    # A single measurement, in the child interpreter.
+    if options.step:
+        homepath = options.workdir + '/traixroute'
+        if options.step == 'detection':
+            result = step_detection(homepath, options.cores, options.corpus)
+        else:
+            result = step_database(homepath, options.cores)
+        print(RESULT + json.dumps(result))
+        return 0
+
+    # traIXroute exits when the config has more cores than the machine.
+    options.cores = max(1, min(options.cores, os.cpu_count()))
+    workdir = options.workdir or tempfile.mkdtemp(prefix='traixroute-benchmark-')
+    homepath = workdir + '/traixroute'
+    corpus = workdir + '/corpus.json'
+    paths = synthetic_corpus.generate(options.paths, options.seed, options.ixp_ratio, homepath)
+    with open(corpus, 'w') as f:
+        json.dump(paths, f)
+    set_cores(homepath, options.cores)
+    print('Generated', len(paths), 'paths in', workdir)
+
+    merged = homepath + '/database/Merged'
+    results = {}
+
+    def measure(name, prepare, run):
+        samples = []
+        for _ in range(options.repeat):
+            prepare()
+            samples.append(run())
+        results[name] = {'median_seconds': median(sample['seconds'] for sample in samples), 'samples': samples}
+        print('%-16s %10.3f s' % (name, results[name]['median_seconds']))
+
+    def clean_build():
+        remove(merged)
+        remove(homepath + '/lst_mod.txt')
+        os.makedirs(merged)
+
+    def clean_snapshot():
+        remove(merged + '/database.snapshot')
+
+    measure('build', clean_build, lambda: run_child('build', workdir, options.cores, corpus))
+    measure('cold_load', clean_snapshot, lambda: run_child('load', workdir, options.cores, corpus))
+    measure('warm_load', lambda: None, lambda: run_child('load', workdir, options.cores, corpus))
+    measure('detection', lambda: None, lambda: run_child('detection', workdir, options.cores, corpus))
+    print('%-16s %10.0f paths/s' % ('', median(sample['paths_per_second'] for sample in results['detection']['samples'])))
+    if not options.skip_import:
+        for mode in ['thread', 'process']:
+            measure('import_' + mode, lambda: None, lambda: run_import(mode, workdir, options.cores, corpus))
+
+    report = {'paths': options.paths, 'seed': options.seed, 'ixp_ratio': options.ixp_ratio, 'cores': options.cores,
+              'repeat': options.repeat, 'python': sys.version.split()[0], 'results': results}
+    if options.report:
+        with open(options.report, 'w') as f:
+            json.dump(report, f, indent=2)
+        print('The report has been written to', options.report)
+    if not options.workdir:
+        shutil.rmtree(workdir)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
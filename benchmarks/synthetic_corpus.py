@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2016 Institute of Computer Science of the Foundation for Research and Technology - Hellas (FORTH)
+# Authors: Michalis Bamiedakis, Dimitris Mavrommatis and George Nomikos
+#
+# Contact Author: George Nomikos
+# Contact Email: gnomikos [at] ics.forth.gr
+#
+# This file is part of traIXroute.
+#
+# traIXroute is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# traIXroute is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with traIXroute.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+Generates synthetic traceroute corpora in the traIXroute json format from the bundled Default PDB/PCH database.
+
+The IXP IPs and their ASNs are taken from the PCH membership dataset. The missing PDB netixlan dataset is derived from
+the PCH members within the PDB IXP prefixes and a RouteViews Subnet-to-AS file is synthesized for all the member ASes
+and a set of transit ASes. A given ratio of the paths crosses an IXP between two members of the same IXP, e.g.:
+    python3 benchmarks/synthetic_corpus.py --paths 10000 --seed 1 --output corpus.json
+'''
+
+from shutil import copyfile, copytree
+import argparse
+import ipaddress
+import random
+import gzip
+import json
+import sys
+import os
+
+# The bundled Default database and configuration.
+LIBPATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib', 'traixroute')
+DEFAULT_DB = os.path.join(LIBPATH, 'database', 'Default')
+# The first octets of the synthetic RouteViews prefixes, outside any reserved range.
+PUBLIC_OCTETS = [octet for octet in range(11, 223) if octet not in (100, 127, 169, 172, 192, 198, 203)]
+
+
+def load_members(default_db=DEFAULT_DB):
+    '''
+    Loads the IXP members from the PCH membership dataset.
+    Input:
+        a) default_db: The Default database folder.
+    Output:
+        a) members: A dictionary with {IXP Subnet}=[(IXP IP, ASN),...] for the IPv4 IXP IPs inside their Subnet.
+    '''
+
+    members = {}
+    with open(os.path.join(default_db, 'PCH', 'ixp_membership.csv')) as f:
+        next(f)
+        for line in f:
+            fields = [field.strip() for field in line.split(',')]
+            if len(fields) < 4 or not fields[3].isdigit():
+                continue
+            try:
+                subnet = ipaddress.IPv4Network(fields[0], strict=False)
+                ip = ipaddress.IPv4Address(fields[1])
+            except ValueError:
+                continue
+            if ip in subnet and not subnet.is_private:
+                members.setdefault(str(subnet), []).append((str(ip), int(fields[3])))
+    return {subnet: nodes for subnet, nodes in members.items() if len(set(asn for _, asn in nodes)) > 1}
+
+
+def build_netixlan(members, default_db=DEFAULT_DB):
+    '''
+    Derives the PDB netixlan dataset, which is not bundled, from the PCH members within the PDB IXP prefixes.
+    Input:
+        a) members: The IXP members, as returned by load_members.
+        b) default_db: The Default database folder.
+    Output:
+        a) A list with the netixlan entries.
+    '''
+
+    with open(os.path.join(default_db, 'PDB', 'ixpfx.json')) as f:
+        prefixes = json.load(f)['data']
+
+    netixlan = []
+    for node in prefixes:
+        if node.get('protocol') != 'IPv4' or node['prefix'] not in members:
+            continue
+        for ip, asn in members[node['prefix']]:
+            netixlan.append({'ixlan_id': node['ixlan_id'], 'ipaddr4': ip, 'ipaddr6': None, 'asn': asn, 'status': 'ok'})
+    return netixlan
+
+
+def build_routeviews(asns, rng, transit_asns=2000):
+    '''
+    Synthesizes the Subnet-to-AS mappings of the member and transit ASes.
+    Input:
+        a) asns: The ASNs of the IXP members.
+        b) rng: The random.Random instance.
+        c) transit_asns: The number of additional ASes without IXP membership.
+    Output:
+        a) prefixes: A dictionary with {ASN}=[IPv4Network,...].
+        b) transit: A list with the ASNs of the transit ASes.
+    '''
+
+    transit = rng.sample(range(100000, 200000), transit_asns)
+    prefixes = {}
+    octet = 0
+    address = 0
+    for asn in sorted(asns) + transit:
+        for _ in range(rng.randint(1, 3)):
+            length = rng.choice([16, 19, 20, 22, 24])
+            size = 1 << (32 - length)
+            address = (address + size - 1) // size * size
+            if address + size > 1 << 24:
+                octet += 1
+                address = 0
+            network = ipaddress.IPv4Network(((PUBLIC_OCTETS[octet] << 24) + address, length))
+            prefixes.setdefault(asn, []).append(network)
+            address += size
+    return prefixes, transit
+
+
+def random_ip(prefixes, asn, rng):
+    '''
+    Returns a random host IP of an AS.
+    Input:
+        a) prefixes: A dictionary with {ASN}=[IPv4Network,...].
+        b) asn: The ASN.
+        c) rng: The random.Random instance.
+    Output:
+        a) The IP in string format.
+    '''
+
+    network = rng.choice(prefixes[asn])
+    return str(network[rng.randint(1, network.num_addresses - 2)])
+
+
+def build_paths(count, members, prefixes, transit, rng, ixp_ratio=0.25, star_ratio=0.05, min_hops=6, max_hops=20):
+    '''
+    Generates the synthetic traceroute paths.
+    Input:
+        a) count: The number of paths.
+        b) members: The IXP members, as returned by load_members.
+        c) prefixes, transit: The synthetic RouteViews, as returned by build_routeviews.
+        d) rng: The random.Random instance.
+        e) ixp_ratio: The ratio of the paths crossing an IXP.
+        f) star_ratio: The ratio of the unresponsive hops.
+        g) min_hops, max_hops: The range of the path lengths.
+    Output:
+        a) A list with the paths in the traIXroute json format.
+    '''
+
+    subnets = sorted(members)
+    paths = []
+    for number in range(count):
+        length = rng.randint(min_hops, max_hops)
+        hops = []
+        if rng.random() < ixp_ratio:
+            # The near AS, then the IXP IP of the far AS, which is member of the same IXP, then the far AS.
+            nodes = members[rng.choice(subnets)]
+            [ixp_ip, far_asn] = rng.choice(nodes)
+            near_asn = rng.choice([asn for _, asn in nodes if asn != far_asn])
+            crossing = rng.randint(2, length - 3)
+            for i in range(length):
+                if i < crossing:
+                    asn = near_asn if i >= crossing - 2 else rng.choice(transit)
+                    hops.append(random_ip(prefixes, asn, rng))
+                elif i == crossing:
+                    hops.append(ixp_ip)
+                else:
+                    hops.append(random_ip(prefixes, far_asn, rng))
+        else:
+            path_asns = [rng.choice(transit) for _ in range(rng.randint(2, 5))]
+            hops = [random_ip(prefixes, path_asns[i * len(path_asns) // length], rng) for i in range(length)]
+
+        result = {}
+        for i, hop in enumerate(hops):
+            if rng.random() < star_ratio and i != len(hops) - 1:
+                hop = '*'
+            result['hop' + str(i)] = {'from': hop, 'info': ''}
+        paths.append({'id': number, 'src': '-', 'dst': hops[-1], 'info': 'synthetic', 'result': result})
+    return paths
+
+
+def prepare_home(homepath, members, prefixes, default_db=DEFAULT_DB):
+    '''
+    Creates a traIXroute home folder with the Default PDB/PCH datasets, the derived netixlan dataset and the
+    synthetic RouteViews file, so that traIXroute does not download any dataset.
+    Input:
+        a) homepath: The traIXroute home folder, e.g., $HOME/traixroute.
+        b) members: The IXP members, as returned by load_members.
+        c) prefixes: The synthetic RouteViews, as returned by build_routeviews.
+        d) default_db: The Default database folder.
+    '''
+
+    for folder in ['PCH', 'PDB', 'RouteViews', 'Merged']:
+        os.makedirs(os.path.join(homepath, 'database', folder), exist_ok=True)
+    os.makedirs(os.path.join(homepath, 'output'), exist_ok=True)
+    if not os.path.exists(os.path.join(homepath, 'configuration')):
+        copytree(os.path.join(LIBPATH, 'configuration'), os.path.join(homepath, 'configuration'))
+
+    for filename in ['ixp_membership.csv', 'ixp_subnets.csv', 'ixp_exchange.csv']:
+        copyfile(os.path.join(default_db, 'PCH', filename), os.path.join(homepath, 'database', 'PCH', filename))
+    for filename in ['ix.json', 'ixlan.json', 'ixpfx.json']:
+        copyfile(os.path.join(default_db, 'PDB', filename), os.path.join(homepath, 'database', 'PDB', filename))
+    with open(os.path.join(homepath, 'database', 'PDB', 'netixlan.json'), 'w') as f:
+        json.dump({'data': build_netixlan(members, default_db)}, f)
+
+    with gzip.open(os.path.join(homepath, 'database', 'RouteViews', 'routeviews.gz'), 'wt') as f:
+        for asn in prefixes:
+            for network in prefixes[asn]:
+                f.write(str(network.network_address) + '\t' + str(network.prefixlen) + '\t' + str(asn) + '\n')
+
+
+def generate(count, seed, ixp_ratio=0.25, homepath=None):
+    '''
+    Generates a corpus and, optionally, the traIXroute home folder with the matching database.
+    Input:
+        a) count: The number of paths.
+        b) seed: The random seed, so that the same corpus is generated for the same seed.
+        c) ixp_ratio: The ratio of the paths crossing an IXP.
+        d) homepath: The traIXroute home folder to be prepared, None to skip it.
+    Output:
+        a) A list with the paths in the traIXroute json format.
+    '''
+
+    rng = random.Random(seed)
+    members = load_members()
+    asns = {asn for nodes in members.values() for _, asn in nodes}
+    [prefixes, transit] = build_routeviews(asns, rng)
+    if homepath is not None:
+        prepare_home(homepath, members, prefixes)
+    return build_paths(count, members, prefixes, transit, rng, ixp_ratio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generates a synthetic traceroute corpus in the traIXroute json format.')
+    parser.add_argument('--paths', type=int, default=10000, help='The number of traceroute paths.')
+    parser.add_argument('--seed', type=int, default=1, help='The random seed.')
+    parser.add_argument('--ixp-ratio', type=float, default=0.25, help='The ratio of the paths crossing an IXP.')
+    parser.add_argument('--home', help='Also prepares a traIXroute home folder with the matching database.')
+    parser.add_argument('--output', default='corpus.json', help='The output .json file.')
+    options = parser.parse_args()
+
+    paths = generate(options.paths, options.seed, options.ixp_ratio, options.home)
+    with open(options.output, 'w') as f:
+        json.dump(paths, f)
+    print('Generated', len(paths), 'paths to', options.output)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1 +1 @@
-__all__ = ['traixroute']
\ No newline at end of file
+__all__ = ['traixroute', 'api']
\ No newline at end of file
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2016 Institute of Computer Science of the Foundation for Research and Technology - Hellas (FORTH)
+# Authors: Michalis Bamiedakis, Dimitris Mavrommatis and George Nomikos
+#
+# Contact Author: George Nomikos
+# Contact Email: gnomikos [at] ics.forth.gr
+#
+# This file is part of traIXroute.
+#
+# traIXroute is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# traIXroute is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with traIXroute.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+The library API of traIXroute, to detect the IXP crossings of traceroute paths within a Python program. For example:
+    from traixroute.api import Detector
+    detector = Detector.from_database(os.path.expanduser('~/traixroute'))
+    results = detector.detect([['10.0.0.1', '195.66.224.175', '62.115.143.52'], ripe_traceroute])
+
+The detector uses the merged database built by the traixroute command line tool, without updating or merging it.
+It does not print, exit or write any file and raises a ValueError for invalid input.
+'''
+
+from traixroute.controller import traixroute_output, traixroute_parser, traixroute_server
+from traixroute.downloader import download_files
+from traixroute.detector import detection_rules
+from traixroute.handler import database_extract, handle_json
+from traixroute.pathinfo import path_info_extraction
+import os
+
+# The folder of the traIXroute library, with the default configuration.
+LIBPATH = os.path.dirname(os.path.realpath(__file__))
+
+# The databases and the rules loaded by the detectors received from other processes, {homepath}=[db_extract, rules].
+# A multiprocessing pool unpickles the detector with every task, e.g., for pool.map(detector.detect, paths), so each
+# process loads them once.
+loaded_databases = {}
+
+
+class detector():
+    '''
+    Detects the IXP crossings of traceroute paths with the merged database and the detection rules loaded once.
+    The paths are analyzed in the calling thread, so a detector can be shared by many threads. When it is sent to
+    another process, e.g., by multiprocessing, the process loads the database from the same folder once, unless it
+    has been forked with the detector.
+    '''
+
+    def __init__(self, homepath, db_extract, rules, asn=True, rule=True):
+        '''
+        Use detector.from_database to create a detector.
+        Input:
+            a) homepath: The traIXroute home folder with the merged database.
+            b) db_extract: The loaded database instance.
+            c) rules: The loaded detection_rules instance.
+            d) asn: True to include the ASNs of the crossing hops in the results.
+            e) rule: True to include the rule and the assessment of each crossing in the results.
+        '''
+
+        self.homepath = homepath
+        self.db_extract = db_extract
+        self.rules = rules
+        self.asn = asn
+        self.rule = rule
+        # self.traixparser: The flags of the output, as set by the command line arguments for the traixroute tool.
+        self.traixparser = traixroute_parser.traixroute_parser('api')
+        self.traixparser.flags['silent'] = True
+        self.traixparser.flags['outputfile_json'] = True
+        self.traixparser.flags['asn'] = asn
+        self.traixparser.flags['rule'] = rule
+        # self.shared: True if the database is shared with the other detectors of the process received from another process.
+        self.shared = False
+
+    @classmethod
+    def from_database(cls, homepath=None, asn=True, rule=True):
+        '''
+        Loads the merged database and the detection rules of a traIXroute home folder.
+        Input:
+            a) homepath: The traIXroute home folder, ~/traixroute by default. The rules and the config file are taken
+               from its configuration folder, or from the traIXroute library if it has none.
+            b) asn: True to include the ASNs of the crossing hops in the results.
+            c) rule: True to include the rule and the assessment of each crossing in the results.
+        Output:
+            a) The detector instance.
+        '''
+
+        if homepath is None:
+            homepath = os.path.expanduser('~') + '/traixroute'
+        homepath = os.path.abspath(homepath)
+        confpath = homepath if os.path.exists(homepath + '/configuration/config') else LIBPATH
+
+        [config, flag] = handle_json.handle_json().import_IXP_dict(confpath + '/configuration/config')
+        if flag:
+            raise ValueError('Could not read ' + confpath + '/configuration/config.')
+        traixparser = traixroute_parser.traixroute_parser('api')
+        downloader = download_files.download_files(config, homepath)
+        db_extract = database_extract.database(traixparser, downloader, config, True, LIBPATH)
+        if not db_extract.load():
+            raise ValueError('The merged database is missing from ' + homepath + '/database/Merged. Run traixroute to build it.')
+
+        rules = detection_rules.detection_rules()
+        rules.rules_extract(homepath if os.path.exists(homepath + '/configuration/rules.txt') else LIBPATH, True)
+        return cls(homepath, db_extract, rules, asn, rule)
+
+    def __getstate__(self):
+        '''
+        Excludes the database and the rules from the state, which are loaded again by the receiving process.
+        '''
+
+        return {'homepath': self.homepath, 'asn': self.asn, 'rule': self.rule}
+
+    def __setstate__(self, state):
+        homepath = state['homepath']
+        if homepath not in loaded_databases:
+            loaded = detector.from_database(homepath)
+            loaded_databases[homepath] = [loaded.db_extract, loaded.rules]
+        [db_extract, rules] = loaded_databases[homepath]
+        self.__init__(homepath, db_extract, rules, state['asn'], state['rule'])
+        self.shared = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        '''
+        Releases the memory-mapped database snapshot, unless it is shared with other detectors. The detector cannot be
+        used afterwards.
+        '''
+
+        if not self.shared and self.db_extract is not None and self.db_extract.snapshot is not None:
+            self.db_extract.snapshot.close()
+        self.db_extract = None
+
+    def parse(self, path, import_flag=None):
+        '''
+        Extracts the IP path of a traceroute path.
+        Input:
+            a) path: A list with the IPs of the hops, "*" for the unresponsive ones, or a traceroute path in the
+               traIXroute, RIPE Atlas or scamper json format.
+            b) import_flag: The json format, 1 for traIXroute, 2 for RIPE Atlas and 3 for scamper, detected from the
+               path by default.
+        Output:
+            a) A list [IP path, delays, destination, source, info], as returned by the handle_json methods.
+        '''
+
+        if isinstance(path, (list, tuple)):
+            if not all(isinstance(ip, str) for ip in path):
+                raise ValueError('Expected the IPs of the hops as strings.')
+            return [list(path), [''] * len(path), path[-1] if path else '-', '-', '']
+        if not isinstance(path, dict):
+            raise ValueError('Expected a list of IPs or a traceroute path in json format.')
+
+        json_handle = handle_json.handle_json()
+        import_flag = import_flag or traixroute_server.detect_format(path)
+        if import_flag == 2:
+            return list(json_handle.export_trace_from_ripe_file(path, True))
+        if import_flag == 3:
+            return list(json_handle.export_trace_from_scamper(path))
+        return list(json_handle.export_trace_from_file(path))
+
+    def detect(self, paths, import_flag=None):
+        '''
+        Detects the IXP crossings of traceroute paths.
+        Input:
+            a) paths: A list with the traceroute paths, each one a list of IPs or a json object (see parse).
+            b) import_flag: The json format of the paths, detected from each path by default.
+        Output:
+            a) A list with the results of the paths, in the json output format of traIXroute, i.e., a dictionary with
+               the hops and their ASNs ("result") and the "ixp_crossings", "possible_ixp_crossings" and "remote_peering"
+               of the path, if any. The RIPE Atlas paths keep their fields.
+        '''
+
+        if self.db_extract is None:
+            raise ValueError('The detector has been closed.')
+        traces = [self.parse(path, import_flag) for path in paths]
+        path_infos = path_info_extraction.extract_paths(self.db_extract, [trace[0] for trace in traces])
+
+        output = traixroute_output.traixroute_output()
+        for path, [ip_path, delays_path, dst_ip, src_ip, info], path_info_extract in zip(paths, traces, path_infos):
+            if len(ip_path):
+                self.rules.resolve_path(ip_path, output, path_info_extract, self.db_extract, self.traixparser)
+                if isinstance(path, dict) and (import_flag or traixroute_server.detect_format(path)) == 2:
+                    # The RIPE Atlas paths are annotated in a copy, to leave the given paths unchanged.
+                    output.buildJsonRipe(dict(path, result=[dict(hop) for hop in path['result']]), path_info_extract.asn_list, self.db_extract)
+                else:
+                    output.buildJson(ip_path, delays_path, dst_ip, src_ip, path_info_extract.asn_list)
+            output.flush(self.traixparser)
+        return output.json_obj
+
+    def detect_path(self, path, import_flag=None):
+        '''
+        Detects the IXP crossings of a traceroute path.
+        Input:
+            a) path: The traceroute path, a list of IPs or a json object (see parse).
+            b) import_flag: The json format of the path, detected from the path by default.
+        Output:
+            a) The result of the path, see detect.
+        '''
+
+        return self.detect([path], import_flag)[0]
+
+
+# The name of the detector in the library API.
+Detector = detector
@@ -24,7 +24,6 @@ from traixroute.handler     import database_extract, handle_ripe, handle_json
 from distutils.dir_util     import copy_tree
 from shutil                 import copyfile
 from multiprocessing        import cpu_count
-from multiprocessing        import Manager
 from traixroute.tracetools  import *
 from traixroute.pathinfo    import *
 from traixroute.downloader  import *
@@ -43,6 +42,36 @@ import threading
 import math
 import xmlrpc.client
 import resource
+import multiprocessing
+import gc
+import signal
+
+# The read-only database shared with the worker processes. It is set by the parent
+# right before the process pool is created, so that forked workers inherit it
+# through copy-on-write memory instead of rebuilding it.
+shared_database = None
+# The traIXroute instance of a worker process. It is installed once per worker when the process
+# pool starts, so that only the entries of each chunk are sent with its task.
+worker_traixroute = None
+
+
+def install_worker(traixroute_module):
+    '''
+    Installs the traIXroute instance, with the flags and the detection rules, of a worker process.
+    Input:
+        a) traixroute_module: The traIXroute instance of the parent.
+    '''
+
+    global worker_traixroute
+    worker_traixroute = traixroute_module
+
+
+def analyze_chunk(entries, import_flag=None):
+    '''
+    Analyzes a chunk of traceroute paths or destinations in a worker process, see traIXroute.analyze_measurement.
+    '''
+
+    return worker_traixroute.analyze_measurement(entries, import_flag)
 
 
 class traIXroute():
@@ -62,82 +91,165 @@ class traIXroute():
         self.libpath        = None
         self.import_flag    = None
         self.dns_print      = None
-        self.input_list     = None
         self.db_extract     = None
         self.enable_stats   = None
         self.exact_time     = None
         self.ripe           = None
         self.selected_tool  = None
         self.ripe_handle    = None
+        self.profiler       = None
+        self.homepath       = None
+        self.server_pool    = None
+        self.server_lock    = None
         self.traixparser    = traixroute_parser.traixroute_parser(self.version)
         self.detection_rules= detection_rules.detection_rules()
         self.json_handle    = handle_json.handle_json()
 
-    def analyze_measurement(self, indexes):
+    def __getstate__(self):
+        '''
+        Excludes the database from the state sent to the worker processes. Workers
+        use the forked copy of the parent's database instead.
+        '''
+
+        state = self.__dict__.copy()
+        state['db_extract'] = None
+        state['profiler'] = None
+        state['server_pool'] = None
+        state['server_lock'] = None
+        return state
+
+    def get_database(self):
+        '''
+        Returns the database instance of the current thread or process.
+        In process mode, the database built by the parent is inherited through fork. If the
+        workers have not been forked (e.g., spawn start method or the workers of the server), the merged
+        database is loaded once per worker.
+        Output:
+            a) The database instance.
+        '''
+
+        global shared_database
+
+        if self.db_extract is not None:
+            return self.db_extract
+        if shared_database is None:
+            shared_database = database_extract.database(self.traixparser, self.downloader, self.config, self.outcome, self.libpath)
+            if not shared_database.load():
+                print('traIXroute process with id', os.getpid(),'is building the database.')
+                shared_database.dbextract()
+        return shared_database
+
+    def analyze_measurement(self, entries, import_flag=None, db_extract=None, rules=None):
+        '''
+        Analyzes a chunk of traceroute paths or destinations.
+        Input:
+            a) entries: A list with the traceroute paths or the destinations to be probed.
+            b) import_flag: The format of the imported traceroute paths, self.import_flag by default.
+            c) db_extract, rules: The database and the detection rules, the loaded ones by default. The server passes
+               the ones loaded when a request started, since they may be replaced while the request is analyzed.
+        Output:
+            a) rule_hits: The number of hits of each rule in the chunk.
+            b) json_obj, txt_obj: The results in json and raw txt format.
+            c) record: The profiling records of the chunk, None if profiling is disabled.
+            d) dns_answers: The DNS answers of the chunk, None if -dns is disabled.
+        '''
 
         json_handle_local = handle_json.handle_json()
         output = traixroute_output.traixroute_output()
+        if db_extract is None:
+            db_extract = self.get_database()
+        if rules is None:
+            rules = self.detection_rules
+        rule_hits = [0] * len(rules.rules)
+        if import_flag is None:
+            import_flag = self.import_flag
         
-        if self.mode == 'thread':
-            db_extract = self.db_extract
-        else:
-            print('traIXroute process with id', os.getpid(),'has just started.')
-            db_extract = database_extract.database(self.traixparser, self.downloader, self.config, self.outcome, self.libpath)
-            db_extract.dbextract()
+        print_dest = self.traixparser.flags['outputfile_txt'] or not self.traixparser.flags['silent']
+
+        # Each worker records the stages of the chunk, which are merged with the results.
+        record = None
+        if self.traixparser.flags['profile']:
+            worker = 'process-' + str(os.getpid()) if self.mode == 'process' else threading.current_thread().name
+            record = profiler.profiler(worker)
+            profiler.activate(record)
+
+        # The traceroute paths of the chunk are extracted first, to resolve all their hops at once.
+        traces = []
+        with profiler.measure('input_parsing'):
+            for entry in entries:
+                if import_flag == 1:
+                    try:
+                        traces.append(json_handle_local.export_trace_from_file(entry))
+                    except ValueError as e:
+                        # The server reports the invalid paths to its clients.
+                        if self.traixparser.flags['server']:
+                            raise
+                        print(str(e), 'Exiting.')
+                        print(entry)
+                        os._exit(0)
+                elif import_flag == 2:
+                    traces.append(json_handle_local.export_trace_from_ripe_file(entry))
+                elif import_flag == 3:
+                    traces.append(json_handle_local.export_trace_from_scamper(entry))
+                elif self.ripe == 1:
+                    [src_ip, dst_ip, ip_path, delays_path] = self.ripe_handle.return_path(entry)
+                    traces.append([ip_path, delays_path, dst_ip, src_ip, None])
+                else:
+                    # The destinations have already been probed by the probe scheduler.
+                    [dst_ip, ip_path, delays_path] = entry
+                    traces.append([ip_path, delays_path, dst_ip, '', None])
+        with profiler.measure('path_info_extraction'):
+            path_infos = iter(path_info_extraction.extract_paths(db_extract, [trace[0] for trace in traces]))
+
+        # The IPs of the chunk are resolved concurrently, before they are printed.
+        if self.dns_print and print_dest:
+            with profiler.measure('dns'):
+                ips = [ip for trace in traces for ip in trace[0]]
+                ips += [trace[3] for trace in traces if trace[3]]
+                ips += [trace[2] for trace in traces if string_handler.ip_pattern.fullmatch(trace[2] or '')]
+                dns_resolver.resolver().resolve(ips)
         
-        for index,entry in enumerate(self.input_list[indexes[0]:indexes[1]]):
+        for index, entry in enumerate(entries):
             
-            if self.import_flag == 1:
-                [ip_path, delays_path, dst_ip, src_ip,
-                    info] = json_handle_local.export_trace_from_file(entry)
-                if self.traixparser.flags['outputfile_txt'] or not self.traixparser.flags['silent']:
-                    output.print_traIXroute_dest(self.traixparser, db_extract, self.dns_print, dst_ip, src_ip, info)
-            elif self.import_flag == 2:
-                [ip_path, delays_path, dst_ip, src_ip,
-                    info] = json_handle_local.export_trace_from_ripe_file(entry)
-                if self.traixparser.flags['outputfile_txt'] or not self.traixparser.flags['silent']:
-                    output.print_traIXroute_dest(self.traixparser, db_extract, self.dns_print, dst_ip, src_ip, info)
-            elif self.ripe == 1:
-                [src_ip, dst_ip, ip_path,
-                    delays_path] = self.ripe_handle.return_path(entry)
-                if self.traixparser.flags['outputfile_txt'] or not self.traixparser.flags['silent']:
-                    output.print_traIXroute_dest(self.traixparser, db_extract, self.dns_print, dst_ip, src_ip)
-            else:
-                src_ip = ''
-                dst_ip = entry.replace(' ', '')
-                myinput = trace_tool.trace_tool()
-                
-                if self.traixparser.flags['outputfile_txt'] or not self.traixparser.flags['silent']:
-                    output.print_traIXroute_dest(self.traixparser, db_extract, self.dns_print, dst_ip)
-                [ip_path, delays_path] = myinput.trace_call(
-                    dst_ip, self.selected_tool, self.arguments)
+            [ip_path, delays_path, dst_ip, src_ip, info] = traces[index]
+            path_info_extract = next(path_infos)
+            if print_dest:
+                with profiler.measure('print_path'):
+                    if import_flag:
+                        output.print_traIXroute_dest(self.traixparser, db_extract, self.dns_print, dst_ip, src_ip, info)
+                    elif self.ripe == 1:
+                        output.print_traIXroute_dest(self.traixparser, db_extract, self.dns_print, dst_ip, src_ip)
+                    else:
+                        output.print_traIXroute_dest(self.traixparser, db_extract, self.dns_print, dst_ip)
 
             if len(ip_path):
-                # IP path info extraction and print.
-                path_info_extract = path_info_extraction.path_info_extraction()
-                path_info_extract.path_info_extraction(db_extract, ip_path)
-                
-                if self.traixparser.flags['outputfile_txt'] or not self.traixparser.flags['silent']:
-                    output.print_path_info(ip_path, delays_path, path_info_extract, self.traixparser)
+                # IP path info print.
+                if print_dest:
+                    with profiler.measure('print_path'):
+                        output.print_path_info(ip_path, delays_path, path_info_extract, self.traixparser)
                     
-                rule_hits = self.detection_rules.resolve_path(ip_path, output, path_info_extract, db_extract, self.traixparser)
+                with profiler.measure('detection_rules'):
+                    path_rule_hits = rules.resolve_path(ip_path, output, path_info_extract, db_extract, self.traixparser)
+                rule_hits = [x + y for x, y in zip(rule_hits, path_rule_hits)]
                  
-                if self.import_flag == 2 or self.ripe == 1:
-                    output.buildJsonRipe(entry, path_info_extract.asn_list, db_extract)
-                else:
-                    output.buildJson(
-                        ip_path, delays_path, dst_ip, src_ip, path_info_extract.asn_list)
-            else:
-                rule_hits = [0] * len(self.detection_rules.rules)
+                with profiler.measure('output_serialization'):
+                    if import_flag == 2 or self.ripe == 1:
+                        output.buildJsonRipe(entry, path_info_extract.asn_list, db_extract)
+                    else:
+                        output.buildJson(
+                            ip_path, delays_path, dst_ip, src_ip, path_info_extract.asn_list)
             
-            output.flush(self.traixparser)
+            with profiler.measure('output_serialization'):
+                output.flush(self.traixparser)
         
-        # Empty database instance.
-        if self.mode == 'process':
-            db_extract.clean()
-            del db_extract
-        
-        return [rule_hits, output.json_obj, output.txt_obj]
+        if record is not None:
+            profiler.activate(None)
+            record.count('chunks')
+            record.count('paths', len(entries))
+            record = record.data()
+        # The new DNS answers of a worker process are cached by the main process too.
+        dns_answers = dns_resolver.resolver().export_fresh() if self.dns_print else None
+        return [rule_hits, output.json_obj, output.txt_obj, record, dns_answers]
 
     def check_version(self):
         pypi = xmlrpc.client.ServerProxy('https://pypi.python.org/pypi')
@@ -168,6 +280,11 @@ class traIXroute():
         self.dns_print      = self.traixparser.flags['dns']
         self.mode           = self.traixparser.flags['mode']
         self.libpath        = os.path.dirname(os.path.realpath(__file__))
+
+        # The stages before the analysis, e.g., the database building, are recorded by the setup profiler.
+        if self.traixparser.flags['profile']:
+            self.profiler = profiler.profiler('setup')
+            profiler.activate(self.profiler)
         
         if '-v' in sys.argv or '--version' in sys.argv:
             self.check_version()
@@ -205,6 +322,8 @@ class traIXroute():
             self.config["num_of_cores"] = cpu_count()
 
         self.downloader = download_files.download_files(self.config, homepath)
+        if self.dns_print:
+            dns_resolver.configure(self.config, homepath)
 
         # Calls the download module if needed.
         check_db = (
@@ -254,46 +373,45 @@ class traIXroute():
 
         # Extract info from the database folder.
         if useTraIXroute or merge_flag:
-            db_extract = database_extract.database(
+            # The database is built once and shared by all the threads or processes.
+            self.db_extract = database_extract.database(
                     self.traixparser, self.downloader, self.config, self.outcome, self.libpath)
-            
-            if self.mode == 'thread':
-                self.db_extract = db_extract
+            with profiler.measure('database'):
                 self.db_extract.dbextract()
-            else:
-                if merge_flag:
-                    db_extract.dbextract()
-                    db_extract.clean()
-                    # To avoid merging again when processes are used.
-                    self.traixparser.flags['merge'] = False
+            # To avoid merging again when processes cannot inherit the database.
+            self.traixparser.flags['merge'] = False
             
         if useTraIXroute:
             # Detection rules import.
-            self.detection_rules.rules_extract(homepath)
-            manager = Manager()
+            with profiler.measure('rules'):
+                self.detection_rules.rules_extract(homepath)
             
             if self.import_flag:
                 # Find all the files in the given directory
                 if import_is_dir:
-                    self.dir_walk(homepath, useTraIXroute, self.arguments, manager, self.traixroute_core)
+                    self.dir_walk(homepath, useTraIXroute, self.arguments, self.traixroute_core)
                 # Analyze the given file.
                 else:
-                    [input_list, flag] = self.json_handle.import_IXP_dict(self.arguments)
-                    if flag:
+                    if not os.path.isfile(self.arguments):
                         print('WARNING:', self.arguments + ' file not found or has invalid json format. Exiting.')
                         sys.exit(0)
-                    self.traixroute_core(homepath, input_list, useTraIXroute, self.arguments, manager)    
+                    input_list = self.stream_input(self.arguments)
+                    self.traixroute_core(homepath, input_list, useTraIXroute, self.arguments)    
             
+            # Case: when the paths are sent to the server.
+            elif self.traixparser.flags['server']:
+                self.serve(homepath)
+
             # Case: when a ripe atlas measurement is fetched to be analyzed.
             elif self.ripe == 1:
                 self.ripe_handle = handle_ripe.handle_ripe(self.config)
                 input_list = self.ripe_handle.get_measurement(self.arguments)
-                self.traixroute_core(homepath, input_list, useTraIXroute, self.arguments, manager)
+                self.traixroute_core(homepath, input_list, useTraIXroute, self.arguments)
             # Case: when a ripe atlas measurement is created and then it is fetched to be analyzed.
             elif self.ripe == 2:
                 self.ripe_handle = handle_ripe.handle_ripe(self.config)
                 input_list = self.ripe_handle.create_measurement(self.arguments)
-                self.traixroute_core(homepath, input_list, useTraIXroute, self.arguments, manager)
+                self.traixroute_core(homepath, input_list, useTraIXroute, self.arguments)
             
             elif inputfile or inputIP:
                 if inputfile:
@@ -304,24 +422,19 @@ class traIXroute():
              
                 input_list = list(filter(('').__ne__, input_list))
                 
-                # Check IP or FQDN format consistency for the given destinations.
-                string_handle = string_handler.string_handler()
-                for inputIP in input_list:
-                    if not string_handle.is_valid_ip_address(inputIP, 'IP', 'CommandLine'):
-                        try:
-                            IP_name = socket.gethostbyname(inputIP)
-                        except:
-                            print(
-                                'Wrong input IP address format.\nExpected an IPv4 format or a valid url.')
-                            sys.exit(0)
-                self.traixroute_core(homepath, input_list, useTraIXroute, self.arguments, manager)
+                # The destinations are probed concurrently and each path is analyzed as soon as its probe completes.
+                scheduler = probe_scheduler.probe_scheduler(self.selected_tool, self.arguments, self.config)
+                input_list = scheduler.probe(input_list, self.traixparser.flags['ordered'])
+                self.traixroute_core(homepath, input_list, useTraIXroute, self.arguments)
         
-        # Empty database. In case of using threads only one database instance is used.       
-        if self.mode == 'thread':
+        # Empty database. Only one database instance is used by all the threads or processes.
+        if self.db_extract is not None:
             self.db_extract.clean()
+        if self.dns_print:
+            dns_resolver.resolver().export_cache()
     
     # Finds all the files in directories and subdirectories when a directory has been given as input.
-    def dir_walk(self, homepath, useTraIXroute, root_path, manager, callback):
+    def dir_walk(self, homepath, useTraIXroute, root_path, callback):
         for filename in sorted(os.listdir(root_path)):
             pathname = os.path.join(root_path, filename)
             mode = os.stat(pathname)[ST_MODE]
@@ -330,60 +443,280 @@ class traIXroute():
                 self.dir_walk(homepath, useTraIXroute, pathname, callback)
             elif S_ISREG(mode):
                 # It's a file
-                [input_list, flag] = self.json_handle.import_IXP_dict(pathname)
-                if flag:
-                    print('WARNING:', pathname + ' file not found or has invalid json format. Exiting.')
-                else:
-                    callback(homepath, input_list, useTraIXroute, pathname, manager)
+                callback(homepath, self.stream_input(pathname), useTraIXroute, pathname)
             else:
                 # Unknown file type
                 print ('WARNING:', 'skipping', pathname)
+
+    def stream_input(self, filename):
+        '''
+        Streams the traceroute paths of a .json or scamper file, so that the analysis starts before the whole file has been read.
+        Input:
+            a) filename: The file with the traceroute paths.
+        Output:
+            a) A generator of the traceroute paths.
+        '''
+
+        try:
+            if self.import_flag == 3:
+                traces = self.json_handle.iter_scamper(filename)
+            else:
+                traces = self.json_handle.iter_traces(filename)
+            for trace in traces:
+                yield trace
+        except (ValueError, OSError, UnicodeDecodeError):
+            print('WARNING:', filename + ' file not found or has invalid json format. Skipping the rest of the file.')
+
+    def split_input(self, input_list, chunk_size):
+        '''
+        Splits the input into chunks, reading only one chunk at a time from the input.
+        Input:
+            a) input_list: A list or an iterator with the traceroute paths or the destinations to be probed.
+            b) chunk_size: The maximum number of entries per chunk.
+        Output:
+            a) A generator of lists with the entries of each chunk.
+        '''
+
+        chunk = []
+        for entry in input_list:
+            chunk.append(entry)
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
     
-    def traixroute_core(self, homepath, input_list, useTraIXroute, arguments, manager):
+    def traixroute_core(self, homepath, input_list, useTraIXroute, arguments):
     
-        json_data = []
-        txt_data  = []
-        num_ips = 0
-        if self.mode == 'process':
-            self.input_list = manager.list(input_list)
-            del input_list[:], input_list
-        else:
-            self.input_list = input_list
-        
         # Set the starting time
         self.exact_time = datetime.datetime.now().strftime("%Y_%m_%d-%H_%M_%S")
     
         # Stats structure initialization.
-        if self.enable_stats: final_rules_hit = [0] * len(self.detection_rules.rules)
+        self.num_ips = 0
+        if self.enable_stats: self.final_rules_hit = [0] * len(self.detection_rules.rules)
     
         output = traixroute_output.traixroute_output()
         output.print_args(self.selected_tool, useTraIXroute, arguments, self.ripe, self.import_flag)
+        # The results are written to the output files as soon as each chunk has been analyzed.
+        writer = traixroute_output.result_writer(self.traixparser, homepath, arguments, self.exact_time, self.config)
+
+        # The main thread records the reading of the input, e.g., the probes, and the writing of the results.
+        if self.profiler is not None:
+            run_profiler = profiler.profiler('main')
+            run_profiler.merge(self.profiler.data())
+            profiler.activate(run_profiler)
+            input_list = run_profiler.timed(input_list, 'input_reading')
 
-        # Load balancing over Threads or Processes based on the selected mode.
-        size_of_biglist = len(self.input_list)
-        size_of_sublist = math.ceil(max(size_of_biglist,self.config["num_of_cores"])/min(size_of_biglist, self.config["num_of_cores"]))
-        sublisted_data = [[x,x+size_of_sublist] for x in range(0, size_of_biglist, size_of_sublist)]
+        # The input is read lazily, one chunk at a time, to bound the memory usage for large input files.
+        # Small chunks are queued to the workers, which pull the next chunk as soon as they finish one.
+        chunk_size = max(1, self.config.get("chunk_size", 20))
+        # The maximum number of chunks being analyzed or waiting to be written.
+        max_pending = 4 * self.config["num_of_cores"]
+        ordered = self.traixparser.flags['ordered']
+        # futures: A dictionary with {future}=[chunk index, number of entries].
+        futures = {}
+        # finished: A dictionary with {chunk index}=[number of entries, results] waiting to be written.
+        finished = {}
+        next_index = 0
         
-        with concurrent.futures.ProcessPoolExecutor(max_workers=self.config["num_of_cores"]) \
+        # The worker processes analyze the chunks with the traIXroute instance installed when they started.
+        analyze = analyze_chunk if self.mode == 'process' else self.analyze_measurement
+        
+        with profiler.measure('analysis'), \
+        self.process_pool() \
         if self.mode == 'process' else \
         concurrent.futures.ThreadPoolExecutor(max_workers=self.config["num_of_cores"]) \
         as executor:
-            for [rule_hits, json_obj, txt_obj] in executor.map(self.analyze_measurement, sublisted_data):
-                if self.traixparser.flags['outputfile_json']: json_data.append(json_obj)
-                if self.traixparser.flags['outputfile_txt']: txt_data.append(txt_obj)
-                
-                if self.enable_stats: 
-                    final_rules_hit = [x + y for x , y in zip(final_rules_hit, rule_hits)]
-                    num_ips += 1
+            for index, chunk in enumerate(self.split_input(input_list, chunk_size)):
+                futures[executor.submit(analyze, chunk)] = [index, len(chunk)]
+                while futures and (len(futures) + len(finished) >= max_pending):
+                    next_index = self.collect_results(futures, finished, next_index, ordered, writer)
+            while futures:
+                next_index = self.collect_results(futures, finished, next_index, ordered, writer)
         
-        output.export_results_to_files(json_data, txt_data, self.traixparser, homepath, arguments, self.exact_time)
+        with profiler.measure('output_writing'):
+            writer.close()
         
         # Extracting statistics.
-        if self.enable_stats and num_ips>0:
-            output.stats_extract(homepath, num_ips, self.detection_rules.rules, final_rules_hit, self.exact_time, self.traixparser, arguments)
+        if self.enable_stats and self.num_ips>0:
+            output.stats_extract(homepath, self.num_ips, self.detection_rules.rules, self.final_rules_hit, self.exact_time, self.traixparser, arguments)
+
+        if self.profiler is not None:
+            profiler.activate(self.profiler)
+            output.export_profile(homepath, run_profiler.report(self.exact_time), self.exact_time, self.traixparser, arguments)
+
+    def collect_results(self, futures, finished, next_index, ordered, writer):
+        '''
+        Waits for at least one chunk to be analyzed and writes the results of the completed chunks.
+        Input:
+            a) futures: A dictionary with {future}=[chunk index, number of entries] of the submitted chunks.
+            b) finished: A dictionary with {chunk index}=[number of entries, results] of the chunks waiting to be written.
+            c) next_index: The index of the next chunk to be written when the input order is preserved.
+            d) ordered: True to write the results in the input order.
+            e) writer: The result_writer instance.
+        Output:
+            a) The index of the next chunk to be written.
+        '''
+
+        done, _ = concurrent.futures.wait(futures, return_when=concurrent.futures.FIRST_COMPLETED)
+        for future in done:
+            [index, size] = futures.pop(future)
+            finished[index] = [size, future.result()]
+
+        # Without ordering, the chunks are written as soon as they are completed.
+        indexes = sorted(finished) if not ordered else []
+        while ordered and next_index in finished:
+            indexes.append(next_index)
+            next_index += 1
+
+        for index in indexes:
+            [size, [rule_hits, json_obj, txt_obj, record, dns_answers]] = finished.pop(index)
+            with profiler.measure('output_writing'):
+                writer.write(json_obj, txt_obj)
+            if record is not None:
+                profiler.current().merge(record)
+            if dns_answers:
+                dns_resolver.resolver().merge(dns_answers)
+            if self.enable_stats:
+                self.final_rules_hit = [x + y for x , y in zip(self.final_rules_hit, rule_hits)]
+                self.num_ips += size
+        return next_index
         
-        del self.input_list[:], json_data[:], txt_data[:]
+    def process_pool(self, server=False):
+        '''
+        Creates the pool of processes sharing the parent's database through fork.
+        The workers of the server are started by a fork server instead, since the server starts them from its request
+        and reload threads, whose locks would be copied by fork. They load the merged database once, read-only.
+        Input:
+            a) server: True for the pool of the server.
+        Output:
+            a) The ProcessPoolExecutor instance.
+        '''
+
+        global shared_database, worker_traixroute
+
+        kwargs = {}
+        if server:
+            if sys.version_info >= (3, 7):
+                start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+                kwargs['mp_context'] = multiprocessing.get_context(start_method)
+        else:
+            shared_database = self.db_extract
+            worker_traixroute = self
+            if sys.version_info >= (3, 7) and 'fork' in multiprocessing.get_all_start_methods():
+                kwargs['mp_context'] = multiprocessing.get_context('fork')
+            # Moves the database objects to the permanent generation to avoid
+            # touching their pages, and thus copying them, during garbage collection.
+            # The objects frozen for a previous pool, e.g., for the previous file of a directory, are collected first.
+            if hasattr(gc, 'freeze'):
+                gc.unfreeze()
+                gc.collect()
+                gc.freeze()
+        # The forked workers inherit the instance, the others receive it once when they start.
+        if sys.version_info >= (3, 7):
+            kwargs['initializer'] = install_worker
+            kwargs['initargs'] = (self,)
+        return concurrent.futures.ProcessPoolExecutor(max_workers=self.config["num_of_cores"], **kwargs)
         
+    def serve(self, homepath):
+        '''
+        Serves the IXP detection requests with the loaded database and rules until traIXroute is interrupted.
+        The database is reloaded on POST /reload or on SIGHUP.
+        Input:
+            a) homepath: The traIXroute home folder.
+        '''
+
+        self.homepath = homepath
+        self.server_lock = threading.Lock()
+        self.server_pool = self.process_pool(True) if self.mode == 'process' else \
+            concurrent.futures.ThreadPoolExecutor(max_workers=self.config["num_of_cores"])
+        unix = self.traixparser.flags['server'] == 'unix'
+        address = self.arguments or (homepath + '/traixroute.sock' if unix else '8080')
+        server = traixroute_server.traixroute_server(self.analyze_paths, self.reload_database, address, unix, self.traixparser.flags['server_log'])
+        try:
+            server.start()
+        except (OSError, ValueError) as e:
+            print('Could not listen on', address, '-', e)
+            sys.exit(0)
+
+        def stop(signum, frame):
+            raise KeyboardInterrupt()
+
+        signal.signal(signal.SIGTERM, stop)
+        if hasattr(signal, 'SIGHUP'):
+            signal.signal(signal.SIGHUP, lambda signum, frame: server.reload())
+        print('traIXroute is serving on', ('unix:' if unix else 'http://') + address)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.server_pool.shutdown()
+        print('traIXroute server stopped.')
+
+    def analyze_paths(self, entries, import_flag):
+        '''
+        Analyzes a list of traceroute paths for the server, in chunks analyzed by the threads or processes.
+        Input:
+            a) entries: A list with the traceroute paths in json format.
+            b) import_flag: The format of the paths, 1 for traIXroute, 2 for RIPE Atlas and 3 for scamper json.
+        Output:
+            a) A list with the json output of the paths.
+        '''
+
+        chunk_size = max(1, self.config.get("chunk_size", 20))
+        with self.server_lock:
+            # The chunks of a request are analyzed with the database and the rules loaded when it started. The worker
+            # processes of a pool keep the ones loaded when the pool was created.
+            if self.mode == 'process':
+                futures = [self.server_pool.submit(analyze_chunk, entries[x:x + chunk_size], import_flag)
+                           for x in range(0, len(entries), chunk_size)]
+            else:
+                futures = [self.server_pool.submit(self.analyze_measurement, entries[x:x + chunk_size], import_flag,
+                                                   self.db_extract, self.detection_rules)
+                           for x in range(0, len(entries), chunk_size)]
+        results = []
+        for future in futures:
+            [_, json_obj, _, _, dns_answers] = future.result()
+            results += json_obj
+            if dns_answers:
+                dns_resolver.resolver().merge(dns_answers)
+        return results
+
+    def reload_database(self, update):
+        '''
+        Loads the database and the rules again and replaces the loaded ones. The requests in progress are completed
+        with the database they started with.
+        Input:
+            a) update: True to update the datasets before loading the database.
+        '''
+
+        outcome = self.outcome
+        if update:
+            print('Updating the database...')
+            outcome = self.downloader.start_download()
+            if outcome:
+                print('Database has been updated successfully.')
+            else:
+                print('Database cannot be updated. Reloading the current database.')
+        # The snapshot is replaced atomically, so the memory-mapped snapshot of the loaded database remains valid.
+        db_extract = database_extract.database(self.traixparser, self.downloader, self.config, outcome, self.libpath)
+        db_extract.dbextract()
+        rules = detection_rules.detection_rules()
+        rules.rules_extract(self.homepath)
+
+        with self.server_lock:
+            self.db_extract = db_extract
+            self.detection_rules = rules
+            # New processes are started with the new database, the old ones exit when their chunks are completed.
+            if self.mode == 'process':
+                old_pool = self.server_pool
+                self.server_pool = self.process_pool(True)
+        if self.mode == 'process':
+            old_pool.shutdown(wait=False)
+        print('The database has been reloaded.')
+
+
 def run_traixroute():
     traIXroute_module = traIXroute()
     traIXroute_module.main()
@@ -1 +1 @@
-__all__ = ['string_handler', 'traixroute_output', 'traixroute_parser']
+__all__ = ['string_handler', 'traixroute_output', 'traixroute_parser', 'profiler', 'dns_resolver', 'traixroute_server']
@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2016 Institute of Computer Science of the Foundation for Research and Technology - Hellas (FORTH)
+# Authors: Michalis Bamiedakis, Dimitris Mavrommatis and George Nomikos
+#
+# Contact Author: George Nomikos
+# Contact Email: gnomikos [at] ics.forth.gr
+#
+# This file is part of traIXroute.
+#
+# traIXroute is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# traIXroute is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with traIXroute.  If not, see <http://www.gnu.org/licenses/>.
+
+import concurrent.futures
+import ipaddress
+import threading
+import socket
+import ujson
+import time
+import os
+
+# The resolver shared by all the threads of a process, set by configure.
+shared_resolver = None
+
+
+def configure(config, homepath):
+    '''
+    Creates the resolver shared by all the threads, with the settings of the config file.
+    Input:
+        a) config: The dictionary of the config file.
+        b) homepath: The traIXroute home folder.
+    Output:
+        a) The dns_resolver instance.
+    '''
+
+    global shared_resolver
+
+    cache_file = config.get('dns_cache_file', 'cache/dns.json')
+    zone_file = config.get('dns_zone_file', '')
+    shared_resolver = dns_resolver(
+        workers=config.get('dns_workers', 32),
+        timeout=config.get('dns_timeout', 2),
+        ttl=config.get('dns_cache_ttl', 86400),
+        negative_ttl=config.get('dns_negative_ttl', 3600),
+        cache_file=os.path.join(homepath, cache_file) if cache_file else None)
+    shared_resolver.import_cache()
+    if zone_file:
+        shared_resolver.import_zone(os.path.join(homepath, zone_file))
+    return shared_resolver
+
+
+def resolver():
+    '''
+    Returns the shared resolver, with the default settings and without a persistent cache if it has not been configured.
+    Output:
+        a) The dns_resolver instance.
+    '''
+
+    global shared_resolver
+
+    if shared_resolver is None:
+        shared_resolver = dns_resolver()
+    return shared_resolver
+
+
+def reset_after_fork():
+    if shared_resolver is not None:
+        shared_resolver.reset()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=reset_after_fork)
+
+
+class dns_resolver():
+    '''
+    Resolves IPs to domain names (PTR records) and domain names to IPs for the -dns output.
+    The same routers appear in many paths, so the answers are cached for a TTL, the failures for a shorter TTL.
+    The lookups of a chunk of paths are made concurrently by a pool of threads, waiting for each lookup at most
+    timeout seconds. A lookup that times out is not cached, but its answer is cached if it arrives later. It stays in
+    flight until then, so the later calls wait for it instead of submitting the same lookup again.
+    The PTR records of a zone or PTR dump file, e.g., for offline use, are preferred over the lookups.
+    '''
+
+    def __init__(self, workers=32, timeout=2, ttl=86400, negative_ttl=3600, cache_file=None):
+        # self.workers: The number of concurrent lookups.
+        self.workers = max(1, workers)
+        # self.timeout: The seconds to wait for each lookup.
+        self.timeout = timeout
+        # self.ttl, self.negative_ttl: The seconds an answer or a failure is cached.
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        # self.cache_file: The .json file storing the cached PTR answers between runs, None to disable it.
+        self.cache_file = cache_file
+        # self.ptr: A dictionary with {IP}=[domain name or None, expiration timestamp].
+        self.ptr = {}
+        # self.names: A dictionary with {domain name}=[IP or None, expiration timestamp].
+        self.names = {}
+        # self.zone: A dictionary with {IP}=domain name from the zone or PTR dump file, which do not expire.
+        self.zone = {}
+        # self.fresh: The PTR answers since the last call of export_fresh, to be sent to the main process.
+        self.fresh = {}
+        # self.inflight: A dictionary with {(reverse, IP or domain name)}=the future of its running lookup.
+        self.inflight = {}
+        self.lock = threading.Lock()
+        self.executor = None
+
+    def __getstate__(self):
+        '''
+        Excludes the lock and the thread pool from the state, e.g., when the resolver is sent to a process.
+        '''
+
+        state = self.__dict__.copy()
+        state['lock'] = None
+        state['executor'] = None
+        state['inflight'] = {}
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def reset(self):
+        '''
+        Replaces the lock and the thread pool in a forked process, which does not inherit the threads of its parent.
+        '''
+
+        self.lock = threading.Lock()
+        self.executor = None
+        self.fresh = {}
+        self.inflight = {}
+
+    def pool(self):
+        '''
+        Returns the thread pool of the lookups, created on the first lookup.
+        Output:
+            a) The ThreadPoolExecutor instance.
+        '''
+
+        with self.lock:
+            if self.executor is None:
+                self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.workers)
+            return self.executor
+
+    def lookup_ptr(self, ip):
+        '''
+        Returns the domain name of an IP.
+        Input:
+            a) ip: The IP.
+        Output:
+            a) The domain name, None if the IP cannot be resolved.
+        '''
+
+        try:
+            return socket.gethostbyaddr(ip)[0]
+        except (OSError, UnicodeError):
+            return None
+
+    def lookup_name(self, name):
+        '''
+        Returns the IP of a domain name.
+        Input:
+            a) name: The domain name.
+        Output:
+            a) The IP, None if the domain name cannot be resolved.
+        '''
+
+        try:
+            return socket.gethostbyname(name)
+        except (OSError, UnicodeError):
+            return None
+
+    def cached(self, cache, key, now):
+        '''
+        Returns a cached answer.
+        Input:
+            a) cache: The self.ptr or self.names dictionary.
+            b) key: The IP or the domain name.
+            c) now: The current timestamp.
+        Output:
+            a) A list [answer], [None] for a cached failure, None if the key has not been cached or has expired.
+        '''
+
+        entry = cache.get(key)
+        if entry is None or entry[1] < now:
+            return None
+        return [entry[0]]
+
+    def store(self, cache, key, answer, fresh=False):
+        '''
+        Caches an answer or a failure.
+        Input:
+            a) cache: The self.ptr or self.names dictionary.
+            b) key: The IP or the domain name.
+            c) answer: The answer, None for a failure.
+            d) fresh: True to send the answer to the main process.
+        '''
+
+        entry = [answer, time.time() + (self.ttl if answer is not None else self.negative_ttl)]
+        with self.lock:
+            cache[key] = entry
+            if fresh:
+                self.fresh[key] = entry
+
+    def resolve(self, keys, reverse=True):
+        '''
+        Resolves many IPs or domain names concurrently.
+        Input:
+            a) keys: The IPs, or the domain names if reverse is False.
+            b) reverse: True for PTR lookups, False for name lookups.
+        Output:
+            a) A dictionary with {IP or domain name}=answer, None if it cannot be resolved or timed out.
+        '''
+
+        [cache, lookup] = [self.ptr, self.lookup_ptr] if reverse else [self.names, self.lookup_name]
+        now = time.time()
+        answers = {}
+        missing = []
+        for key in keys:
+            if key in answers or key == '*':
+                continue
+            if reverse and key in self.zone:
+                answers[key] = self.zone[key]
+                continue
+            entry = self.cached(cache, key, now)
+            if entry is not None:
+                answers[key] = entry[0]
+            else:
+                answers[key] = None
+                missing.append(key)
+        if not missing:
+            return answers
+
+        def done(future):
+            if not future.cancelled():
+                self.store(cache, future.key, future.result(), reverse)
+            with self.lock:
+                if self.inflight.get((reverse, future.key)) is future:
+                    del self.inflight[(reverse, future.key)]
+
+        # started: A dictionary with {IP or domain name}=the timestamp its lookup started.
+        started = {}
+
+        def timed_lookup(key):
+            started[key] = time.time()
+            return lookup(key)
+
+        # The lookups already in flight, e.g., timed out in an earlier call, are waited for instead of submitted again.
+        executor = self.pool()
+        futures = []
+        submitted = []
+        with self.lock:
+            for key in missing:
+                future = self.inflight.get((reverse, key))
+                if future is None:
+                    future = executor.submit(timed_lookup, key)
+                    future.key = key
+                    self.inflight[(reverse, key)] = future
+                    submitted.append(future)
+                else:
+                    started.setdefault(key, time.time())
+                futures.append(future)
+        for future in submitted:
+            future.add_done_callback(done)
+        pending = set(futures)
+
+        # Each lookup is waited at most self.timeout seconds after it starts. The lookups waiting for a thread
+        # are bounded by the rounds of self.workers lookups.
+        deadline = time.time() + self.timeout * -(-len(pending) // self.workers)
+        while pending:
+            now = time.time()
+            pending = {future for future in pending if future.key not in started or now - started[future.key] < self.timeout}
+            if not pending or now >= deadline:
+                break
+            expiration = min([started[future.key] + self.timeout for future in pending if future.key in started] + [deadline])
+            _, pending = concurrent.futures.wait(pending, timeout=expiration - now, return_when=concurrent.futures.FIRST_COMPLETED)
+
+        for future in futures:
+            if future.done():
+                answers[future.key] = future.result()
+        return answers
+
+    def reverse(self, ip):
+        '''
+        Returns the domain name of an IP, from the zone file, the cache or a lookup.
+        Input:
+            a) ip: The IP.
+        Output:
+            a) The domain name, None if the IP cannot be resolved.
+        '''
+
+        return self.resolve([ip])[ip]
+
+    def forward(self, name):
+        '''
+        Returns the IP of a domain name, from the cache or a lookup.
+        Input:
+            a) name: The domain name.
+        Output:
+            a) The IP, None if the domain name cannot be resolved.
+        '''
+
+        return self.resolve([name], False)[name]
+
+    def export_fresh(self):
+        '''
+        Returns and clears the PTR answers cached since the last call, to be merged by the main process.
+        Output:
+            a) A dictionary with {IP}=[domain name or None, expiration timestamp].
+        '''
+
+        with self.lock:
+            fresh = self.fresh
+            self.fresh = {}
+        return fresh
+
+    def merge(self, entries):
+        '''
+        Merges the PTR answers of a worker process.
+        Input:
+            a) entries: A dictionary with {IP}=[domain name or None, expiration timestamp].
+        '''
+
+        with self.lock:
+            self.ptr.update(entries)
+
+    def import_zone(self, filename):
+        '''
+        Loads the PTR records of a zone or PTR dump file. The supported lines are:
+            a) "IP domain name", e.g., a hosts file or a PTR dump.
+            b) "4.3.2.1.in-addr.arpa. [TTL] [IN] PTR domain name.", i.e., BIND zone files, with $ORIGIN.
+        Input:
+            a) filename: The zone or PTR dump file.
+        '''
+
+        origin = ''
+        try:
+            with open(filename, 'r') as f:
+                for line in f:
+                    fields = line.split(';')[0].split('#')[0].replace(',', ' ').split()
+                    if len(fields) < 2:
+                        continue
+                    if fields[0].upper() == '$ORIGIN':
+                        origin = fields[1].rstrip('.')
+                        continue
+                    if 'PTR' in (field.upper() for field in fields):
+                        owner = fields[0].rstrip('.') if fields[0].endswith('.') or not origin else fields[0] + '.' + origin
+                        ip = self.arpa2ip(owner)
+                    else:
+                        ip = fields[0]
+                    try:
+                        ip = str(ipaddress.ip_address(ip))
+                    except ValueError:
+                        continue
+                    self.zone[ip] = fields[-1].rstrip('.')
+        except OSError as e:
+            print('Could not import the DNS zone file -', e)
+
+    def arpa2ip(self, owner):
+        '''
+        Converts a reverse DNS name to an IP, e.g., 4.3.2.1.in-addr.arpa to 1.2.3.4.
+        Input:
+            a) owner: The reverse DNS name.
+        Output:
+            a) The IP in string format, '' if the name is not a reverse DNS name.
+        '''
+
+        owner = owner.lower()
+        if owner.endswith('.in-addr.arpa'):
+            return '.'.join(reversed(owner[:-len('.in-addr.arpa')].split('.')))
+        if owner.endswith('.ip6.arpa'):
+            nibbles = ''.join(reversed(owner[:-len('.ip6.arpa')].split('.')))
+            return ':'.join(nibbles[i:i + 4] for i in range(0, len(nibbles), 4))
+        return ''
+
+    def import_cache(self):
+        '''
+        Loads the PTR answers cached by the previous runs, skipping the expired ones.
+        '''
+
+        if self.cache_file is None:
+            return
+        try:
+            with open(self.cache_file, 'r') as f:
+                entries = ujson.load(f)
+        except (OSError, ValueError):
+            return
+
+        now = time.time()
+        with self.lock:
+            for ip, [name, expires] in entries.items():
+                if expires >= now:
+                    self.ptr[ip] = [name, expires]
+
+    def export_cache(self):
+        '''
+        Stores the unexpired PTR answers for the next runs.
+        '''
+
+        if self.cache_file is None:
+            return
+        now = time.time()
+        with self.lock:
+            entries = {ip: entry for ip, entry in self.ptr.items() if entry[1] >= now}
+
+        try:
+            folder = os.path.dirname(self.cache_file)
+            if folder and not os.path.exists(folder):
+                os.makedirs(folder)
+            with open(self.cache_file + '.tmp', 'w') as f:
+                ujson.dump(entries, f)
+            os.replace(self.cache_file + '.tmp', self.cache_file)
+        except OSError as e:
+            print('Could not export the DNS cache -', e)
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2016 Institute of Computer Science of the Foundation for Research and Technology - Hellas (FORTH)
+# Authors: Michalis Bamiedakis, Dimitris Mavrommatis and George Nomikos
+#
+# Contact Author: George Nomikos
+# Contact Email: gnomikos [at] ics.forth.gr
+#
+# This file is part of traIXroute.
+#
+# traIXroute is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# traIXroute is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with traIXroute.  If not, see <http://www.gnu.org/licenses/>.
+
+import threading
+import time
+
+# The profiler of each thread, set only when traIXroute runs with --profile.
+local = threading.local()
+
+
+def current():
+    '''
+    Returns the active profiler of the current thread.
+    Output:
+        a) The profiler instance, None if profiling is disabled.
+    '''
+
+    return getattr(local, 'profiler', None)
+
+
+def activate(record):
+    '''
+    Sets the active profiler of the current thread.
+    Input:
+        a) record: The profiler instance, None to disable profiling.
+    '''
+
+    local.profiler = record
+
+
+def measure(stage):
+    '''
+    Measures a pipeline stage with the active profiler of the current thread, e.g., with profiler.measure('dns'): ...
+    Input:
+        a) stage: The name of the stage.
+    Output:
+        a) A context manager recording the stage, which does nothing if profiling is disabled.
+    '''
+
+    record = current()
+    return record.measure(stage) if record is not None else no_stage
+
+
+class stage_timer():
+    '''
+    Records the wall time and one call of a stage.
+    '''
+
+    def __init__(self, record, stage):
+        self.record = record
+        self.stage = stage
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self.record.add_time(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class null_stage():
+    '''
+    The context manager returned when profiling is disabled.
+    '''
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+no_stage = null_stage()
+
+
+class profiler():
+    '''
+    Records the wall time and the number of calls of each pipeline stage, and the number of fuzzy comparisons and rule
+    evaluations, when traIXroute runs with --profile. Each worker records its own stages, which are merged in the main
+    thread or process along with the results.
+    '''
+
+    def __init__(self, worker='main'):
+        # self.worker: The name of the thread or process the records come from.
+        self.worker = worker
+        # self.stages: A dictionary with {stage}=[wall time in seconds, number of calls].
+        self.stages = {}
+        # self.counters: A dictionary with {counter}=value.
+        self.counters = {}
+        # self.rules: A dictionary with {rule number}=number of evaluations.
+        self.rules = {}
+        # self.workers: A dictionary with {worker}={'stages': ..., 'counters': ...} of the merged records.
+        self.workers = {}
+
+    def measure(self, stage):
+        '''
+        Measures a stage.
+        Input:
+            a) stage: The name of the stage.
+        Output:
+            a) A context manager recording the wall time of the stage.
+        '''
+
+        return stage_timer(self, stage)
+
+    def add_time(self, stage, seconds, calls=1):
+        '''
+        Adds wall time and calls to a stage.
+        Input:
+            a) stage: The name of the stage.
+            b) seconds: The wall time in seconds.
+            c) calls: The number of calls.
+        '''
+
+        record = self.stages.get(stage)
+        if record is None:
+            self.stages[stage] = [seconds, calls]
+        else:
+            record[0] += seconds
+            record[1] += calls
+
+    def count(self, counter, value=1):
+        '''
+        Increases a counter.
+        Input:
+            a) counter: The name of the counter.
+            b) value: The increment.
+        '''
+
+        self.counters[counter] = self.counters.get(counter, 0) + value
+
+    def count_rule(self, rule):
+        '''
+        Increases the evaluations of a rule.
+        Input:
+            a) rule: The index of the rule in the rules list.
+        '''
+
+        self.rules[rule + 1] = self.rules.get(rule + 1, 0) + 1
+
+    def timed(self, iterable, stage):
+        '''
+        Measures the time spent to read each entry of an iterable, e.g., of a lazily parsed input file.
+        Input:
+            a) iterable: The list or the iterator.
+            b) stage: The name of the stage.
+        Output:
+            a) A generator of the entries of the iterable.
+        '''
+
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                entry = next(iterator)
+            except StopIteration:
+                self.add_time(stage, time.perf_counter() - start, 0)
+                return
+            self.add_time(stage, time.perf_counter() - start)
+            yield entry
+
+    def data(self):
+        '''
+        Returns the records in json format, to be sent to the main thread or process.
+        Output:
+            a) A dictionary with the worker name, the stages, the counters and the rule evaluations.
+        '''
+
+        return {'worker': self.worker, 'stages': self.stages, 'counters': self.counters, 'rules': self.rules}
+
+    def merge(self, data):
+        '''
+        Merges the records of a worker.
+        Input:
+            a) data: The records in json format, as returned by data.
+        '''
+
+        worker = self.workers.setdefault(data['worker'], {'stages': {}, 'counters': {}})
+        for stage, [seconds, calls] in data['stages'].items():
+            record = worker['stages'].setdefault(stage, [0, 0])
+            record[0] += seconds
+            record[1] += calls
+        for counter, value in data['counters'].items():
+            worker['counters'][counter] = worker['counters'].get(counter, 0) + value
+        for rule, evaluations in data['rules'].items():
+            self.rules[rule] = self.rules.get(rule, 0) + evaluations
+
+    def report(self, started):
+        '''
+        Builds the profiling report, with the totals of all the workers and the records of each worker.
+        Input:
+            a) started: The starting timestamp of traIXroute.
+        Output:
+            a) A dictionary with the records in json format.
+        '''
+
+        workers = dict(self.workers)
+        workers[self.worker] = {'stages': self.stages, 'counters': self.counters}
+        total_stages = {}
+        total_counters = {}
+        for records in workers.values():
+            for stage, [seconds, calls] in records['stages'].items():
+                record = total_stages.setdefault(stage, [0, 0])
+                record[0] += seconds
+                record[1] += calls
+            for counter, value in records['counters'].items():
+                total_counters[counter] = total_counters.get(counter, 0) + value
+
+        def stages(records):
+            return {stage: {'wall_time': round(seconds, 6), 'calls': calls} for stage, [seconds, calls] in records.items()}
+
+        return {
+            'started': started,
+            'stages': stages(total_stages),
+            'counters': total_counters,
+            'rule_evaluations': {str(rule): self.rules[rule] for rule in sorted(self.rules)},
+            'workers': {worker: {'stages': stages(records['stages']), 'counters': records['counters']}
+                        for worker, records in sorted(workers.items())},
+        }
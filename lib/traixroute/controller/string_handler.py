@@ -20,12 +20,50 @@
 # You should have received a copy of the GNU General Public License
 # along with traIXroute.  If not, see <http://www.gnu.org/licenses/>.
 
+from collections import OrderedDict, Counter
+from functools import lru_cache
+from array import array
 import re
 import socket
 import difflib
 import ipaddress
 import netaddr
+import os
+import threading
+import ujson
 from fuzzywuzzy import fuzz
+from traixroute.controller import profiler
+
+# The maximum number of cached string comparisons.
+CACHE_SIZE = 200000
+# A process-wide LRU cache with {(cleaned string1, cleaned string2, prob_difflib, prob_leven)}=True/False.
+comparison_cache = OrderedDict()
+cache_lock = threading.Lock()
+# The strings which are not modified by the preprocessing of fuzz.
+plain_string = re.compile(r'[a-z0-9]+\Z')
+# Returns the number of occurrences of each character in a string.
+char_counts = lru_cache(maxsize=65536)(Counter)
+# The patterns of extract_ip.
+ip_pattern = re.compile(r'[0-9]+(?:\.[0-9]+){3}')
+subnet_pattern = re.compile(r'[0-9]+(?:\.[0-9]+){3}/[0-9]+')
+# The patterns of parse_ips, capturing the octets and the prefix length of the first IP or Subnet in a string.
+octets_pattern = re.compile(r'(?<![0-9])([0-9]{1,3})\.([0-9]{1,3})\.([0-9]{1,3})\.([0-9]{1,3})(?![0-9])')
+prefix_pattern = re.compile(r'(?<![0-9])([0-9]{1,3})\.([0-9]{1,3})\.([0-9]{1,3})\.([0-9]{1,3})/([0-9]{1,2})(?![0-9])')
+# The network mask of each prefix length.
+netmasks = [(0xffffffff << (32 - length)) & 0xffffffff for length in range(33)]
+
+
+def int2ip(address):
+    '''
+    Converts an IPv4 address from integer to string format.
+    Input:
+        a) address: The IP address in integer format.
+    Output:
+        a) The IP address in string format.
+    '''
+
+    return socket.inet_ntoa(address.to_bytes(4, 'big'))
+
 
 class string_handler():
     '''
@@ -91,13 +129,12 @@ class string_handler():
             if len(temp_string) > 1:
                 temp_string[0] = temp_string[0].strip('.')
                 temp_string[1] = temp_string[1].strip('.')
-                ip = re.findall(
-                    r'[0-9]+(?:\.[0-9]+){3}/[0-9]+', temp_string[0] + '/' + temp_string[1])
+                ip = subnet_pattern.findall(temp_string[0] + '/' + temp_string[1])
                 return ip
             else:
                 return []
         elif kind == 'IP':
-            return re.findall(r'[0-9]+(?:\.[0-9]+){3}', string)
+            return ip_pattern.findall(string)
         else:
             print('Wrong argument type when extracting IP or Subnet.')
 
@@ -135,17 +172,129 @@ class string_handler():
 
         string1 = self.string_removal(string1)
         string2 = self.string_removal(string2)
-        ratio_diff = difflib.SequenceMatcher(None, string1, string2).ratio()
-        ratio_leven = fuzz.WRatio(string1, string2)
         
         if string1 == '' or string2 == '':
             return False
-        
-        if ratio_diff > prob_difflib or ratio_leven > prob_leven:
+
+        record = profiler.current()
+        if record is not None:
+            record.count('string_comparisons')
+
+        # The same pairs of IXP names are compared repeatedly, so the outcome is cached.
+        key = (string1, string2, prob_difflib, prob_leven)
+        with cache_lock:
+            result = comparison_cache.get(key)
+            if result is not None:
+                comparison_cache.move_to_end(key)
+                return result
+
+        if record is not None:
+            record.count('fuzzy_comparisons')
+        result = self.similar_strings(string1, string2, prob_difflib, prob_leven)
+
+        with cache_lock:
+            comparison_cache[key] = result
+            if len(comparison_cache) > CACHE_SIZE:
+                comparison_cache.popitem(last=False)
+        return result
+
+    def similar_strings(self, string1, string2, prob_difflib = 0.80, prob_leven = 74):
+        '''
+        Compares the similarity of two non-empty strings, already cleaned with string_removal.
+        Input:
+            a) string1, string2: The two strings to be compared.
+            b) prob_difflib, prob_leven: The similarity thresholds.
+        Output:
+            a) True if the strings are similar, False otherwise.
+        '''
+
+        if string1 == string2:
+            return 1.0 > prob_difflib or 100 > prob_leven
+        if self.dissimilar_bound(string1, string2, prob_difflib, prob_leven):
+            return False
+        if difflib.SequenceMatcher(None, string1, string2).ratio() > prob_difflib:
             return True
-        else:
+        return fuzz.WRatio(string1, string2) > prob_leven
+
+    def dissimilar_bound(self, string1, string2, prob_difflib, prob_leven):
+        '''
+        Decides cheaply if two strings cannot be similar, based on the number of common characters.
+        Both ratios of difflib and fuzz are at most 2*M/T, where M is the number of matched characters and T the total
+        length, and the partial ratio of fuzz is at most 2*M/(S+M), where S is the length of the shorter string.
+        M cannot exceed the number of common characters of the two strings.
+        Input:
+            a) string1, string2: The two strings to be compared.
+            b) prob_difflib, prob_leven: The similarity thresholds.
+        Output:
+            a) True if the strings are surely not similar, False if they have to be compared.
+        '''
+
+        # fuzz preprocesses the strings, so the bound holds only for already processed strings.
+        if not (plain_string.match(string1) and plain_string.match(string2)):
             return False
-        
+        common = sum((char_counts(string1) & char_counts(string2)).values())
+        total = len(string1) + len(string2)
+        shorter = min(len(string1), len(string2))
+        ratio = 2 * common / total
+        if ratio > prob_difflib or 100 * ratio + 1 > prob_leven:
+            return False
+        # fuzz also tries partial matches, scaled by 0.9 at most, for strings of different lengths.
+        if max(len(string1), len(string2)) / shorter >= 1.5 and 0.9 * (200 * common / (shorter + common) + 1) > prob_leven:
+            return False
+        return True
+
+    def import_comparison_cache(self, filename):
+        '''
+        Loads previously stored string comparisons to the cache.
+        Input:
+            a) filename: The .json file with the stored comparisons.
+        '''
+
+        try:
+            with open(filename, 'r') as f:
+                entries = ujson.load(f)
+        except (OSError, ValueError):
+            return
+        self.merge_comparisons(entries)
+
+    def merge_comparisons(self, entries):
+        '''
+        Adds string comparisons to the cache, e.g., the comparisons made by a worker process.
+        Input:
+            a) entries: A list with [string1, string2, prob_difflib, prob_leven, result] entries.
+        '''
+
+        with cache_lock:
+            for string1, string2, prob_difflib, prob_leven, result in entries[-CACHE_SIZE:]:
+                comparison_cache[(string1, string2, prob_difflib, prob_leven)] = result
+            while len(comparison_cache) > CACHE_SIZE:
+                comparison_cache.popitem(last=False)
+
+    def comparisons(self):
+        '''
+        Returns the cached string comparisons, the least recently used first.
+        Output:
+            a) A list with [string1, string2, prob_difflib, prob_leven, result] entries.
+        '''
+
+        with cache_lock:
+            return [list(key) + [result] for key, result in comparison_cache.items()]
+
+    def export_comparison_cache(self, filename):
+        '''
+        Stores the cached string comparisons, the least recently used first.
+        Input:
+            a) filename: The .json file to store the comparisons.
+        '''
+
+        entries = self.comparisons()
+        try:
+            with open(filename + '.tmp', 'w') as f:
+                ujson.dump(entries, f)
+            os.replace(filename + '.tmp', filename)
+        except OSError as e:
+            print('Could not export the string comparison cache -', e)
+
 
     # TODO: Change this function for IPv6
     def clean_ip(self, IP, kind):
@@ -163,6 +312,60 @@ class string_handler():
         else:
             return str(netaddr.IPNetwork(IP).cidr).split('/')[0]
 
+    def parse_ips(self, strings, kind):
+        '''
+        Validates and normalizes many IPs or Subnets at once, without raising exceptions. It replaces extract_ip,
+        clean_ip and is_valid_ip_address for the first IP or Subnet of each string, e.g., " 192.08.010.1" gives
+        192.8.10.1 and 10.0.0.1/24 gives 10.0.0.0/24.
+        Input:
+            a) strings: A list with the strings containing an IP address or a Subnet.
+            b) kind: "IP" for ip address or "Subnet" for prefix.
+        Output:
+            a) networks: An array with the network address of each string in integer format.
+            b) lengths: An array with the prefix length of each string (32 for "IP"), -1 for the invalid strings.
+        '''
+
+        networks = array('I')
+        lengths = array('b')
+        search = (prefix_pattern if kind == 'Subnet' else octets_pattern).search
+        for string in strings:
+            match = search(string.replace(' ', '').replace('./', '/').replace('/.', '/')) if string else None
+            if match is None:
+                networks.append(0)
+                lengths.append(-1)
+                continue
+            octets = match.groups()
+            a, b, c, d = int(octets[0]), int(octets[1]), int(octets[2]), int(octets[3])
+            length = int(octets[4]) if kind == 'Subnet' else 32
+            if a > 255 or b > 255 or c > 255 or d > 255 or length > 32:
+                networks.append(0)
+                lengths.append(-1)
+                continue
+            networks.append(((a << 24) | (b << 16) | (c << 8) | d) & netmasks[length])
+            lengths.append(length)
+        return networks, lengths
+
+    def canonical_ips(self, strings, kind):
+        '''
+        Returns the canonical form of many IPs or Subnets.
+        Input:
+            a) strings: A list with the strings containing an IP address or a Subnet.
+            b) kind: "IP" for ip address or "Subnet" for prefix.
+        Output:
+            a) A list with the canonical IP or Subnet of each string, None for the invalid strings.
+        '''
+
+        [networks, lengths] = self.parse_ips(strings, kind)
+        canonical = []
+        for network, length in zip(networks, lengths):
+            if length < 0:
+                canonical.append(None)
+            elif kind == 'Subnet':
+                canonical.append(int2ip(network) + '/' + str(length))
+            else:
+                canonical.append(int2ip(network))
+        return canonical
+
     def sub_prefix_check(self, prefix, tree):
         '''
         Checks if a given prefix/subprefix is in the SubnetTree.
@@ -20,18 +20,159 @@
 # You should have received a copy of the GNU General Public License
 # along with traIXroute.  If not, see <http://www.gnu.org/licenses/>.
 
-from traixroute.controller import string_handler
+from traixroute.controller import string_handler, profiler, dns_resolver
 from time import ctime
 import os
-import socket
 import sys
 import ujson
 import time
-import itertools
 import ntpath
 import datetime
 
 
+def format_asn(asn):
+    '''
+    Formats the ASNs, which are handled in integer format, back to text.
+    Input:
+        a) asn: An ASN, None if it is unknown, or a sequence with the ASNs of a hop (more than one for MOAS prefixes).
+    Output:
+        a) The ASN(s) in string format, e.g., 1234_5678, "*" if it is unknown.
+    '''
+
+    if asn is None:
+        return '*'
+    if isinstance(asn, int):
+        return str(asn)
+    return '_'.join([str(node) for node in asn]) or '*'
+
+
+class crossing_record():
+    '''
+    An IXP crossing, a possible IXP crossing or a remote peering link inferred by a rule in a traceroute path. The
+    records are rendered to text or json when the path is flushed, only for the enabled outputs.
+    '''
+
+    __slots__ = ['kind', 'i', 'path', 'asmt', 'rule', 'asns', 'ixps', 'remote']
+
+    def __init__(self, kind, i, path, asmt, rule, asns, ixps, remote=None):
+        '''
+        Input:
+            a) kind: 'ixp', 'possible' or 'remote'.
+            b) i: The position of the IXP hop in the path.
+            c) path: The IP path.
+            d) asmt: The assessment of the rule.
+            e) rule: The index of the rule, None if the rules are not printed.
+            f) asns: The ASNs of the hop window, None if the ASNs are not printed.
+            g) ixps: A list with (IXP name, IXP short name, country, city) for each hop of the window, None for the
+               hops without an IXP.
+            h) remote: The (IP, remote peering info) of a remote peering link.
+        '''
+
+        self.kind = kind
+        self.i = i
+        self.path = path
+        self.asmt = asmt
+        self.rule = rule
+        self.asns = asns
+        self.ixps = ixps
+        self.remote = remote
+
+    def ixp_link(self, first):
+        '''
+        Returns the IXPs of the link between the hops first and first + 1 of the window.
+        Output:
+            a) The IXPs in text format, e.g., "DE-CIX (DE,Frankfurt)".
+            b) A list with the IXPs in json format.
+        '''
+
+        texts = []
+        ixps = []
+        for ixp in self.ixps[first:first + 2]:
+            if ixp is None:
+                continue
+            text = ixp[0] + ' (' + ixp[2] + ',' + ixp[3] + ')'
+            if text not in texts:
+                texts.append(text)
+                ixps.append({'name': ixp[1], 'cc': ixp[2], 'city': ixp[3]})
+        return ','.join(texts), ixps
+
+    def asn(self, pointer):
+        return format_asn(self.asns[pointer])
+
+    def links(self):
+        '''
+        Returns the positions in the window of the first hops of the links of the record, i.e., 0 for the link before
+        the IXP hop and 1 for the link after it.
+        '''
+
+        if self.kind != 'ixp':
+            return [0]
+        if 'a' in self.asmt:
+            return [0, 1] if 'aorb' in self.asmt or 'aandb' in self.asmt else [0]
+        return [1]
+
+    def segment(self, first):
+        '''
+        Returns a link of the record in text format.
+        '''
+
+        hop = self.i + first
+        [ixps, _] = self.ixp_link(first)
+        if self.asns is None:
+            return str(hop) + ') ' + self.path[hop - 1] + ' <--- ' + ixps + ' ---> ' + str(hop + 1) + ') ' + self.path[hop] + '\n'
+        return str(hop) + ') ' + self.path[hop - 1] + ' (AS' + self.asn(first) + ') <--- ' + ixps + ' ---> ' + \
+            str(hop + 1) + ') ' + self.path[hop] + ' (AS' + self.asn(first + 1) + ')\n'
+
+    def text(self):
+        '''
+        Returns the record in text format.
+        Output:
+            a) The rule prefix of the record.
+            b) A list with the [connector, link] pairs of the record in text format.
+        '''
+
+        prefix = 'Rule: ' + str(self.rule + 1) + ' --- ' if self.rule is not None else ''
+        if self.kind == 'remote':
+            [ip, data] = self.remote
+            area = data['continent'] + ',' if 'continent' in data else ''
+            return prefix, [['', str(self.i) + ') ' + ip + ' (AS' + data['asn'] + ',' + area + data['city'] + ',' +
+                             '{0:.2f}'.format(round(float(data['median_rtt']), 2)) + 'ms) <---> ' + self.ixp_link(0)[0] + '\n']]
+        connector = ' or ' if 'aorb' in self.asmt else 'and ('
+        return prefix, [[connector if n else '', self.segment(first)] for n, first in enumerate(self.links())]
+
+    def json(self):
+        '''
+        Returns the record in json format.
+        '''
+
+        if self.kind == 'remote':
+            [ip, data] = self.remote
+            record = {'hop': str(self.i), 'ip': ip, 'asn': data['asn']}
+            if 'continent' in data:
+                record['continent'] = data['continent']
+            record['city'] = data['city']
+            record['rtt'] = '{0:.2f}'.format(round(float(data['median_rtt']), 2)) + 'ms'
+            record['ixp'] = self.ixp_link(0)[1]
+            return record
+
+        record = {'crossing': []}
+        if self.rule is not None:
+            record['assesment'] = self.asmt
+            record['rule'] = str(self.rule + 1)
+        for first in self.links():
+            hop = self.i + first
+            crossing = {
+                'source': {'hop': str(hop), 'addr': self.path[hop - 1]},
+                'dest': {'hop': str(hop + 1), 'addr': self.path[hop]},
+                'ixp': self.ixp_link(first)[1],
+            }
+            if self.asns is not None:
+                crossing['source']['asn'] = self.asn(first)
+                crossing['dest']['asn'] = self.asn(first + 1)
+            record['crossing'].append(crossing)
+        return record
+
+
 class traixroute_output():
     '''
     Handles all the outputs.
@@ -46,9 +187,8 @@ class traixroute_output():
         }
 
         self.measurement_info   = ''
-        self.ixp_hops           = ''
-        self.remote_hops        = ''
-        self.unknown_hops       = ''
+        # The crossing_record instances of the current path.
+        self.crossings          = []
         # A list with all the analyzed paths to export to json file
         self.json_obj = []  
         # A list with all the analyzed paths to export to .txt file
@@ -60,14 +200,14 @@ class traixroute_output():
             a) traixparser: The instance of parser that specifies which of the traIXroute command line arguments have been enabled.
         '''
         
-        # Complements content output.
-        output = self.measurement_info
-        if self.ixp_hops != '':
-            output += 'IXP hops:\n'          + self.ixp_hops
-        if self.remote_hops != '':
-            output += 'Remote Peering:\n'    + self.remote_hops
-        if self.unknown_hops != '':
-            output += 'Possible IXP hops:\n' + self.unknown_hops
+        # The crossings are rendered only for the enabled outputs.
+        print_txt = not traixparser.flags['silent'] or traixparser.flags['outputfile_txt']
+        if print_txt:
+            output = self.measurement_info + self.crossings_text()
+        if traixparser.flags['outputfile_json']:
+            sections = {'ixp': 'ixp_crossings', 'remote': 'remote_peering', 'possible': 'possible_ixp_crossings'}
+            for record in self.crossings:
+                self.measurement_json[sections[record.kind]].append(record.json())
         if len(self.measurement_json['ixp_crossings']) == 0:
             del self.measurement_json['ixp_crossings']
         if len(self.measurement_json['remote_peering']) == 0:
@@ -81,15 +221,52 @@ class traixroute_output():
         if traixparser.flags['outputfile_json'] : self.json_obj.append(self.measurement_json)
 
         self.measurement_info   = ''
-        self.ixp_hops           = ''
-        self.remote_hops        = ''
-        self.unknown_hops       = ''
+        self.crossings          = []
         self.measurement_json = {
             'ixp_crossings': [],
             'remote_peering': [],
             'possible_ixp_crossings': []
         }
 
+    def crossings_text(self):
+        '''
+        Renders the crossings of the current path in text format.
+        The same IXP crossing may be inferred for many AS paths or IXPs of a window, so an IXP crossing is printed once,
+        as well as a link already printed as part of an "a or b" or "a and b" crossing.
+        Output:
+            a) The IXP hops, the remote peering and the possible IXP hops in text format.
+        '''
+
+        ixp_hops = []
+        remote_hops = []
+        unknown_hops = []
+        # printed: The keys of the printed IXP crossings and of their links.
+        printed = set()
+        for record in self.crossings:
+            [prefix, links] = record.text()
+            text = prefix + ''.join([connector + link for connector, link in links])
+            if record.kind == 'ixp':
+                key = (prefix,) + tuple(connector + link for connector, link in links)
+                if key in printed:
+                    continue
+                printed.add(key)
+                printed.add((prefix, links[0][1]))
+                printed.update(('', link) for _, link in links[1:])
+                ixp_hops.append(text)
+            elif record.kind == 'remote':
+                remote_hops.append(text)
+            else:
+                unknown_hops.append(text)
+
+        output = ''
+        if ixp_hops:
+            output += 'IXP hops:\n'          + ''.join(ixp_hops)
+        if remote_hops:
+            output += 'Remote Peering:\n'    + ''.join(remote_hops)
+        if unknown_hops:
+            output += 'Possible IXP hops:\n' + ''.join(unknown_hops)
+        return output
+
     def print_db_stats(self, peering_ixp2asn, peering_sub2name, pch_ixp2asn, pch_sub2name, final_ixp2asn, final_sub2name, dirty_ips, additional_ip2asn, additional_subnet2name, lenreserved, db_print, mypath):
         '''
         Prints the number of the extracted IXP IP addresses and Subnets from each dataset before and after merging.
@@ -139,7 +316,7 @@ class traixroute_output():
             f) traIXparser: Dictionary that contains the user input flags.
         '''
 
-        asn_list = path_info_extract.asn_list
+        asn_list = [format_asn(asn) for asn in path_info_extract.asn_list]
         ixp_short_names = path_info_extract.ixp_short_names
         ixp_long_names = path_info_extract.ixp_long_names
         unsure = path_info_extract.unsure
@@ -150,12 +327,11 @@ class traixroute_output():
         # Makes dns queries.
         dns = [''] * size
         if dns_print:
+            with profiler.measure('dns'):
+                names = dns_resolver.resolver().resolve(ip_path)
             for i,item in enumerate(ip_path):
                 if item != '*':
-                    try:
-                        dns[i] = socket.gethostbyaddr(item)[0]
-                    except:
-                        dns[i] = item
+                    dns[i] = names[item] or item
         
         # The minimum space between the printed strings.
         defaultstep = 3
@@ -228,39 +404,34 @@ class traixroute_output():
         print_data = 'traIXroute'
         dns_name = '*'
         output_IP = '*'
+        resolver = dns_resolver.resolver()
         if string_handle.is_valid_ip_address(dst_ip, 'IP', 'CLI'):
             if dns_print:
-                try:
-                    dns_name = socket.gethostbyaddr(dst_ip)[0]
-                except:
-                    pass
+                with profiler.measure('dns'):
+                    dns_name = resolver.reverse(dst_ip) or '*'
             output_IP = dst_ip
         else:
             if dns_print:
-                try:
-                    output_IP = socket.gethostbyname(dst_ip)
-                except:
-                    pass
+                with profiler.measure('dns'):
+                    output_IP = resolver.forward(dst_ip) or '*'
             dns_name = dst_ip
         if src_ip != '':
             origin_dns = '*'
             if dns_print:
-                try:
-                    origin_dns = socket.gethostbyaddr(src_ip)[0]
-                except:
-                    pass
+                with profiler.measure('dns'):
+                    origin_dns = resolver.reverse(src_ip) or '*'
             print_data += ' from ' + origin_dns + ' (' + src_ip + ')'
 
         if traixparser.flags['asn']:
             if src_ip in db_extract.asn_routeviews:
-                print_data += ' AS'+db_extract.asn_routeviews[src_ip]
+                print_data += ' AS'+format_asn(db_extract.asn_routeviews[src_ip])
             elif src_ip:
                 print_data += ' AS*'
         
         print_data += ' to ' +  dns_name + ' (' + output_IP + ')'
         if traixparser.flags['asn']:
             if output_IP in db_extract.asn_routeviews:
-                print_data += ' AS'+db_extract.asn_routeviews[output_IP]
+                print_data += ' AS'+format_asn(db_extract.asn_routeviews[output_IP])
             else:
                 print_data += ' AS*'
            
@@ -296,7 +467,7 @@ class traixroute_output():
 
     def print_result(self, asn_print, print_rule, cur_ixp_long, cur_ixp_short, cur_path_asn, path, i, j, num, ixp_short, cur_asmt, ixp_long, cc_tree, remote_peering=None):
         '''
-        Prints IXP Hops if they exist.
+        Records the IXP Hops if they exist, to be printed when the path is flushed.
         Input: 
             a) asn_print: True if the user wants to print the ASNs, False otherwise.
             b) print_rule: True if the user wants to print the rule that infered the IXP crossing, False otherwise.
@@ -314,247 +485,32 @@ class traixroute_output():
             n) remote_peering: A flag to indicate a potential IXP crossing link based on remote peering connectivity.
         '''
         
-        ixp_crossing = None
-        unknown_hop = None
-        remote_crossing = None
-        rule = ''
-        if print_rule:
-            rule = 'Rule: ' + str(j + 1) + ' --- '
-
-        gra_asn = [''] * len(cur_path_asn)
-        ixp_string = [''] * len(cur_ixp_short)
-        ixp_dict = [{}] * len(cur_ixp_short)
-
-        for pointer in range(0, len(ixp_string)):
+        # The IXP of each hop of the window, with the country and the city of the last hop with an IXP name.
+        ixps = [None] * len(cur_ixp_short)
+        for pointer in range(0, len(ixps)):
             if len(ixp_short) > i + pointer - 1:
                 if ixp_short[i + pointer - 1] != ['No Short Name']:
                     cc_code = ['', '']
                     if path[i + pointer - 1] in cc_tree:
                         cc_code = cc_tree[path[i + pointer - 1]]
             if cur_ixp_short[pointer] != 'No Short Name':
-                if cur_ixp_short[pointer] != '':
-                    ixp_string[pointer] = cur_ixp_short[pointer] + \
-                        ' (' + cc_code[0] + ',' + cc_code[1] + ')'
-                    ixp_dict[pointer] = {
-                        'name': cur_ixp_short[pointer],
-                        'cc': cc_code[0],
-                        'city': cc_code[1],
-                    }
-                else:
-                    ixp_string[pointer] = cur_ixp_long[pointer] + \
-                        ' (' + cc_code[0] + ',' + cc_code[1] + ')'
-                    ixp_dict[pointer] = {
-                        'name': cur_ixp_short[pointer],
-                        'cc': cc_code[0],
-                        'city': cc_code[1],
-                    }
-        asm_a = ixp_string[0]
-        asm_a_dict = []
-
-        if bool(ixp_dict[0]):
-            asm_a_dict.append(ixp_dict[0])
-
-        temp_print = ''
-        if ixp_string[0] != '' and ixp_string[1] != '' and ixp_string[0] != ixp_string[1]:
-            asm_a += ','
-        if ixp_string[1] != '' and ixp_string[0] != ixp_string[1]:
-            asm_a += ixp_string[1]
-            if bool(ixp_dict[1]):
-                asm_a_dict.append(ixp_dict[1])
-
-        if len(ixp_string) > 2:
-            asm_b = ixp_string[1]
-            asm_b_dict = []
-            if bool(ixp_dict[1]):
-                asm_b_dict.append(ixp_dict[1])
-            if ixp_string[1] != '' and ixp_string[2] != '' and ixp_string[2] != ixp_string[1]:
-                asm_b += ','
-            if ixp_string[2] != '' and ixp_string[1] != ixp_string[2]:
-                asm_b += ixp_string[2]
-                if bool(ixp_dict[2]):
-                    asm_b_dict.append(ixp_dict[2])
-
-        if asn_print:
-            for pointer in range(0, len(gra_asn)):
-                gra_asn[pointer] = ' (AS' + cur_path_asn[pointer] + ')'
-
-        if 'a' in cur_asmt:
-            temp_print = rule + str(i) + ') ' + path[i - 1] + gra_asn[
-                0] + ' <--- ' + asm_a + ' ---> ' + str(i + 1) + ') ' + path[i] + gra_asn[1] + '\n'
-
-            ixp_crossing = {
-                'crossing': []
-            }
-
-            if print_rule:
-                ixp_crossing['assesment'] = cur_asmt
-                ixp_crossing['rule'] = str(j + 1)
-
-            crossing = {
-                'source': {
-                    'hop': str(i),
-                    'addr': path[i - 1],
-                },
-                'dest': {
-                    'hop': str(i + 1),
-                    'addr': path[i],
-                },
-                'ixp': asm_a_dict,
-            }
-
-            if asn_print:
-                crossing['source']['asn'] = cur_path_asn[0]
-                crossing['dest']['asn'] = cur_path_asn[1]
-
-            ixp_crossing['crossing'].append(crossing)
-
-            if 'aorb' in cur_asmt:
-                temp_print += ' or ' + str(i + 1) + ') ' + path[i] + gra_asn[
-                    1] + ' <--- ' + asm_b + ' ---> ' + str(i + 2) + ') ' + path[i + 1] + gra_asn[2] + '\n'
-                crossing = {
-                    'source': {
-                        'hop': str(i + 1),
-                        'addr': path[i],
-                    },
-                    'dest': {
-                        'hop': str(i + 2),
-                        'addr': path[i + 1],
-                    },
-                    'ixp': asm_b_dict,
-                }
-
-                if asn_print:
-                    crossing['source']['asn'] = cur_path_asn[1]
-                    crossing['dest']['asn'] = cur_path_asn[2]
-
-                ixp_crossing['crossing'].append(crossing)
-
-            elif 'aandb' in cur_asmt:
-                temp_print += ('and (' + str(i + 1) + ') ' + path[i] + gra_asn[
-                               1] + ' <--- ' + asm_b + ' ---> ' + str(i + 2) + ') ' + path[i + 1] + gra_asn[2]) + '\n'
-
-                crossing = {
-                    'source': {
-                        'hop': str(i + 1),
-                        'addr': path[i],
-                    },
-                    'dest': {
-                        'hop': str(i + 2),
-                        'addr': path[i + 1],
-                    },
-                    'ixp': asm_b_dict,
-                }
-
-                if asn_print:
-                    crossing['source']['asn'] = cur_path_asn[1]
-                    crossing['dest']['asn'] = cur_path_asn[2]
-
-                ixp_crossing['crossing'].append(crossing)
-
-        elif 'b' in cur_asmt:
-            temp_print = rule + str(i + 1) + ') ' + path[i] + gra_asn[
-                1] + ' <--- ' + asm_b + ' ---> ' + str(i + 2) + ') ' + path[i + 1] + gra_asn[2] + '\n'
-
-            ixp_crossing = {
-                'crossing': []
-            }
-
-            if print_rule:
-                ixp_crossing['assesment'] = cur_asmt
-                ixp_crossing['rule'] = str(j + 1)
-
-            crossing = {
-                'source': {
-                    'hop': str(i + 1),
-                    'addr': path[i],
-                },
-                'dest': {
-                    'hop': str(i + 2),
-                    'addr': path[i + 1],
-                },
-                'ixp': asm_b_dict,
-            }
+                ixps[pointer] = (cur_ixp_short[pointer] or cur_ixp_long[pointer], cur_ixp_short[pointer], cc_code[0], cc_code[1])
 
-            if asn_print:
-                crossing['source']['asn'] = cur_path_asn[1]
-                crossing['dest']['asn'] = cur_path_asn[2]
-
-            ixp_crossing['crossing'].append(crossing)
-
-        elif '?' in cur_asmt:
-            self.unknown_hops += rule + str(i) + ') ' + path[i - 1] + gra_asn[
-                0] + ' <--- ' + asm_a + ' ---> ' + str(i + 1) + ') ' + path[i] + gra_asn[1] + '\n'
-            unknown_hop = {
-                'crossing': []
-            }
-
-            if print_rule:
-                unknown_hop['assesment'] = cur_asmt
-                unknown_hop['rule'] = str(j + 1)
-
-            crossing = {
-                'source': {
-                    'hop': str(i),
-                    'addr': path[i - 1]
-                },
-                'dest': {
-                    'hop': str(i + 1),
-                    'addr': path[i]
-                },
-                'ixp': asm_a_dict,
-            }
-
-            if asn_print:
-                crossing['source']['asn'] = cur_path_asn[0]
-                crossing['dest']['asn'] = cur_path_asn[1]
-
-            unknown_hop['crossing'].append(crossing)
+        rule = j if print_rule else None
+        asns = cur_path_asn if asn_print else None
+        if 'a' in cur_asmt or 'b' in cur_asmt:
+            record = crossing_record('ixp', i, path, cur_asmt, rule, asns, ixps)
+            self.crossings.append(record)
+        else:
+            record = crossing_record('possible', i, path, cur_asmt, rule, asns, ixps)
+            if '?' in cur_asmt:
+                self.crossings.append(record)
 
-        if temp_print != '' and temp_print not in self.ixp_hops:
-            self.ixp_hops += temp_print
-        
         if remote_peering is not None:
-            remote_data = remote_peering.find_and_print(
-                path[i - 1:i + 2], asm_a)
-
-            if(remote_data is not None):
-                if('continent' in remote_data):
-                    self.remote_hops += rule + str(i) + ') ' +\
-                        path[i - 1:i + 2][remote_peering.indexes[remote_peering.temp_index]] +\
-                        ' (AS' + remote_data['asn'] + ',' + remote_data['continent'] + ',' +\
-                        remote_data['city'] + ',' + str("{0:.2f}".format(round(float(remote_data['median_rtt']), 2))) +\
-                        'ms)' + ' <---> ' + asm_a + '\n'
-
-                    remote_crossing = {
-                        'hop': str(i),
-                        'ip': path[i - 1:i + 2][remote_peering.indexes[remote_peering.temp_index]],
-                        'asn': remote_data['asn'],
-                        'continent': remote_data['continent'],
-                        'city': remote_data['city'],
-                        'rtt': str("{0:.2f}".format(round(float(remote_data['median_rtt']), 2))) + 'ms',
-                        'ixp': asm_a_dict,
-                    }
-                else:
-                    self.remote_hops += rule + str(i) + ') ' +\
-                        path[i - 1:i + 2][remote_peering.indexes[remote_peering.temp_index]] +\
-                        ' (AS' + remote_data['asn'] + ',' +\
-                        remote_data['city'] + ',' + str("{0:.2f}".format(round(float(remote_data['median_rtt']), 2))) +\
-                        'ms)' + ' <---> ' + asm_a + '\n'
-                    remote_crossing = {
-                        'hop': str(i),
-                        'ip': path[i - 1:i + 2][remote_peering.indexes[remote_peering.temp_index]],
-                        'asn': remote_data['asn'],
-                        'city': remote_data['city'],
-                        'rtt': str("{0:.2f}".format(round(float(remote_data['median_rtt']), 2))) + 'ms',
-                        'ixp': asm_a_dict,
-                    }
-
-        if ixp_crossing != None:
-            self.measurement_json['ixp_crossings'].append(ixp_crossing)
-        if remote_crossing != None:
-            self.measurement_json['remote_peering'].append(remote_crossing)
-        if unknown_hop != None:
-            self.measurement_json['possible_ixp_crossings'].append(unknown_hop)
+            remote_data = remote_peering.find_and_print(path[i - 1:i + 2], record.ixp_link(0)[0])
+            if remote_data is not None:
+                ip = path[i - 1:i + 2][remote_peering.indexes[remote_peering.temp_index]]
+                self.crossings.append(crossing_record('remote', i, path, cur_asmt, rule, asns, ixps, (ip, remote_data)))
         
     def print_args(self, classic, search, arguments, from_ripe, from_import):
         '''
@@ -564,7 +520,7 @@ class traixroute_output():
             b) search: Flag to start a measurement.
             c) arguments: Probing arguments.
             d) from_ripe: Flag when usisn ripe.
-            e) from_import: Flag when importing from json file.
+            e) from_import: Flag when importing from json, ripe json or scamper file.
         '''
 
         # Remove the key argument from printing.
@@ -593,6 +549,8 @@ class traixroute_output():
                 'Run traIXroute from file with traIXroute json format:', arguments)
         elif from_import == 2:
             print('Run traIXroute from file with ripe json format:', arguments)
+        elif from_import == 3:
+            print('Run traIXroute from file with scamper format:', arguments)
 
     def print_pr_db_stats(self, filepath):
         '''
@@ -663,7 +621,7 @@ class traixroute_output():
         result = []
         for i,ip in enumerate(ip_path):
             result.append(
-                {'hop': i+1, 'result': [{'from': ip, 'asn': asn_list[i], 'rtt': delays[i]}]})
+                {'hop': i+1, 'result': [{'from': ip, 'asn': format_asn(asn_list[i]), 'rtt': delays[i]}]})
         
         self.measurement_json['result'] = result
 
@@ -679,14 +637,14 @@ class traixroute_output():
         
         # Add ASN for the public source/dest IP of the traceroute path.
         if entry['from'] in db_extract.asn_routeviews:
-            entry['from_asn'] = db_extract.asn_routeviews[entry['from']]
+            entry['from_asn'] = format_asn(db_extract.asn_routeviews[entry['from']])
         if entry['dst_addr'] in db_extract.asn_routeviews:
-            entry['dst_addr_asn'] = db_extract.asn_routeviews[entry['dst_addr']] 
+            entry['dst_addr_asn'] = format_asn(db_extract.asn_routeviews[entry['dst_addr']])
         
         for hop in entry['result']:
             if hop['hop'] != 255:
                 try:
-                    hop['asn'] = asn_list[hop['hop'] - 1]
+                    hop['asn'] = format_asn(asn_list[hop['hop'] - 1])
                 except KeyError:
                     pass
             else:
@@ -697,47 +655,6 @@ class traixroute_output():
         head, tail = ntpath.split(path)
         return tail or ntpath.basename(head)
            
-    def export_results_to_files(self, json_data, txt_data, traixparser, homepath, arguments, exact_time):
-        '''
-        Exports the total results to .txt/.json files.
-        Input:
-            a) json_data: Contains all the analyzed traceroute paths to be exported in json format.
-            b) txt_data: Contains all the analyzed traceroute paths to be exported in raw txt format.
-            c) traixparser: The instance of parser to identify if necessary arguments have been enabled.
-            d) homepath: The home directory path of traIXroute.
-            e) arguments: The absolute path of the traceroute path file.
-        '''
-    
-        # Discriminating the case when we have as input ripe altas measurements directly from RIPE's database or local files.
-        file_name = self.get_filename_from_path(arguments) if not traixparser.flags['ripe'] else 'msm_id_' + str(arguments['msm_id'])
-        
-        if traixparser.flags['outputfile_json']:
-            outputfile_json = traixparser.outputfile_json
-            filename = outputfile_json + file_name if outputfile_json else homepath + '/output/output_json_' + (file_name if file_name else exact_time)
-                
-            with open(filename, 'w') as f:
-                size_list = len(json_data)
-                counter = 1
-                f.write('[\n')
-                for entry in itertools.chain.from_iterable(json_data):
-                    f.write(ujson.dumps(entry))
-                    # Checking for the last element.
-                    if counter < size_list:
-                        f.write('\n,\n')
-                    counter+=1    
-                f.write('\n]')
-                print('Results in json format have been exported:', filename)
-            
-        if traixparser.flags['outputfile_txt']:
-            outputfile_txt  = traixparser.outputfile_txt
-            filename = outputfile_txt + file_name if outputfile_txt else homepath + '/output/output_txt_' + (file_name if file_name else exact_time)
-            
-            with open(filename, 'w') as f:
-                for entry in txt_data:
-                    for subentry in entry:
-                        f.write(subentry+'\n')
-                print('Results have been exported:', filename)
-
     def stats_extract(self, homepath, num_ips, rules, final_rules_hit, exact_time, traixparser, arguments):
             '''
             Writes various statistics to the stats.txt file.
@@ -771,4 +688,123 @@ class traixroute_output():
                         data += 'Rule ' + str(myi + 1) + ': Times encountered:0 Encounter Percentage:0\n'
                 fp_stats.write(data)
             print('Stats have been exported:', filename)
-            
+
+    def export_profile(self, homepath, report, exact_time, traixparser, arguments):
+        '''
+        Writes the profiling report to a .json file next to the stats file.
+        Input:
+            a) homepath: The home directory path of traIXroute.
+            b) report: The profiling report, as returned by profiler.report.
+            c) exact_time: The starting timestamp of traIXroute.
+            d) traixparser: The instance of parser to identify if necessary arguments have been enabled.
+            e) arguments: The absolute path of the traceroute path file.
+        '''
+
+        file_name = self.get_filename_from_path(arguments) if not traixparser.flags['ripe'] else 'msm_id_' + str(arguments['msm_id'])
+        filename = homepath + '/output/output_profile_' + (file_name if file_name else exact_time)
+        try:
+            with open(filename, 'w') as f:
+                ujson.dump(report, f, indent=2)
+        except OSError as e:
+            print('Could not export the profiling report -', e)
+            return
+        print('Profiling report has been exported:', filename)
+
+
+class result_writer():
+    '''
+    Writes the results to the .txt/.json output files incrementally, as soon as each batch of traceroute paths
+    has been analyzed, so that the results are not kept in memory until the end of the analysis.
+    '''
+
+    def __init__(self, traixparser, homepath, arguments, exact_time, config=None):
+        '''
+        Opens the output files.
+        Input:
+            a) traixparser: The instance of parser to identify if necessary arguments have been enabled.
+            b) homepath: The home directory path of traIXroute.
+            c) arguments: The absolute path of the traceroute path file.
+            d) exact_time: The starting timestamp of traIXroute.
+            e) config: The dictionary with the configuration of traIXroute.
+        '''
+
+        config = config if config is not None else {}
+        # self.ndjson: True to write one traceroute path per line instead of a json array.
+        self.ndjson = traixparser.flags['ndjson']
+        # self.fsync_interval: The minimum number of seconds between two fsync calls, 0 to disable fsync.
+        self.fsync_interval = config.get('output_fsync_interval', 0)
+        self.last_sync = time.time()
+        self.json_file = None
+        self.txt_file = None
+        self.json_entries = 0
+
+        # Discriminating the case when we have as input ripe altas measurements directly from RIPE's database or local files.
+        file_name = traixroute_output().get_filename_from_path(arguments) if not traixparser.flags['ripe'] else 'msm_id_' + str(arguments['msm_id'])
+
+        if traixparser.flags['outputfile_json']:
+            outputfile_json = traixparser.outputfile_json
+            self.json_filename = outputfile_json + file_name if outputfile_json else homepath + '/output/output_json_' + (file_name if file_name else exact_time)
+            self.json_file = open(self.json_filename, 'w')
+            if not self.ndjson:
+                self.json_file.write('[\n')
+
+        if traixparser.flags['outputfile_txt']:
+            outputfile_txt  = traixparser.outputfile_txt
+            self.txt_filename = outputfile_txt + file_name if outputfile_txt else homepath + '/output/output_txt_' + (file_name if file_name else exact_time)
+            self.txt_file = open(self.txt_filename, 'w')
+
+    def write(self, json_obj, txt_obj):
+        '''
+        Appends the results of a batch of traceroute paths to the output files.
+        Input:
+            a) json_obj: A list with the analyzed traceroute paths in json format.
+            b) txt_obj: A list with the analyzed traceroute paths in raw txt format.
+        '''
+
+        if self.json_file is not None:
+            for entry in json_obj:
+                if self.ndjson:
+                    self.json_file.write(ujson.dumps(entry) + '\n')
+                else:
+                    # Separates the entries of the json array.
+                    if self.json_entries:
+                        self.json_file.write('\n,\n')
+                    self.json_file.write(ujson.dumps(entry))
+                self.json_entries += 1
+
+        if self.txt_file is not None:
+            for entry in txt_obj:
+                self.txt_file.write(entry + '\n')
+
+        self.flush()
+
+    def flush(self):
+        '''
+        Flushes the output files and periodically syncs them to the disk, so that the results survive a crash.
+        '''
+
+        sync = self.fsync_interval > 0 and time.time() - self.last_sync >= self.fsync_interval
+        for f in (self.json_file, self.txt_file):
+            if f is not None:
+                f.flush()
+                if sync:
+                    os.fsync(f.fileno())
+        if sync:
+            self.last_sync = time.time()
+
+    def close(self):
+        '''
+        Completes and closes the output files.
+        '''
+
+        if self.json_file is not None:
+            if not self.ndjson:
+                self.json_file.write('\n]')
+            self.json_file.close()
+            self.json_file = None
+            print('Results in json format have been exported:', self.json_filename)
+
+        if self.txt_file is not None:
+            self.txt_file.close()
+            self.txt_file = None
+            print('Results have been exported:', self.txt_filename)
@@ -75,6 +75,7 @@ class traixroute_parser():
         parser_probe = subparsers.add_parser('probe', help='probe --help')
         parser_ripe = subparsers.add_parser('ripe', help='ripe --help')
         parser_import = subparsers.add_parser('import', help='import --help')
+        parser_server = subparsers.add_parser('server', help='server --help')
 
         parser.add_argument('-stats', '--enable-stats', action='store_true',
                             help='Enables logging IXP crossing related information.')
@@ -96,10 +97,16 @@ class traixroute_parser():
                             help='Enables to export data in .txt file and (optional) specifies the output file name to redirect the traIXroute results.')
         parser.add_argument('-ojson', '--output-json', default='disabled', nargs='?', type=str,
                             help='Enables to export data in .json file and (optional) specifies the output file name to redirect the traIXroute results.')                    
+        parser.add_argument('-ndjson', '--output-ndjson', action='store_true',
+                            help='Exports the .json results as newline-delimited json, i.e., one traceroute path per line, instead of a json array.')
+        parser.add_argument('-ordered', '--ordered-output', action='store_true',
+                            help='Exports the results in the order of the input instead of the order in which they are completed.')
+        parser.add_argument('-profile', '--profile', action='store_true',
+                            help='Records the wall time and the calls of each analysis stage and worker, the fuzzy comparisons and the rule evaluations to a .json report next to the stats file.')
         parser.add_argument('-v', '--version', action='version', version='current version of traixroute: '+self.version)
         parser_mode = parser.add_mutually_exclusive_group(required=True)
         parser_mode.add_argument('-thread', action='store_true',help='Enables threads for parallel analysis. This mode is more conservative in terms of performance and is recommended in case of memory limitations.')
-        parser_mode.add_argument('-process', action='store_true', help='Enables processes for parallel analysis. This mode is quite memory hungry to maximize the analysis performance.')
+        parser_mode.add_argument('-process', action='store_true', help='Enables processes for parallel analysis. This mode maximizes the analysis performance. The database is built once and shared with all the processes.')
         
 
         group_0 = parser_probe.add_mutually_exclusive_group(required=True)
@@ -125,7 +132,15 @@ class traixroute_parser():
                              help='Imports a list of traceroute paths from a traIXroute format (json based) file to detect IXP crossing links. For example see Examples/test.json.')
         group_3.add_argument('-ripejson', '--parse-ripe-json', nargs=1, action='store', type=str,
                              help='Imports a list of traceroute paths from a ripe json format file to detect IXP crossing links.')
+        group_3.add_argument('-scamper', '--parse-scamper', nargs=1, action='store', type=str,
+                             help='Imports a list of traceroute paths from a scamper json (scamper -O json) or warts file to detect IXP crossing links. Warts files are converted with sc_warts2json.')
         
+        group_4 = parser_server.add_mutually_exclusive_group()
+        group_4.add_argument('-unix', '--unix-socket', nargs=1, action='store', type=str,
+                             help='Serves the IXP detection requests over HTTP on the given Unix socket, ~/traixroute/traixroute.sock by default.')
+        group_4.add_argument('-http', '--http', nargs=1, action='store', type=str,
+                             help='Serves the IXP detection requests over HTTP on the given [host:]port, 127.0.0.1 by default.')
+
         options = parser.parse_args()
 
         # Parameterize arguments from subparser probe
@@ -177,6 +192,27 @@ class traixroute_parser():
                 self.flags['useTraiXroute'] = True
                 self.flags['showSourceIP']  = True
                 self.flags['import_is_dir'] = True if os.path.isdir(self.arguments) else False
+            elif (options.parse_scamper is not None):
+                self.arguments = str(options.parse_scamper[0])
+                self.flags['import']        = 3
+                self.flags['useTraiXroute'] = True
+                self.flags['showSourceIP']  = True
+                self.flags['import_is_dir'] = True if os.path.isdir(self.arguments) else False
+
+
+        # Parameterize arguments from subparser server
+        elif (options.subparser_name == 'server'):
+            if (options.http is not None):
+                self.arguments = options.http[0]
+                self.flags['server'] = 'http'
+            else:
+                self.arguments = options.unix_socket[0] if options.unix_socket is not None else ''
+                self.flags['server'] = 'unix'
+            self.flags['useTraiXroute']     = True
+            # The paths are not printed, the requests are logged instead.
+            self.flags['server_log']        = not options.silence_path_print
+            self.flags['silent']            = True
+            self.flags['outputfile_json']   = True
               
         if not options.output_txt or options.output_txt != 'disabled':
             if options.output_txt: 
@@ -188,6 +224,15 @@ class traixroute_parser():
                 self.outputfile_json = options.output_json 
             self.flags['outputfile_json'] = True
         
+        if options.output_ndjson:
+            self.flags['ndjson'] = True
+
+        if options.ordered_output:
+            self.flags['ordered'] = True
+
+        if options.profile:
+            self.flags['profile'] = True
+
         if options.thread:
             self.flags['mode'] = 'thread'
         elif options.process:
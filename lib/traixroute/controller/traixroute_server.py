@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2016 Institute of Computer Science of the Foundation for Research and Technology - Hellas (FORTH)
+# Authors: Michalis Bamiedakis, Dimitris Mavrommatis and George Nomikos
+#
+# Contact Author: George Nomikos
+# Contact Email: gnomikos [at] ics.forth.gr
+#
+# This file is part of traIXroute.
+#
+# traIXroute is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# traIXroute is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with traIXroute.  If not, see <http://www.gnu.org/licenses/>.
+
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn, UnixStreamServer
+from urllib.parse import urlparse, parse_qs
+import threading
+import datetime
+import ujson
+import os
+
+# The formats of the traceroute paths, as the import_flag values of traIXroute.
+FORMATS = {'traixroute': 1, 'ripe': 2, 'scamper': 3}
+
+
+def detect_format(entry):
+    '''
+    Detects the format of a traceroute path.
+    Input:
+        a) entry: The traceroute path in json format.
+    Output:
+        a) The import_flag value of the format.
+    '''
+
+    if isinstance(entry, dict):
+        if entry.get('type') == 'trace' and 'hops' in entry:
+            return FORMATS['scamper']
+        if isinstance(entry.get('result'), list):
+            return FORMATS['ripe']
+    return FORMATS['traixroute']
+
+
+class request_handler(BaseHTTPRequestHandler):
+    '''
+    Handles the requests of the server:
+        a) POST /analyze: Analyzes a traceroute path or a list of paths in the traIXroute, RIPE Atlas or scamper json
+           format, detected from the paths or set with ?format=traixroute|ripe|scamper. It returns the json output of
+           traIXroute, i.e., an object for a path or a list for a list of paths.
+        b) POST /reload: Reloads the database in the background, after updating the datasets with ?update=1.
+        c) GET /status: Returns the status of the server.
+    '''
+
+    server_version = 'traIXroute'
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/status':
+            self.send_json(200, self.server.traixroute.status())
+        else:
+            self.send_json(404, {'error': 'Unknown path ' + url.path})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        body = self.read_body()
+        if body is None:
+            return
+
+        if url.path == '/analyze':
+            try:
+                paths = ujson.loads(body)
+            except ValueError as e:
+                self.send_json(400, {'error': 'Invalid json - ' + str(e)})
+                return
+            single = not isinstance(paths, list)
+            if single:
+                paths = [paths]
+            if not paths:
+                self.send_json(200, [])
+                return
+            kind = query.get('format', [None])[0]
+            if kind is not None and kind not in FORMATS:
+                self.send_json(400, {'error': 'Unknown format ' + kind + ', use one of ' + ', '.join(sorted(FORMATS))})
+                return
+            import_flag = FORMATS[kind] if kind is not None else detect_format(paths[0])
+            try:
+                results = self.server.traixroute.analyze(paths, import_flag)
+            except Exception as e:
+                self.send_json(400, {'error': 'Invalid traceroute path - ' + repr(e)})
+                return
+            self.send_json(200, results[0] if single and results else results)
+        elif url.path == '/reload':
+            update = query.get('update', ['0'])[0] not in ('0', 'false', '')
+            if self.server.traixroute.reload(update):
+                self.send_json(202, {'reloading': True})
+            else:
+                self.send_json(409, {'error': 'The database is already being reloaded.'})
+        else:
+            self.send_json(404, {'error': 'Unknown path ' + url.path})
+
+    def read_body(self):
+        '''
+        Reads the body of a request.
+        Output:
+            a) The body in bytes, None if the request has been rejected.
+        '''
+
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.send_json(411, {'error': 'Invalid Content-Length.'})
+            return None
+        return self.rfile.read(length)
+
+    def send_json(self, code, data):
+        '''
+        Sends a json response.
+        Input:
+            a) code: The HTTP status code.
+            b) data: The response in json format.
+        '''
+
+        body = ujson.dumps(data).encode()
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        # The clients of a Unix socket have no address.
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def log_message(self, format, *args):
+        if self.server.traixroute.verbose:
+            super().log_message(format, *args)
+
+
+class http_server(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class unix_server(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+
+
+class traixroute_server():
+    '''
+    Serves IXP detection requests over HTTP, on a TCP port or a Unix socket, with the database loaded once.
+    The database is reloaded in the background and replaces the loaded one when it is ready, so the requests
+    are served by the old database meanwhile.
+    '''
+
+    def __init__(self, analyzer, reloader, address, unix, verbose=False):
+        '''
+        Input:
+            a) analyzer: A function analyzing a list of traceroute paths in the given format, returning their json output.
+            b) reloader: A function reloading the database, after updating the datasets if its argument is True.
+            c) address: The path of the Unix socket, or [host:]port to listen on TCP.
+            d) unix: True to listen on a Unix socket, False on TCP.
+            e) verbose: True to log the requests.
+        '''
+
+        self.analyzer = analyzer
+        self.reloader = reloader
+        self.address = address
+        self.unix = unix
+        self.verbose = verbose
+        self.lock = threading.Lock()
+        self.reloading = False
+        self.loaded = datetime.datetime.now().isoformat()
+        self.last_reload_error = None
+        self.requests = 0
+        self.paths = 0
+        self.server = None
+
+    def start(self):
+        '''
+        Binds the Unix socket or the TCP port.
+        '''
+
+        if self.unix:
+            if os.path.exists(self.address):
+                os.remove(self.address)
+            self.server = unix_server(self.address, request_handler)
+        else:
+            [host, port] = self.address.rsplit(':', 1) if ':' in self.address else ['127.0.0.1', self.address]
+            self.server = http_server((host, int(port)), request_handler)
+        self.server.traixroute = self
+
+    def serve_forever(self):
+        '''
+        Serves the requests until the server is shut down.
+        '''
+
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            if self.unix and os.path.exists(self.address):
+                os.remove(self.address)
+
+    def shutdown(self):
+        self.server.shutdown()
+
+    def analyze(self, paths, import_flag):
+        '''
+        Analyzes a list of traceroute paths.
+        Input:
+            a) paths: The traceroute paths in json format.
+            b) import_flag: The format of the paths.
+        Output:
+            a) A list with the json output of the paths.
+        '''
+
+        results = self.analyzer(paths, import_flag)
+        with self.lock:
+            self.requests += 1
+            self.paths += len(paths)
+        return results
+
+    def reload(self, update=False):
+        '''
+        Starts reloading the database in the background.
+        Input:
+            a) update: True to update the datasets first.
+        Output:
+            a) True if the reload has started, False if a reload is already running.
+        '''
+
+        with self.lock:
+            if self.reloading:
+                return False
+            self.reloading = True
+        threading.Thread(target=self.run_reload, args=(update,), name='reload', daemon=True).start()
+        return True
+
+    def run_reload(self, update):
+        try:
+            self.reloader(update)
+            error = None
+        except (Exception, SystemExit) as e:
+            error = repr(e)
+            print('Could not reload the database, the loaded database is still used -', error)
+        with self.lock:
+            self.reloading = False
+            self.last_reload_error = error
+            if error is None:
+                self.loaded = datetime.datetime.now().isoformat()
+
+    def status(self):
+        '''
+        Returns the status of the server.
+        Output:
+            a) A dictionary with the loading time of the database, whether it is being reloaded and the number of the
+               analyzed requests and paths.
+        '''
+
+        with self.lock:
+            return {'database_loaded': self.loaded, 'reloading': self.reloading, 'last_reload_error': self.last_reload_error,
+                    'requests': self.requests, 'paths': self.paths}
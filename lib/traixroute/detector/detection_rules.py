@@ -20,13 +20,75 @@
 # You should have received a copy of the GNU General Public License
 # along with traIXroute.  If not, see <http://www.gnu.org/licenses/>.
 
-from traixroute.controller import traixroute_output, string_handler
+from traixroute.controller import traixroute_output, string_handler, profiler
 from traixroute.detector.remote_peering import remote_peering
 from math import fabs
 import os
 import sys
 import itertools
 
+# The ASNs of an unresolved hop, i.e., a single unknown ASN.
+UNRESOLVED = (None,)
+
+
+class rule_condition():
+    '''
+    A condition of the condition part of a rule, e.g., (IXP_IPandAS_M1), with its keywords resolved in advance.
+    '''
+
+    __slots__ = ['expression', 'ixp_ip', 'as_m', 'not_as_m', 'negation', 'conjunction', 'star',
+                 'as_m_link', 'not_as_m_link', 'ixp_ip_link', 'accepted']
+
+    def __init__(self, rule, i, find_numbers, is_int):
+        '''
+        Input:
+            a) rule: The condition part of the rule as a list of strings.
+            b) i: The position of the condition in the rule.
+            c) find_numbers, is_int: The functions to extract the concatenated numbers of the keywords.
+        '''
+
+        expression = rule[i]
+        self.expression = expression
+        self.ixp_ip = 'IXP_IP' in expression
+        self.as_m = 'AS_M' in expression
+        self.not_as_m = '!AS_M' in expression
+        self.negation = '!' in expression
+        self.conjunction = 'and' in expression
+        self.star = '*' in expression
+
+        # True if the concatenated numbers of a keyword in this and the next condition are equal, False if they
+        # differ and None if the keyword is not numbered in both of them.
+        def link(str_to_chk):
+            [final1, final2] = find_numbers(rule, str_to_chk, i)
+            if final1 == '' or final2 == '' or not is_int(final1) or not is_int(final2):
+                return None
+            return final1 == final2
+
+        self.as_m_link = link('AS_M')
+        self.not_as_m_link = link('!AS_M')
+        self.ixp_ip_link = link('IXP_IP')
+        # self.accepted: A dictionary with {encounter type}=True if the condition can be applied to a hop of this type.
+        self.accepted = {}
+
+    def accepts(self, encounter_type):
+        '''
+        Checks if the condition can be applied to a hop based on the type of the hop.
+        Input:
+            a) encounter_type: The type of the hop (IXP IP, IXP prefix, Normal IP, Unresolved).
+        Output:
+            True if the condition can be applied, False otherwise.
+        '''
+
+        accepted = self.accepted.get(encounter_type)
+        if accepted is None:
+            accepted = not (
+                (self.ixp_ip and self.not_as_m and 'IXP prefix' not in encounter_type and 'IXP IP' not in encounter_type) or
+                (self.ixp_ip and self.as_m and not self.negation and 'IXP IP' not in encounter_type) or
+                ((not self.ixp_ip or not self.not_as_m) and 'IXP prefix' in encounter_type) or
+                ((not self.ixp_ip or not self.as_m) and 'IXP IP' in encounter_type))
+            self.accepted[encounter_type] = accepted
+        return accepted
+
 
 class detection_rules():
     '''
@@ -40,14 +102,19 @@ class detection_rules():
         self.rules = []
         # asmt: A list of the assessment parts of the rules.
         self.asmt = []
+        # conditions: A list with the compiled conditions of each rule.
+        self.conditions = []
+        # applicable: A dictionary with {(current hop, hop types of the window)}=the indexes of the applicable rules.
+        self.applicable = {}
         # remote_peering: An instance of the remote peering class.
         self.remote_peering = remote_peering()
 
-    def rules_extract(self, mypath):
+    def rules_extract(self, mypath, silent=False):
         '''
         Opens the rules.txt file and loads the IXP detection rules.
         Input: 
-            a) file: The file that contains the rules.
+            a) mypath: The folder with the configuration/rules.txt file.
+            b) silent: True to raise a ValueError with the errors instead of printing them and exiting, e.g., for the library API.
         '''
         
         file = '/configuration/rules.txt'
@@ -55,12 +122,16 @@ class detection_rules():
             with open(mypath + '/configuration/rules.txt', 'r') as f:
                 rules = [line.strip() for line in f.readlines()]
         except:
+            if silent:
+                raise ValueError(mypath + file + ' does not exist.')
             print(file + ' does not exist. Exiting.')
             sys.exit(0)
         [delimiters, expressions] = self.load_syntax_rules(
-            'configuration/expressions.txt', 'configuration/delimeters.txt', mypath)
+            'configuration/expressions.txt', 'configuration/delimeters.txt', mypath, silent)
         
         general_flag = True   
+        # errors: The errors of the rules that have not been included.
+        errors = []
         for i,item in enumerate(rules):
             temp = item.split('#')
             temp[0] = temp[0].replace(' ', '')
@@ -70,7 +141,7 @@ class detection_rules():
                 if len(temp) != 2:
                     flag = False
                     general_flag = False
-                    print('-->Error with rule in line ' + (str(i + 1)) +
+                    errors.append('-->Error with rule in line ' + (str(i + 1)) +
                           'not included. Expected one condition and one assessment part respectively.')
                     
                 array = temp[0].split('-')
@@ -78,37 +149,37 @@ class detection_rules():
                     if len(array) > 3:
                         flag = False
                         general_flag = False
-                        print('-->Error with rule in line ' + (str(i + 1)) +
+                        errors.append('-->Error with rule in line ' + (str(i + 1)) +
                               ' not included. Expected a maximum rule length of 3.')
                     elif len(array) < 2:
                         flag = False
                         general_flag = False
-                        print('-->Error with rule in line ' + (str(i + 1)) +
+                        errors.append('-->Error with rule in line ' + (str(i + 1)) +
                               ' not included. Expected a minimum rule length of 2.')
                     elif '(' in node and ')' not in node:
                         flag = False
                         general_flag = False
-                        print('-->Error with rule in line ' + (str(i + 1)) +
+                        errors.append('-->Error with rule in line ' + (str(i + 1)) +
                               ' not included. Expected \')\' at the end of ' + node + '.')
                     elif '(' in node and 'and' not in node:
                         flag = False
                         general_flag = False
-                        print('-->Error with rule in line ' + (str(i + 1)) +
+                        errors.append('-->Error with rule in line ' + (str(i + 1)) +
                               ' not included. Expected 1 \'and\' at the middle of ' + node + '.')
                     elif ')' in node and '(' not in node:
                         flag = False
                         general_flag = False
-                        print('-->Error with rule in line ' + (str(i + 1)) +
+                        errors.append('-->Error with rule in line ' + (str(i + 1)) +
                               ' not included. Expected one \'(\' at the beginning of ' + node + '.')
                     elif node.count('(') > 1:
                         flag = False
                         general_flag = False
-                        print('-->Error with rule in line ' + (str(i + 1)) +
+                        errors.append('-->Error with rule in line ' + (str(i + 1)) +
                               ' not included. Expected only 1 \'(\' at the beginning of ' + node + '.')
                     elif node.count(')') > 1:
                         flag = False
                         general_flag = False
-                        print('-->Error with rule in line ' + (str(i + 1)) +
+                        errors.append('-->Error with rule in line ' + (str(i + 1)) +
                               ' not included. Expected only 1 \')\' at the end of ' + node + '.')
                         
                     node = node.replace('(', '')
@@ -116,30 +187,35 @@ class detection_rules():
                     if not self.check_syntax_rules(node, expressions, delimiters):
                         flag = False
                         general_flag = False
-                        print('-->Error with rule in line ' + (str(i + 1)) +
+                        errors.append('-->Error with rule in line ' + (str(i + 1)) +
                               ' not included. Wrong syntax in ' + node + '.')
                 if 'IXP_IP' not in temp[0]:
                     flag = False
                     general_flag = False
-                    print('-->Error with rule in line ' + (str(i + 1)) +
+                    errors.append('-->Error with rule in line ' + (str(i + 1)) +
                           ' not included. Expected an IXP_IP in ' + temp[0] + '.')
                 elif flag:
                     node = temp[1].replace(' ', '')
                     if 'a' != node and 'b' != node and 'aorb' != node and 'aandb' != node and '?' != node:
                         flag = False
                         general_flag = False
-                        print('-->Error with rule in line ' + (str(i + 1)) +
+                        errors.append('-->Error with rule in line ' + (str(i + 1)) +
                               ' not included. Expected a valid assessment (e.g., a, b, a or b, a and b).')
                 
                 if flag:
                     self.rules.append(array)
+                    self.conditions.append([rule_condition(array, j, self.find_numbers, self.is_int) for j in range(len(array))])
                     self.remote_peering.check_rule(array, len(self.rules) - 1)
                     self.asmt.append(temp[1])
                     
         if general_flag:
-            output = traixroute_output.traixroute_output()
-            output.print_rules_number(self.rules, mypath+file)
+            if not silent:
+                output = traixroute_output.traixroute_output()
+                output.print_rules_number(self.rules, mypath+file)
+        elif silent:
+            raise ValueError('\n'.join(errors))
         else:
+            print('\n'.join(errors))
             sys.exit(0)
 
     def resolve_path(self, path, output, path_info_extract, db_extract, traIXparser):
@@ -161,25 +237,42 @@ class detection_rules():
         # asn2names : Contains the total IXP membership info for each ASN.
         # asn2names: {'ASN': [IXP long name, IXP short name ]}
         asn2names = db_extract.asnmemb
+        ixp_index = db_extract.ixp_index
         cc_tree = db_extract.cc_tree
         self.remote_peering.rp_database = db_extract.remote_peering
+        record = profiler.current()
         
         # Info related to the candidate traceroute path.
         path_asn = path_info_extract.asn_list
-        temp_path_asn = [''] * len(path_asn)
+        temp_path_asn = [None] * len(path_asn)
         encounter_type = path_info_extract.type_vector
         ixp_ip_indices = path_info_extract.ixp_ip_indices
         ixp_long = path_info_extract.ixp_long_names
         ixp_short = path_info_extract.ixp_short_names
         
         for i in ixp_ip_indices:
-            asn_list1 = path_asn[i - 1].split('_')
-            asn_list3 = path_asn[i].split('_')
+            asn_list1 = path_asn[i - 1] or UNRESOLVED
+            asn_list3 = path_asn[i] or UNRESOLVED
             if len(path) > i + 1:
-                asn_list2 = path_asn[i + 1].split('_')
+                asn_list2 = path_asn[i + 1] or UNRESOLVED
             else:
-                asn_list2 = '*'
+                asn_list2 = UNRESOLVED
                 
+            # The hop window of the current IXP IP.
+            current_hop = 1
+            if i < len(path) - 1:
+                window = slice(i - 1, i + 2)
+            else:
+                window = slice(i - 1, i + 1)
+            temp_ixp_long = ixp_long[window]
+            temp_ixp_short = ixp_short[window]
+            cur_encounter_type = encounter_type[window]
+            cur_path = path[window]
+            set_ixp_short = list(itertools.product(*temp_ixp_short))
+            set_ixp_long = list(itertools.product(*temp_ixp_long))
+            # Only the rules matching the hop types of the window are checked.
+            applicable = self.applicable_rules(current_hop, cur_encounter_type)
+
             for asn1 in asn_list1:
                 # In case of MOAS, all the possible AS paths are checked for
                 # IXP crossing.
@@ -189,39 +282,21 @@ class detection_rules():
                         temp_path_asn[i] = asn3
                         if len(path_asn) > i + 1:
                             temp_path_asn[i + 1] = asn2
+                        cur_path_asn = temp_path_asn[window]
                         
-                        for j,item_rule in enumerate(self.rules):
-                            cur_rule = item_rule
+                        for j in applicable:
                             cur_asmt = self.asmt[j]
-#                            print('cur_rule',cur_rule)
 
                             # Check if the condition part of a candidate rule
                             # is satisfied in order to proceed with the
                             # assessment part.
-                            current_hop = 1
-                            if i < len(path) - 1:
-                                cur_path_asn = temp_path_asn[i - 1:i + 2]
-                                temp_ixp_long = ixp_long[i - 1:i + 2]
-                                temp_ixp_short = ixp_short[i - 1:i + 2]
-                                cur_encounter_type = encounter_type[i - 1:i + 2]
-                                cur_path = path[i - 1:i + 2]
-                            else:
-                                cur_path_asn = temp_path_asn[i - 1:i + 1]
-                                temp_ixp_long = ixp_long[i - 1:i + 1]
-                                temp_ixp_short = ixp_short[i - 1:i + 1]
-                                cur_encounter_type = encounter_type[i - 1:i + 1]
-                                cur_path = path[i - 1:i + 1]
-#                            print('cur_path',cur_path)
-#                            print('cur_path_asn',cur_path_asn)
-                            
-                            set_ixp_short = list(itertools.product(*temp_ixp_short))
-                            set_ixp_long = list(itertools.product(*temp_ixp_long))
-                            
                             for ixp in range(0, len(set_ixp_short)):
                                 cur_ixp_long = list(set_ixp_long[ixp])
                                 cur_ixp_short = list(set_ixp_short[ixp])
+                                if record is not None:
+                                    record.count_rule(j)
                                 rule_check = self.check_rules(
-                                    cur_path, cur_rule, cur_path_asn, current_hop, cur_ixp_long, cur_ixp_short, asn2names, cur_encounter_type)
+                                    cur_path, j, cur_path_asn, current_hop, cur_ixp_long, cur_ixp_short, asn2names, cur_encounter_type, ixp_index)
                                 if rule_check:
                                     if cur_asmt != '?':
                                         rule_hits[j] += 1
@@ -233,205 +308,165 @@ class detection_rules():
                                     num += 1
         return rule_hits
 
-    def check_rules(self, path, rule, path_asn, path_cur, ixp_long, ixp_short, asn2names, encounter_type):
+    def applicable_rules(self, path_cur, encounter_type):
+        '''
+        Finds the rules whose conditions can be applied to the hop types of a window.
+        Input:
+            a) path_cur: The current hop in the window.
+            b) encounter_type: The types of the hops in the window (IXP IP, IXP Prefix, Normal IP, Illegal IP).
+        Output:
+            A list with the indexes of the applicable rules.
+        '''
+
+        key = (path_cur,) + tuple(encounter_type)
+        applicable = self.applicable.get(key)
+        if applicable is None:
+            applicable = []
+            for j, conditions in enumerate(self.conditions):
+                if len(conditions) > len(encounter_type):
+                    continue
+                if all(condition.accepts(encounter_type[path_cur + i - 1]) for i, condition in enumerate(conditions)
+                       if len(encounter_type) > path_cur + i - 1):
+                    applicable.append(j)
+            self.applicable[key] = applicable
+        return applicable
+
+    def check_rules(self, path, j, path_asn, path_cur, ixp_long, ixp_short, asn2names, encounter_type, ixp_index=None):
         '''                      
-        Checks if the condition part of a rule is satisfied.
+        Checks if the condition part of a rule is satisfied. The rule has to be applicable to the hop types of the window (see applicable_rules).
         Input:
-            a) rule: The condition part of the candidate IXP detection rule.
-            b) path_asn: The AS path.
+            a) j: The index of the candidate IXP detection rule.
+            b) path_asn: The AS path, with the ASNs in integer format and None for the unresolved hops.
             c) path_cur: The current hop in the path.
             d) ixp_long, ixp_short: The long and short IXP names.
             e) asn2names: A dictionary with a list of lists of short and long IXP names in which an AS is member - {ASN}=[[name long,name short],[name long,name short]...].
             f) encounter_type: The resolved IP path based on the encountered types (IXP IP, IXP Prefix, Normal IP, Illegal IP).
             g) path: The IP path.
+            h) ixp_index: The index of the IXP memberships of the ASes.
         Output:
             True if the expression is satisfied, False otherwise.
         '''
 
-        if len(rule) > len(path_asn):
-            return False
-        for i,item in enumerate(rule):
-            if len(path_asn) > path_cur + i - 1:
-                if ('IXP_IP' in item and '!AS_M' in item) and 'IXP prefix' not in encounter_type[path_cur + i - 1] and 'IXP IP' not in encounter_type[path_cur + i - 1]:
-                    return False
-                elif 'IXP_IP' in item and 'AS_M' in item and '!' not in item and 'IXP IP' not in encounter_type[path_cur + i - 1]:
-                    return False
-                elif ('IXP_IP' not in item or '!AS_M' not in item) and 'IXP prefix' in encounter_type[path_cur + i - 1]:
-                    return False
-                elif ('IXP_IP' not in item or 'AS_M' not in item) and 'IXP IP' in encounter_type[path_cur + i - 1]:
-                    return False
-
         # Applies each condition of the condition part of the candidate rule onto the path.
-        string_h = string_handler.string_handler()
         check = 0
-        for i,expression in enumerate(rule):
+        for i,condition in enumerate(self.conditions[j]):
         
             # The current condition of the condition part of the rule.
             current = path_cur + i - 1
 
             # Checking for IXP membership based on a non-IXP IP.
-            if '!AS_M' in expression and 'and' not in expression and path_cur != current:
+            if condition.not_as_m and not condition.conjunction and path_cur != current:
                # Finds the path_asn in the routeview path_asn dict. If not, an
                # assessment is not possible.
                 check += 1
-                if path_asn[current] == '*' and encounter_type[current] != 'IXP prefix':
+                if path_asn[current] is None and encounter_type[current] != 'IXP prefix':
                     return False
 
                 if encounter_type[path_cur] == 'IXP IP' or encounter_type[path_cur] == 'IXP prefix':
-                    as_names = ''
-                    if path_asn[current] in asn2names.keys():
-                        as_names = asn2names[path_asn[current]]
-                        ix_long = ixp_long[path_cur]
-                        ix_short = ixp_short[path_cur]
-                else:
-                    as_names = ''
-                    if path_asn[path_cur] in asn2names.keys():
-                        as_names = asn2names[path_asn[path_cur]]
-                        ix_long = ixp_long[current]
-                        ix_short = ixp_short[current]
-                for node in as_names:
-                    for name in node:
-                        if (string_h.string_comparison(ix_long, name) or string_h.string_comparison(ix_short, name)):
-                            return False
-                if not self.check_number(rule, expression, path_asn, current, i, encounter_type, '!AS_M'):
+                    if self.is_member(path_asn[current], ixp_long[path_cur], ixp_short[path_cur], asn2names, ixp_index):
+                        return False
+                elif self.is_member(path_asn[path_cur], ixp_long[current], ixp_short[current], asn2names, ixp_index):
+                    return False
+                if not self.check_number(condition.not_as_m_link, path_asn, current):
                     return False
 
-            elif 'AS_M' in expression and 'and' not in expression and path_cur != current:
-                if path_asn[current] == '*' and encounter_type[current] != 'IXP prefix':
+            elif condition.as_m and not condition.conjunction and path_cur != current:
+                if path_asn[current] is None and encounter_type[current] != 'IXP prefix':
                     return False
                 check += 1
-                flag = False
 
                 if encounter_type[path_cur] == 'IXP IP' or encounter_type[path_cur] == 'IXP prefix':
-                    as_names = ''
-                    if path_asn[current] in asn2names.keys():
-                        as_names = asn2names[path_asn[current]]
-                    ix_long = ixp_long[path_cur]
-                    ix_short = ixp_short[path_cur]
+                    flag = self.is_member(path_asn[current], ixp_long[path_cur], ixp_short[path_cur], asn2names, ixp_index)
                 else:
-                    as_names = ''
-                    if path_asn[path_cur] in asn2names.keys():
-                        as_names = asn2names[path_asn[path_cur]]
-                    ix_long = ixp_long[current]
-                    ix_short = ixp_short[current]
-                for node in (as_names):
-                    for name in node:
-                        if string_h.string_comparison(ix_long, name) or string_h.string_comparison(ix_short, name):
-                            flag = 1
-                            break
+                    flag = self.is_member(path_asn[path_cur], ixp_long[current], ixp_short[current], asn2names, ixp_index)
                 if not flag:
                     return False
-                if not self.check_number(rule, expression, path_asn, current, i, encounter_type, 'AS_M'):
+                if not self.check_number(condition.as_m_link, path_asn, current):
                     return False
 
-            if '*' in expression and path[current] != '*':
+            if condition.star and path[current] != '*':
                 return False
             # Checking for IXP IP or Prefix based on either IXP membership or
             # Prefixes data.
-            if 'IXP_IP' in expression and '!AS_M' in expression:
+            if condition.ixp_ip and condition.not_as_m:
                 check += 1
-                if not self.check_names(rule, expression, current, i, encounter_type, 'IXP_IP', ixp_long, ixp_short):
+                if not self.check_names(condition.ixp_ip_link, current, ixp_long, ixp_short):
                     return False
-                elif not self.check_number(rule, expression, path_asn, current, i, encounter_type, '!AS_M'):
+                elif not self.check_number(condition.not_as_m_link, path_asn, current):
                     return False
-            elif 'IXP_IP' in expression and 'AS_M' in expression:
+            elif condition.ixp_ip and condition.as_m:
                 check += 1
-                if not self.check_names(rule, expression, current, i, encounter_type, 'IXP_IP', ixp_long, ixp_short):
+                if not self.check_names(condition.ixp_ip_link, current, ixp_long, ixp_short):
                     return False
-                elif not self.check_number(rule, expression, path_asn, current, i, encounter_type, 'AS_M'):
+                elif not self.check_number(condition.as_m_link, path_asn, current):
                     return False
 
-        if len(rule) > 2 and len(path_asn) > current + 1:
-            check += 1
-            if not self.check_edges(rule, path_asn, current, 'AS_M', ixp_long, ixp_short):
-                return False
-            elif not self.check_edges(rule, path_asn, current, 'IXP_IP', ixp_long, ixp_short):
-                return False
         if check:
             return True
         else:
             return False
 
-    def check_edges(self, rule, path_asn, current, str_to_chk, ixp_long, ixp_short):
+    def is_member(self, asn, ix_long, ix_short, asn2names, ixp_index):
         '''
-        Checks the similarity of the concatenated numbers in case of AS_M and IXP_IP keywords of the border hops of a rule with hop window of size three.
+        Checks if an AS is member of an IXP with names similar to the given IXP names.
         Input:
-            a) rule: The current rule.
-            b) path_asn: The AS path.
-            c) current: The current hop in the path.
-            d) str_to_chk: The condition keyword of the rule.
-            e) ixp_long,ixp_short: The long and short IXP names.
-        Output: 
-            True if the condition is satisfied, False otherwise.
+            a) asn: The ASN in integer format, None for an unresolved hop.
+            b) ix_long, ix_short: The IXP long and short names.
+            c) asn2names: A dictionary with {ASN}=[[name long,name short],[name long,name short]...].
+            d) ixp_index: The index of the IXP memberships of the ASes.
+        Output:
+            True if the AS is member of the IXP, False otherwise.
         '''
-        
-        [final1, final2] = self.find_numbers(rule, str_to_chk, current, False)
 
-        if final1 == '' or final2 == '':
-            return True
-        if self.is_int(final1) and self.is_int(final2) and 'AS_M' in str_chk:
-            if (final1 == final2 and path_asn[current - 1] != path_asn[current + 1]) or (final1 != final2 and path_asn[current - 1] == path_asn[current + 1]):
-                return False
-        elif self.is_int(final1) and self.is_int(final2) and 'IXP_IP' in str_chk:
-            string_hanlde = string_handler.string_handler()
-            flag = (string_handle.string_comparison(ixp_long[current - 1], ixp_long[
-                    current + 1]) or string_handle.string_comparison(ixp_short[current - 1], ixp_short[current + 1]))
-            if (final1 == final2 and not flag) or (final1 != final2 and flag):
-                return False
-        return True
+        if asn not in asn2names:
+            return False
+        if ixp_index is not None:
+            member = ixp_index.is_member(asn, ix_long, ix_short)
+            if member is not None:
+                return member
+
+        # The IXP names are not indexed, e.g., for IPs mapping to more than one IXP.
+        string_h = string_handler.string_handler()
+        for node in asn2names[asn]:
+            for name in node:
+                if string_h.string_comparison(ix_long, name) or string_h.string_comparison(ix_short, name):
+                    return True
+        return False
 
-    def check_number(self, rule, expression, path_asn, current, i, encounter_type, str_to_chk):
+    def check_number(self, link, path_asn, current):
         '''
         Checks the similarity of the concatenated numbers in case of AS_M keyword for consecutive hops in the path.
         Input:
-            a) rule: The current rule.
-            b) expression: The current condition of the condition part of the rule.
-            c) path_asn: The AS path.
-            d) current: The current hop in the path.
-            e) i: The hop of the current condition in the rule.
-            f) encounter_type: The resolved IP path based on the encountered types (IXP IP, IXP Prefix, Normal IP, Illegal IP).
-            g) str_to_chk: The condition keyword of the rule.
-            h) path: The current IP path.
+            a) link: True if the concatenated numbers of the current and the next condition are equal, False if they differ, None if they are not set.
+            b) path_asn: The AS path.
+            c) current: The current hop in the path.
         Output:
             True if the condition is satisfied, False otherwise.
         '''
         
-        if len(rule) > i + 1 and len(path_asn) > current + 1:
-
-            [final1, final2] = self.find_numbers(rule, str_to_chk, current, True)
-            if final1 == '' or final2 == '':
-                return True
-            if self.is_int(final1) and self.is_int(final2):
-                if (final1 == final2 and path_asn[current] != path_asn[current + 1]) or (final1 != final2 and path_asn[current] == path_asn[current + 1]):
-                    return False
+        if link is not None and len(path_asn) > current + 1:
+            if link != (path_asn[current] == path_asn[current + 1]):
+                return False
         return True
 
-    def check_names(self, rule, expression, current, i, encounter_type, str_to_chk, ixp_long, ixp_short):
+    def check_names(self, link, current, ixp_long, ixp_short):
         '''
         Checks the similarity of the concatenated numbers in case of IXP_IP keyword for consecutive IXP IPs in the path.
         It also compares the IXP short and long names.
         Input:
-            a) rule: The current rule.
-            b) expression: The current condition of the condition part of the rule.
-            c) i: The hop of the current condition in the rule.
-            d) encounter_type: The resolved IP path based on the encountered types (IXP IP, IXP Prefix, Normal IP, Illegal IP).
-            e) str_to_chk: The condition keyword of the rule.
-            d) ixp_long,ixp_short: The IXP long and short names.
+            a) link: True if the concatenated numbers of the current and the next condition are equal, False if they differ, None if they are not set.
+            b) current: The current hop in the path.
+            c) ixp_long,ixp_short: The IXP long and short names.
         Output:
             True if the condition is satisfied, False otherwise.
         '''
         
-        string_handle = string_handler.string_handler()
-        if len(rule) > i + 1 and len(ixp_long) > current + 1:
-            [final1, final2] = self.find_numbers(
-                rule, str_to_chk, current, True)
-            if final1 == '' or final2 == '':
-                return True
-            if self.is_int(final1) and self.is_int(final2):
-                flag = (string_handle.string_comparison(ixp_long[current], ixp_long[
-                        current + 1]) or string_handle.string_comparison(ixp_short[current], ixp_short[current + 1]))
-                if (final1 == final2 and not flag) or (final1 != final2 and flag):
-                    return False
+        if link is not None and len(ixp_long) > current + 1:
+            string_handle = string_handler.string_handler()
+            flag = (string_handle.string_comparison(ixp_long[current], ixp_long[
+                    current + 1]) or string_handle.string_comparison(ixp_short[current], ixp_short[current + 1]))
+            if link != flag:
+                return False
 
         return True
 
@@ -450,39 +485,36 @@ class detection_rules():
         except ValueError:
             return False
 
-    def find_numbers(self, rule, str_to_chk, i, consecutive):
+    def find_numbers(self, rule, str_to_chk, i):
         '''
-        Finds the concatenated numbers in keywords.
+        Finds the concatenated numbers in keywords of two consecutive conditions.
         Input:
             a) rule: The current rule.
             b) str_to_chk: The candidate keyword to check.
             c) i: The current part of the rule.
-            d) consecutive: True for consecutive hops, False for border hops.
         Output:
             a) final1,final2: The concatenated numbers of the keywords.
         '''
         
         final1 = ''
         final2 = ''
-        if consecutive:
-            j = i + 1
-        else:
-            j = i + 2
         try:
             final1 = rule[i].split(str_to_chk)[1][:1]
-            final2 = rule[j].split(str_to_chk)[1][:1]
+            final2 = rule[i + 1].split(str_to_chk)[1][:1]
         except:
             pass
         
         return (final1, final2)
 
-    def load_syntax_rules(self, filename1, filename2, mypath):
+    def load_syntax_rules(self, filename1, filename2, mypath, silent=False):
         '''
         Loads the allowed rule keywords and the allowed delimeters between the keywords. It defines the syntax
         of the rules.
         Input:
             a) filename1: The expressions.txt file name.
             b) filename2: The delimeters.txt file name.
+            c) mypath: The folder with the files.
+            d) silent: True to raise a ValueError instead of printing the errors and exiting.
         Output:
             a) delimeters1: A list containing the delimeters that separate the keywords.
             b) expressions: A list containing the allowed keywords. 
@@ -493,6 +525,8 @@ class detection_rules():
                 with open(filename) as f:
                     return [line.strip() for line in f.readlines()]
             except:
+                if silent:
+                    raise ValueError(filename + ' not found.')
                 print(filename + ' not found. Exiting.')
                 sys.exit(0)
 
@@ -501,6 +535,8 @@ class detection_rules():
 
         candidate_delimiters = [del_node.split('#')[0] for del_node in delimiter_dump if del_node.split('#')[0]]
         if len(candidate_delimiters) != 1:
+            if silent:
+                raise ValueError('Expected one line of delimeters in ' + filename2 + '.')
             print('Expected one line of delimeters in ' +
                   filename2 + '. Exiting.')
             sys.exit(0)
@@ -20,12 +20,14 @@
 # You should have received a copy of the GNU General Public License
 # along with traIXroute.  If not, see <http://www.gnu.org/licenses/>.
 
-from urllib.request import urlretrieve, urlopen
-import shutil
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import requests
+import threading
+import hashlib
+import time
 import ujson
 import os
-import shutil
-import subprocess
 import concurrent.futures
 import sys
 import json
@@ -53,21 +55,49 @@ class download_files():
         self.ixp_subnet = config["pch"]["ixp_subnet"]
         self.caida_log = config["caida_log"]
 
+        # The number of concurrent PCH requests, the retries of each request and the validity of the cached
+        # PCH responses in seconds.
+        self.pch_workers = max(1, config.get("pch_workers", 16))
+        self.pch_retries = config.get("pch_retries", 5)
+        self.pch_cache_ttl = config.get("pch_cache_ttl", 86400)
+
         self.homepath = destination_path
+        # The PCH responses are cached per IXP, so that an interrupted update resumes from the IXPs
+        # that have not been fetched yet.
+        self.cache_path = destination_path + '/cache/PCH'
+
+        # self.sources: A dictionary with {url or file}={'etag', 'last_modified', 'sha256', 'name'} of the downloaded
+        # datasets, to download and merge again only the datasets that have changed.
+        self.sources_file = destination_path + '/database/sources.json'
+        self.sources = None
+        self.sources_lock = threading.Lock()
+        # self.updated: The datasets that have changed during the update, i.e., 'PDB', 'PCH' and 'RouteViews'.
+        self.updated = set()
+
+    def __getstate__(self):
+        '''
+        Excludes the lock from the state sent to the worker processes.
+        '''
+
+        state = self.__dict__.copy()
+        state['sources_lock'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.sources_lock = threading.Lock()
 
     def start_download(self):
         '''
-        Downloads and checks whether all the needed files have been downloaded successfully.
+        Downloads and checks whether all the needed files have been downloaded successfully. Only the datasets that
+        have changed since the last update are downloaded, and they are recorded in check_update.txt to be merged again.
         Output:
             a) True if the files have been downloaded successfully, False otherwise.
         '''
 
-        if os.path.exists(self.homepath + '/database'):
-            shutil.rmtree(self.homepath + '/database')
-        os.makedirs(self.homepath + '/database')
-        os.makedirs(self.homepath + '/database/PCH')
-        os.makedirs(self.homepath + '/database/PDB')
-        os.makedirs(self.homepath + '/database/RouteViews')
+        for folder in ['/database', '/database/PCH', '/database/PDB', '/database/RouteViews']:
+            if not os.path.exists(self.homepath + folder):
+                os.makedirs(self.homepath + folder)
         # Setting shared variables to use multiple processes.
         peering = False
         pch = False
@@ -79,13 +109,116 @@ class download_files():
             pch = executor.submit(self.download_pch, 0)
             routeviews = executor.submit(
                 self.download_routeviews)
+        outcome = routeviews.result() and peering.result() and pch.result()
 
-        if routeviews.result() and peering.result() and pch.result():
+        # The changed datasets are merged again, even if another dataset could not be downloaded.
+        if self.updated:
+            try:
+                with open(self.homepath + "/configuration/check_update.txt", "r") as f:
+                    self.updated |= set(f.readline().strip().split(',')) - {''}
+            except OSError:
+                pass
             with open(self.homepath + "/configuration/check_update.txt", "w") as f:
-                f.write("1")
-            return True
-        else:
+                f.write(','.join(sorted(self.updated)))
+        return outcome
+
+    def http_session(self, pool_size=1):
+        '''
+        Creates an http session reusing its connections and retrying the failed requests with backoff.
+        Input:
+            a) pool_size: The number of connections kept open per host.
+        Output:
+            a) The requests.Session instance.
+        '''
+
+        session = requests.Session()
+        retry = Retry(total=self.pch_retries, backoff_factor=0.5,
+                      status_forcelist=(429, 500, 502, 503, 504))
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def load_sources(self):
+        '''
+        Loads the validators of the downloaded datasets, once.
+        '''
+
+        with self.sources_lock:
+            if self.sources is None:
+                try:
+                    with open(self.sources_file, 'r') as f:
+                        self.sources = ujson.load(f)
+                except (OSError, ValueError):
+                    self.sources = {}
+
+    def save_sources(self):
+        '''
+        Stores the validators of the downloaded datasets.
+        '''
+
+        with self.sources_lock:
+            with open(self.sources_file + '.tmp', 'w') as f:
+                ujson.dump(self.sources, f)
+            os.replace(self.sources_file + '.tmp', self.sources_file)
+
+    def file_changed(self, filename):
+        '''
+        Compares the content hash of a file with the one recorded in the last update and records the new one.
+        Input:
+            a) filename: The file.
+        Output:
+            a) True if the file has changed, False otherwise.
+        '''
+
+        digest = hashlib.sha256()
+        with open(filename, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        digest = digest.hexdigest()
+        self.load_sources()
+        with self.sources_lock:
+            changed = self.sources.get(filename, {}).get('sha256') != digest
+            self.sources[filename] = {'sha256': digest}
+        return changed
+
+    def fetch_source(self, session, url, filename):
+        '''
+        Downloads a dataset file, unless it has not changed since the last update according to its ETag,
+        Last-Modified header or content hash.
+        Input:
+            a) session: The requests.Session instance.
+            b) url: The url of the file.
+            c) filename: The local file.
+        Output:
+            a) True if the file has changed, False otherwise.
+        '''
+
+        self.load_sources()
+        entry = self.sources.get(url, {})
+        headers = {}
+        if os.path.exists(filename):
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        response = session.get(url, headers=headers, timeout=300)
+        if response.status_code == 304:
             return False
+        response.raise_for_status()
+
+        content = response.content
+        digest = hashlib.sha256(content).hexdigest()
+        changed = not os.path.exists(filename) or entry.get('sha256') != digest
+        if changed:
+            with open(filename + '.tmp', 'wb') as f:
+                f.write(content)
+            os.replace(filename + '.tmp', filename)
+        with self.sources_lock:
+            self.sources[url] = {'etag': response.headers.get('ETag'),
+                                 'last_modified': response.headers.get('Last-Modified'), 'sha256': digest}
+        return changed
 
     def download_peering(self, option):
         '''
@@ -97,49 +230,40 @@ class download_files():
          '''
 
         print('Started downloading PDB dataset.')
+        changed = False
+        session = self.http_session()
         try:
-            if option == 1 or not option:
-                request = self.ixpfx
-                response = urlopen(request)
-                str_response = response.read().decode('utf-8')
-                obj = ujson.loads(str_response)
-
-                with open(self.homepath + '/database/PDB/ixpfx.json', 'w') as f:
-                    ujson.dump(obj, f)
-
-            if option == 2 or not option:
-                request = self.ix
-                response = urlopen(request)
-                str_response = response.read().decode('utf-8')
-                obj = ujson.loads(str_response)
-
-                with open(self.homepath + '/database/PDB/ix.json', 'w') as f:
-                    ujson.dump(obj, f)
-
-            if option == 3 or not option:
-                request = self.netixlan
-                response = urlopen(request)
-                str_response = response.read().decode('utf-8')
-                obj = ujson.loads(str_response)
-
-                with open(self.homepath + '/database/PDB/netixlan.json', 'w') as f:
-                    ujson.dump(obj, f)
-
-            if option == 4 or not option:
-                request = self.ixlan
-                response = urlopen(request)
-                str_response = response.read().decode('utf-8')
-                obj = ujson.loads(str_response)
-
-                with open(self.homepath + '/database/PDB/ixlan.json', 'w') as f:
-                    ujson.dump(obj, f)
+            for number, url, filename in [(1, self.ixpfx, 'ixpfx.json'), (2, self.ix, 'ix.json'),
+                                          (3, self.netixlan, 'netixlan.json'), (4, self.ixlan, 'ixlan.json')]:
+                if option == number or not option:
+                    changed = self.fetch_source(session, url, self.homepath + '/database/PDB/' + filename) or changed
         except Exception as e:
             print(str(e))
             print('PDB dataset cannot be updated.')
             return False
-        print('PDB dataset has been updated successfully.')
+        finally:
+            session.close()
+            self.record_update('PDB', changed)
+
+        if changed:
+            print('PDB dataset has been updated successfully.')
+        else:
+            print('PDB dataset is up-to-date.')
         return True
 
+    def record_update(self, dataset, changed):
+        '''
+        Records a dataset that has changed, to merge it again, and stores the validators of the downloaded files.
+        Input:
+            a) dataset: 'PDB', 'PCH' or 'RouteViews'.
+            b) changed: True if the dataset has changed.
+        '''
+
+        if changed:
+            self.updated.add(dataset)
+        if self.sources is not None:
+            self.save_sources()
+
     def download_pch(self, option):
         '''
         Downloads the PCH files.
@@ -150,179 +274,258 @@ class download_files():
         '''
 
         print('Started downloading PCH dataset.')
-        if option == 2 or not option:
-            try:
-                print("Downloading PCH directory datasets")
-                urlretrieve(self.ixp_exchange, self.homepath +
-                            '/database/PCH/ixp_exchange.csv')
-            except Exception as e:
-                print(str(e))
-                print('ixp_exchange.csv cannot be updated.')
-                return False
+        changed = False
+        try:
+            if option == 2 or not option:
+                try:
+                    print("Downloading PCH directory datasets")
+                    session = self.http_session()
+                    try:
+                        changed = self.fetch_source(session, self.ixp_exchange, self.homepath + '/database/PCH/ixp_exchange.csv')
+                    finally:
+                        session.close()
+                except Exception as e:
+                    print(str(e))
+                    print('ixp_exchange.csv cannot be updated.')
+                    return False
 
-        if option == 1 or not option:
-            try:
-                print("Downloading PCH Subnet datasets")
-                self.get_subnets()
-            except Exception as e:
-                print(str(e))
-                print('ixp_subnets.csv cannot be updated.')
-                return False
+            # The IXPs are read once for both the Subnet and the Membership datasets.
+            ixp_ids = self.read_exchange_ids()
 
-        if option == 3 or not option:
-            try:
-                print("Downloading PCH Membership datasets")
-                self.get_membership()
-            except Exception as e:
-                print(str(e))
-                print('ixp_membership.csv cannot be updated.')
-                return False
+            if option == 1 or not option:
+                try:
+                    print("Downloading PCH Subnet datasets")
+                    if not self.get_subnets(ixp_ids):
+                        print('ixp_subnets.csv cannot be updated.')
+                        return False
+                    changed = self.file_changed(self.homepath + '/database/PCH/ixp_subnets.csv') or changed
+                except Exception as e:
+                    print(str(e))
+                    print('ixp_subnets.csv cannot be updated.')
+                    return False
 
-        print('PCH dataset has been updated successfully.')
+            if option == 3 or not option:
+                try:
+                    print("Downloading PCH Membership datasets")
+                    if not self.get_membership(ixp_ids):
+                        print('ixp_membership.csv cannot be updated.')
+                        return False
+                    changed = self.file_changed(self.homepath + '/database/PCH/ixp_membership.csv') or changed
+                except Exception as e:
+                    print(str(e))
+                    print('ixp_membership.csv cannot be updated.')
+                    return False
+        finally:
+            self.record_update('PCH', changed)
+
+        if changed:
+            print('PCH dataset has been updated successfully.')
+        else:
+            print('PCH dataset is up-to-date.')
 
         return True
 
-    def get_subnets(self):
-        # read ixp_exchange file
-        # self.homepath + '/database/PCH/ixp_subnets.csv'
+    def read_exchange_ids(self):
+        '''
+        Reads the identifiers of the IXPs from the PCH directory dataset.
+        Output:
+            a) A list with the IXP identifiers, None if the ixp_exchange.csv file is missing.
+        '''
+
         try:
-            doc = open(self.homepath + '/database/PCH/ixp_exchange.csv')
-            subnets_file = open(self.homepath + '/database/PCH/ixp_subnets.csv', "w")
-            subnets_file.write(
-                "exchange_point_id, short_name, status, version, multicast, mlpa, subnet, participants \n")  # header
+            with open(self.homepath + '/database/PCH/ixp_exchange.csv') as doc:
+                next(doc)
+                ixp_ids = []
+                for line in doc:
+                    temp_string = [item.strip() for item in line.split(',')]
+                    if len(temp_string) > 6:
+                        ixp_ids.append(str(temp_string[0]))
+                return ixp_ids
+        except (OSError, StopIteration):
+            return None
+
+    def fetch_pch(self, session, url, cache_file):
+        '''
+        Fetches a PCH .json response, unless it has been cached recently.
+        Input:
+            a) session: The requests.Session instance.
+            b) url: The url of the response.
+            c) cache_file: The file caching the response.
+        Output:
+            a) The json data, None if the response could not be fetched.
+        '''
 
-            next(doc)
-            for line in doc:
-                temp_string = [item.strip() for item in line.split(',')]
-                if len(temp_string) > 6:
-                    try:
-                        urlData = self.ixp_subnet + str(temp_string[0])
-                        webURL = urlopen(urlData)
-                        data = webURL.read()
-                        encoding = webURL.info().get_content_charset('utf-8')
-                        json_data = json.loads(data.decode(encoding))
-
-                        for item in json_data:
-                            # rebuild the old structure: exchange_point_id, short_name, status, version, multicast, mlpa, subnet, participants
-                            line_entry = ','.join(
-                                [item["exchange_point_id"], item["short_name"], item["status"], item["version"],
-                                 "Unknown", item["mlpa"], item["subnet"], item["participants"]])
-                            subnets_file.write(line_entry + "\n")
-
-
-                    except Exception as e:
-                        print("Could not fetch: " + str(urlData))
-            return True
+        try:
+            if time.time() - os.path.getmtime(cache_file) < self.pch_cache_ttl:
+                with open(cache_file, 'rb') as f:
+                    return json.loads(f.read().decode('utf-8'))
+        except (OSError, ValueError):
+            pass
+
+        try:
+            response = session.get(url, timeout=60)
+            response.raise_for_status()
+            json_data = json.loads(response.content.decode(response.encoding or 'utf-8'))
         except Exception as e:
+            print("Could not fetch: " + str(url))
+            return None
+
+        # Writes to a temporary file first, so that an interrupted update never leaves a partial response.
+        with open(cache_file + '.tmp', 'wb') as f:
+            f.write(json.dumps(json_data).encode('utf-8'))
+        os.replace(cache_file + '.tmp', cache_file)
+        return json_data
+
+    def fetch_all_pch(self, ixp_ids, url, kind):
+        '''
+        Fetches the PCH responses of all the IXPs concurrently.
+        Input:
+            a) ixp_ids: The IXP identifiers.
+            b) url: The url of the responses, without the IXP identifier.
+            c) kind: The name of the responses in the cache.
+        Output:
+            a) A list with the json data of each IXP, None for the IXPs that could not be fetched.
+        '''
+
+        if not os.path.exists(self.cache_path):
+            os.makedirs(self.cache_path)
+        session = self.http_session(self.pch_workers)
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.pch_workers) as executor:
+                return list(executor.map(
+                    lambda ixp_id: self.fetch_pch(session, url + ixp_id, self.cache_path + '/' + kind + '_' + ixp_id + '.json'),
+                    ixp_ids))
+        finally:
+            session.close()
+
+    def get_subnets(self, ixp_ids=None):
+        '''
+        Downloads the Subnets of each IXP in the PCH directory dataset to ixp_subnets.csv.
+        Input:
+            a) ixp_ids: The IXP identifiers, read from ixp_exchange.csv if not given.
+        Output:
+            a) True if the file has been written, False if ixp_exchange.csv was not found.
+        '''
+
+        if ixp_ids is None:
+            ixp_ids = self.read_exchange_ids()
+        if ixp_ids is None:
             print(self.homepath + '/database/PCH/ixp_exchange.csv' + ' was not found.')
             return False
-        finally:
-            subnets_file.close()
-            doc.close()
 
-    def get_membership(self):
-        # read ixp_exchange file
-        # self.homepath + '/database/PCH/ixp_subnets.csv'
-        try:
-            doc = open(self.homepath + '/database/PCH/ixp_exchange.csv')
-            memberships_file = open(self.homepath + '/database/PCH/ixp_membership.csv', "w")
-            memberships_file.write("subnet, ip, fqdn, asn, organization \n")  # header
+        with open(self.homepath + '/database/PCH/ixp_subnets.csv', "w") as subnets_file:
+            subnets_file.write(
+                "exchange_point_id, short_name, status, version, multicast, mlpa, subnet, participants \n")  # header
 
-            next(doc)
-            for line in doc:
-                temp_string = [item.strip() for item in line.split(',')]
-                if len(temp_string) > 6:
-                    try:
-                        urlData = "https://www.pch.net/api/ixp/subnet_details/" + str(temp_string[0])
-                        webURL = urlopen(urlData)
-                        data = webURL.read()
-                        encoding = webURL.info().get_content_charset('utf-8')
-                        json_data = json.loads(data.decode(encoding))
-
-                        for protocol, prefixes in json_data.items():  # IPv6 & IPv4
-                            for prefix, ips in prefixes.items():  # each prefix
-                                if not isinstance(ips, list):  # This is when the input is directly a dict
-                                    for ip, content in ips.items():  # each ip
-                                        # rebuild the old structure: subnet, ip, fqdn, asn, organization
-                                        tmp = [prefix, str(content["ip"]), str(content["fqdn"]), str(content["asn"]),
-                                               str(content["org"])]
-                                        for i in range(len(tmp)):
-                                            if tmp[i] == "None": tmp[i] = " "
-                                        line_entry = ','.join(tmp)
-                                        memberships_file.write(line_entry + "\n")
-                                else:  # This is when the input is a list
-                                    for ip in ips:  # each ip
-                                        # rebuild the old structure: subnet, ip, fqdn, asn, organization
-                                        tmp = [prefix, str(ip["ip"]), str(ip["fqdn"]), str(ip["asn"]), str(ip["org"])]
-                                        for i in range(len(tmp)):
-                                            if tmp[i] == "None": tmp[i] = " "
-                                        line_entry = ','.join(tmp)
-                                        memberships_file.write(line_entry + "\n")
-
-
-                    except Exception as e:
-                        print("Could not fetch: " + str(urlData))
-                        #print(e)
-            return True
-        except Exception as e:
+            for json_data in self.fetch_all_pch(ixp_ids, self.ixp_subnet, 'subnets'):
+                if json_data is None:
+                    continue
+                try:
+                    for item in json_data:
+                        # rebuild the old structure: exchange_point_id, short_name, status, version, multicast, mlpa, subnet, participants
+                        line_entry = ','.join(
+                            [item["exchange_point_id"], item["short_name"], item["status"], item["version"],
+                             "Unknown", item["mlpa"], item["subnet"], item["participants"]])
+                        subnets_file.write(line_entry + "\n")
+                except Exception as e:
+                    print("Unexpected format of the PCH Subnets: " + str(e))
+        return True
+
+    def get_membership(self, ixp_ids=None):
+        '''
+        Downloads the members of each IXP in the PCH directory dataset to ixp_membership.csv.
+        Input:
+            a) ixp_ids: The IXP identifiers, read from ixp_exchange.csv if not given.
+        Output:
+            a) True if the file has been written, False if ixp_exchange.csv was not found.
+        '''
+
+        if ixp_ids is None:
+            ixp_ids = self.read_exchange_ids()
+        if ixp_ids is None:
             print(self.homepath + '/database/PCH/ixp_exchange.csv' + ' was not found.')
             return False
-        finally:
-            memberships_file.close()
-            doc.close()
+
+        with open(self.homepath + '/database/PCH/ixp_membership.csv', "w") as memberships_file:
+            memberships_file.write("subnet, ip, fqdn, asn, organization \n")  # header
+
+            for json_data in self.fetch_all_pch(ixp_ids, self.ixp_ip, 'subnet_details'):
+                if json_data is None:
+                    continue
+                try:
+                    for protocol, prefixes in json_data.items():  # IPv6 & IPv4
+                        for prefix, ips in prefixes.items():  # each prefix
+                            if not isinstance(ips, list):  # This is when the input is directly a dict
+                                ips = ips.values()
+                            for content in ips:  # each ip
+                                # rebuild the old structure: subnet, ip, fqdn, asn, organization
+                                tmp = [prefix, str(content["ip"]), str(content["fqdn"]), str(content["asn"]),
+                                       str(content["org"])]
+                                for i in range(len(tmp)):
+                                    if tmp[i] == "None": tmp[i] = " "
+                                line_entry = ','.join(tmp)
+                                memberships_file.write(line_entry + "\n")
+                except Exception as e:
+                    print("Unexpected format of the PCH Memberships: " + str(e))
+        return True
 
     def download_routeviews(self):
         '''
-        Downloads the Routeviews AS-to-Subnet file.
+        Downloads the Routeviews AS-to-Subnet file, unless the latest version has already been downloaded.
         Output:
              a) True if the files have been downloaded successfully, False otherwise.
         '''
 
         print('Started downloading RouteViews dataset.')
-        # Downloads the log file to find the last version of the routeviews
-        # file.
-        try:
-            urlretrieve(self.caida_log, self.homepath +
-                        '/database/RouteViews/caidalog.log')
-        except Exception as e:
-            print(str(e))
-            print('RouteViews dataset cannot be updated.')
-            return False
-
-        # Parses the log file to find the file name.
+        routeviews_file = self.homepath + '/database/RouteViews/routeviews'
+        session = self.http_session()
         try:
-            f2 = open(self.homepath + '/database/RouteViews/caidalog.log')
-        except Exception as e:
-            print(str(e))
-            print('RouteViews cannot be updated.')
-            return False
-
-        updates = f2.read()
-        f2.close()
-        updates = updates.split('\n')
-        updates = updates[len(updates) - 2].split('\t')[2]
+            # Downloads the log file to find the last version of the routeviews file.
+            try:
+                response = session.get(self.caida_log, timeout=300)
+                response.raise_for_status()
+                updates = response.text
+            except Exception as e:
+                print(str(e))
+                print('RouteViews dataset cannot be updated.')
+                return False
 
-        # Downloads and extracts the routeviews file.
-        try:
-            urlretrieve('http://data.caida.org/datasets/routing/routeviews-prefix2as/' +
-                        updates, self.homepath + '/database/RouteViews/routeviews.gz')
-        except Exception as e:
-            print(str(e))
-            print('RouteViews cannot be updated.')
-            return False
+            # Parses the log file to find the file name.
+            try:
+                updates = updates.split('\n')
+                updates = updates[len(updates) - 2].split('\t')[2]
+            except IndexError as e:
+                print(str(e))
+                print('RouteViews cannot be updated.')
+                return False
 
-        try:
-            subprocess.call(
-                str('gunzip ' + self.homepath + '/database/RouteViews/routeviews.gz').split(" "), shell=False)
-        except Exception as e:
-            print(str(e))
-            print('RouteViews cannot be updated.')
-            return False
+            self.load_sources()
+            if os.path.exists(routeviews_file + '.gz') and self.sources.get(self.caida_log, {}).get('name') == updates:
+                print('Routeviews is up-to-date.')
+                return True
 
-        if os.path.exists(self.homepath + '/database/RouteViews/routeviews.gz'):
-            os.remove(self.homepath + '/database/RouteViews/routeviews.gz')
-        if os.path.exists(self.homepath + '/database/RouteViews/caidalog.log'):
-            os.remove(self.homepath + '/database/RouteViews/caidalog.log')
+            # Downloads the routeviews file. It is kept compressed, as it is parsed directly from the gzip stream.
+            try:
+                response = session.get('http://data.caida.org/datasets/routing/routeviews-prefix2as/' + updates,
+                                       stream=True, timeout=300)
+                response.raise_for_status()
+                with open(routeviews_file + '.gz.tmp', 'wb') as f:
+                    for block in response.iter_content(1 << 20):
+                        f.write(block)
+                os.replace(routeviews_file + '.gz.tmp', routeviews_file + '.gz')
+            except Exception as e:
+                print(str(e))
+                print('RouteViews cannot be updated.')
+                return False
+        finally:
+            session.close()
+
+        # Removes the uncompressed file of older versions.
+        if os.path.exists(routeviews_file):
+            os.remove(routeviews_file)
+        with self.sources_lock:
+            self.sources[self.caida_log] = {'name': updates}
+        self.record_update('RouteViews', True)
         print('Routeviews has been updated successfully.')
 
         return True
@@ -1,2 +1,3 @@
-__all__ = ['database_extract', 'dict_merger',
-           'handle_complementary', 'handle_json', 'handle_pch', 'handle_pdb']
+__all__ = ['database_extract', 'db_snapshot', 'dict_merger',
+           'handle_complementary', 'handle_json', 'handle_pch', 'handle_pdb',
+           'ixp_index']
@@ -20,14 +20,68 @@
 # You should have received a copy of the GNU General Public License
 # along with traIXroute.  If not, see <http://www.gnu.org/licenses/>.
 
-from traixroute.handler import handle_json, handle_pch, handle_pdb, handle_ripe, dict_merger, handle_complementary, handle_remote
-from traixroute.controller import traixroute_output, traixroute_parser
+from traixroute.handler import handle_json, handle_pch, handle_pdb, handle_ripe, dict_merger, handle_complementary, handle_remote, db_snapshot, ixp_index
+from traixroute.controller import traixroute_output, traixroute_parser, string_handler
 from os import remove, makedirs
 from os.path import exists
 from multiprocessing import cpu_count
 import sys
 import SubnetTree
 import concurrent.futures
+import multiprocessing
+import threading
+
+
+def new_comparisons(known):
+    '''
+    Returns the string comparisons cached after the given ones.
+    Input:
+        a) known: The set of the (string1, string2, prob_difflib, prob_leven) keys of the given comparisons.
+    Output:
+        a) A list with [string1, string2, prob_difflib, prob_leven, result] entries.
+    '''
+
+    return [entry for entry in string_handler.string_handler().comparisons() if tuple(entry[:4]) not in known]
+
+
+def extract_pdb(downloader, libpath):
+    '''
+    Parses the PDB dataset. It runs in the worker processes when the database is built.
+    Input:
+        a) downloader: The download_files instance.
+        b) libpath: The path to the traIXroute library.
+    Output:
+        a) The output of peering_handle_main.
+        b) The string comparisons made by the parser, to be cached by the main process.
+    '''
+
+    known = {tuple(entry[:4]) for entry in string_handler.string_handler().comparisons()}
+    reserved = handle_complementary.reserved_handle()
+    reserved.reserved_extract()
+    result = handle_pdb.peering_handle(downloader, libpath).peering_handle_main(reserved.reserved_sub_tree, country2cc)
+    return result, new_comparisons(known)
+
+
+def extract_pch(downloader, libpath, additional_subnet2name):
+    '''
+    Parses the PCH dataset. It runs in the worker processes when the database is built.
+    Input:
+        a) downloader: The download_files instance.
+        b) libpath: The path to the traIXroute library.
+        c) additional_subnet2name: A dictionary with the {IXP Subnet}=[IXP long name, IXP short name] of additional_info.txt.
+    Output:
+        a) The output of pch_handle_main.
+        b) The string comparisons made by the parser, to be cached by the main process.
+    '''
+
+    known = {tuple(entry[:4]) for entry in string_handler.string_handler().comparisons()}
+    reserved = handle_complementary.reserved_handle()
+    reserved.reserved_extract()
+    additional_info_tree = SubnetTree.SubnetTree()
+    for subnet, names in additional_subnet2name.items():
+        additional_info_tree[subnet] = names
+    result = handle_pch.pch_handle(downloader, libpath).pch_handle_main(reserved.reserved_sub_tree, additional_info_tree, country2cc)
+    return result, new_comparisons(known)
 
 
 class database():
@@ -55,20 +109,24 @@ class database():
         # self.reserved_sub_tree: A Subnet Tree with {reserved subnet}=reserved
         # subnet.
         self.reserved_sub_tree = None
-        # self.asn_memb: A dictionary with {ASN}=[list of IXP names].
+        # self.asn_memb: A dictionary with {ASN in integer format}=[list of IXP names].
         self.asnmemb = None
-        # self.asn_routeviews: A Subnet Tree with {Subnet}=[ASN1, ASN2,...]
-        # from routeviews.
+        # self.asn_routeviews: A Subnet Tree with {Subnet}=(ASN1, ASN2,...)
+        # from routeviews, with the ASNs in integer format.
         self.asn_routeviews = None
         # self.subTree: A Subnet Tree with {Subnet}=[IXP long name, IXP short
         # name].
         self.subTree = None
         # self.cc_tree: A Subnet Tree with {Subnet}=[Contry, City].
         self.cc_tree = None
+        # self.ixp_index: The index of the IXP memberships of the ASes.
+        self.ixp_index = None
 
         # self.remote_peering: A dictionary {IP}={IXP short name: {IXP Country,
         # IXP City}} containing remote peering related information.
         self.remote_peering = None
+        # self.snapshot: The memory-mapped compiled snapshot of the merged database.
+        self.snapshot = None
 
         # self.merge_flag: Flag to export the merged IXP IPs and IXP subnets to
         # files.
@@ -83,20 +141,34 @@ class database():
         # self.config: Contains the config file dictionary.
         self.config = config
 
+        # self.merged_files: The .json files of the merged database.
+        self.merged_files = ['IXPIP2ASN.json', 'trIX_subnet2name.json', 'asn_memb.json', 'sub2country.json', 'routeviews.json', 'ixp_index.json']
+        # self.snapshot_file: The compiled snapshot of the merged .json files.
+        self.snapshot_file = '/database/Merged/database.snapshot'
+        # self.cache_file: The stored outcomes of the IXP name comparisons.
+        self.cache_file = '/database/Merged/string_comparison.json'
+
         self.outcome = outcome
         self.downloader = downloader
         self.homepath = downloader.getDestinationPath()
         self.libpath = libpath
 
     def clean(self):
-        self.final_ixp2asn.clear()
-        self.final_sub2name.clear()
         self.remote_peering.clear()
+        self.final_ixp2asn     = None
+        self.final_sub2name    = None
         self.reserved_sub_tree = None
         self.asnmemb           = None
         self.asn_routeviews    = None
         self.subTree           = None
         self.cc_tree           = None
+        self.ixp_index         = None
+        if self.snapshot is not None:
+            self.snapshot.close()
+            self.snapshot = None
+        # Keeps the IXP name comparisons for the next runs.
+        if exists(self.homepath + '/database/Merged'):
+            string_handler.string_handler().export_comparison_cache(self.homepath + self.cache_file)
     
     def dbextract(self):
         ''' 
@@ -105,6 +177,7 @@ class database():
 
         json_handle = handle_json.handle_json()
         output = traixroute_output.traixroute_output()
+        string_handler.string_handler().import_comparison_cache(self.homepath + self.cache_file)
         lst_modified = output.read_lst_mod(
             self.homepath + '/lst_mod.txt',
             self.homepath + '/configuration/additional_info.txt')
@@ -127,38 +200,44 @@ class database():
         Sub_hand = handle_complementary.Subnet_handle()
 
         flag = False
+        snapshot_flag = False
         if (lst_modified and not chk_update and not self.merge_flag) or not self.outcome:
             print("Loading from Database.")
-            results = []
-            
-            with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-                results.append(executor.submit(
-                    json_handle.import_IXP_dict, self.homepath + '/database/Merged/IXPIP2ASN.json'))
-                results.append(executor.submit(
-                    json_handle.import_IXP_dict, self.homepath + '/database/Merged/trIX_subnet2name.json'))
-                results.append(executor.submit(
-                    json_handle.import_IXP_dict, self.homepath + '/database/Merged/asn_memb.json'))
-                results.append(executor.submit(
-                    json_handle.import_IXP_dict, self.homepath + '/database/Merged/sub2country.json'))
-                results.append(executor.submit(
-                    json_handle.import_IXP_dict, self.homepath + '/database/Merged/routeviews.json'))
-
-            for item in results:
-                flag = flag or item.result()[1]
-
-            if not flag:
-                self.final_ixp2asn      = results[0].result()[0]
-                self.final_sub2name     = results[1].result()[0]
-                self.asnmemb            = results[2].result()[0]
-                final_subnet2country    = results[3].result()[0]
-                self.asn_routeviews     = self.dict2tree(results[4].result()[0])
-                self.subTree            = self.dict2tree(self.final_sub2name)
-                if self.print_db:
-                    output.print_pr_db_stats(self.homepath + '/db.txt')
-
-        if (not lst_modified or flag or chk_update or self.merge_flag) and self.outcome:
+            snapshot_flag = self.import_snapshot()
+
+            if not snapshot_flag:
+                [flag, final_subnet2country, routeviews_dict] = self.import_merged(json_handle)
+                if not flag:
+                    snapshot_flag           = self.export_snapshot(routeviews_dict, final_subnet2country)
+                    if not snapshot_flag:
+                        self.asn_routeviews = self.dict2tree(routeviews_dict, db_snapshot.asn2int)
+                        self.subTree        = self.dict2tree(self.final_sub2name)
+
+            if not flag and self.print_db:
+                output.print_pr_db_stats(self.homepath + '/db.txt')
+
+        rebuild_flag = (not lst_modified or flag or chk_update or self.merge_flag) and self.outcome
+        if rebuild_flag:
+            # The datasets updated since the last merge. "1" is written by older versions for all the datasets.
+            updated = set(chk_update.strip().split(',')) if chk_update else set()
+            if '1' in updated:
+                updated = {'PDB', 'PCH', 'RouteViews'}
+            # Only the merge stages of the updated datasets are rebuilt, the rest are loaded from the merged database.
+            # The IXP stage merges PCH, PDB and additional_info.txt, the RouteViews stage extracts the Subnet-to-ASN mappings.
+            rebuild_ixps        = flag or not lst_modified or self.merge_flag or bool(updated & {'PDB', 'PCH'})
+            rebuild_routeviews  = flag or 'RouteViews' in updated
+            if not rebuild_ixps or not rebuild_routeviews:
+                [load_flag, final_subnet2country, routeviews_dict] = self.import_merged(json_handle)
+                if load_flag:
+                    rebuild_ixps = rebuild_routeviews = True
+
             if chk_update or flag:
-                print("Loading from PCH, PDB, Routeviews and additional_info.txt.")
+                if rebuild_ixps and rebuild_routeviews:
+                    print("Loading from PCH, PDB, Routeviews and additional_info.txt.")
+                elif rebuild_ixps:
+                    print("Loading from PCH, PDB and additional_info.txt.")
+                else:
+                    print("Loading from Routeviews.")
                 if exists(self.homepath + "/configuration/check_update.txt"):
                     remove(self.homepath + "/configuration/check_update.txt")
             elif not lst_modified:
@@ -167,8 +246,6 @@ class database():
                 print("Loading from database.")
 
             user_imports    = handle_complementary.extract_additional_info()
-            pch             = handle_pch.pch_handle(self.downloader, self.libpath)
-            peeringdb       = handle_pdb.peering_handle(self.downloader, self.libpath)
             dict_merge      = dict_merger.dict_merger()
             asn_hand_info   = handle_complementary.asn_memb_info()
 
@@ -181,59 +258,76 @@ class database():
             additional_info_help_tree   = user_imports.additional_info_help_tree
             additional_pfx2cc           = user_imports.pfx2cc
 
-            results = []
-            with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
-                results.append(executor.submit(asn_hand.routeviews_extract, self.reserved_sub_tree))
-                results.append(executor.submit(peeringdb.peering_handle_main, self.reserved_sub_tree, country2cc))
-                results.append(executor.submit(pch.pch_handle_main, self.reserved_sub_tree, additional_info_tree, country2cc))
-
-            self.asn_routeviews     = results[0].result()[0]
-            routeviews_dict         = results[0].result()[1]
-
-            pdb_subnet2name         = results[1].result()[0]
-            pdb_ip2asn              = results[1].result()[1]
-            pdb_subnet2country      = results[1].result()[2]
-            stats_pdb_prefixes      = len(pdb_subnet2name)
-            stats_pdb_ips           = len(pdb_ip2asn)
+            if not exists(self.homepath + '/database/Merged'):
+                makedirs(self.homepath + '/database/Merged')
+            # The parsers are CPU-bound, so the PDB and PCH datasets and the byte ranges of the routeviews file are
+            # parsed by a pool of processes, unless a single core is used.
+            num_of_cores = self.config.get('num_of_cores', 1)
+            if num_of_cores < 1:
+                num_of_cores = cpu_count()
+            if num_of_cores > 1:
+                executor = concurrent.futures.ProcessPoolExecutor(max_workers=num_of_cores, **self.pool_options())
+            else:
+                executor = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+            with executor:
+                if rebuild_ixps:
+                    results = []
+                    results.append(executor.submit(extract_pdb, self.downloader, self.libpath))
+                    results.append(executor.submit(extract_pch, self.downloader, self.libpath, additional_subnet2name))
+                if rebuild_routeviews:
+                    # The prefix index is built from the dictionary, by the snapshot or a SubnetTree.
+                    routeviews_dict = asn_hand.routeviews_extract(self.reserved_sub_tree, executor if num_of_cores > 1 else None, num_of_cores)
+                if rebuild_ixps:
+                    [pdb_result, pdb_comparisons] = results[0].result()
+                    [pch_result, pch_comparisons] = results[1].result()
+
+            if rebuild_routeviews:
+                json_handle.export_IXP_dict(routeviews_dict, self.homepath + '/database/Merged/' + self.merged_files[4])
+
+            if rebuild_ixps:
+                # The IXP names compared by the parsers are cached with the rest of the comparisons.
+                string_handler.string_handler().merge_comparisons(pdb_comparisons + pch_comparisons)
+
+                pdb_subnet2name         = pdb_result[0]
+                pdb_ip2asn              = pdb_result[1]
+                pdb_subnet2country      = pdb_result[2]
+                stats_pdb_prefixes      = len(pdb_subnet2name)
+                stats_pdb_ips           = len(pdb_ip2asn)
     
-            pch_subnet2name         = results[2].result()[0]
-            pch_ip2asn              = results[2].result()[1]
-            pch_subnet2country      = results[2].result()[2]
-            stats_pch_prefixes      = len(pch_subnet2name)
-            stats_pch_ips           = len(pch_ip2asn)
+                pch_subnet2name         = pch_result[0]
+                pch_ip2asn              = pch_result[1]
+                pch_subnet2country      = pch_result[2]
+                stats_pch_prefixes      = len(pch_subnet2name)
+                stats_pch_ips           = len(pch_ip2asn)
             
-            # Merges the dictionaries from pch, peeringdb and the
-            # additional_info file.
-            final_subnet2country = dict_merge.merge_cc(pdb_subnet2country, pch_subnet2country)
-            merged_sub2name = dict_merge.merge_keys2names(pch_subnet2name, pdb_subnet2name)
+                # Merges the dictionaries from pch, peeringdb and the
+                # additional_info file.
+                final_subnet2country = dict_merge.merge_cc(pdb_subnet2country, pch_subnet2country)
+                merged_sub2name = dict_merge.merge_keys2names(pch_subnet2name, pdb_subnet2name)
             
-            [self.subTree, self.final_sub2name, help_tree] = Sub_hand.Subnet_tree(merged_sub2name, additional_info_help_tree, self.reserved_sub_tree, final_subnet2country)
-            [self.subTree, self.final_sub2name] = Sub_hand.exclude_reserved_subpref(self.subTree, self.final_sub2name, reserved_list, final_subnet2country)
-            [self.subTree, self.final_sub2name, final_subnet2country] = dict_merge.include_additional_prefixes(self.final_sub2name, self.subTree, additional_subnet2name, final_subnet2country, additional_pfx2cc, help_tree, additional_ixp_ip2asn)
+                [self.subTree, self.final_sub2name, help_tree] = Sub_hand.Subnet_tree(merged_sub2name, additional_info_help_tree, self.reserved_sub_tree, final_subnet2country)
+                [self.subTree, self.final_sub2name] = Sub_hand.exclude_reserved_subpref(self.subTree, self.final_sub2name, reserved_list, final_subnet2country)
+                [self.subTree, self.final_sub2name, final_subnet2country] = dict_merge.include_additional_prefixes(self.final_sub2name, self.subTree, additional_subnet2name, final_subnet2country, additional_pfx2cc, help_tree, additional_ixp_ip2asn)
             
-            # Merging PDB & PCH IXP memberhip data.
-            [merged_ixp2asn, dirty_count] = dict_merge.merge_ixp2asns(pch_ip2asn, pdb_ip2asn, True, self.subTree)
-            # Merging PCB & PCH with additional membership data.
-            self.final_ixp2asn = dict_merge.merge_ixp2asns(additional_ixp_ip2asn, merged_ixp2asn, False, self.subTree, replace=True)
-            self.asnmemb = asn_hand_info.asn_memb(self.final_ixp2asn, self.subTree)
-            if not exists(self.homepath + '/database/Merged'):
-                makedirs(self.homepath + '/database/Merged')
-            with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-                executor.submit(json_handle.export_IXP_dict,
-                                self.asnmemb, self.homepath + '/database/Merged/asn_memb.json')
-                executor.submit(json_handle.export_IXP_dict, routeviews_dict,
-                                self.homepath + '/database/Merged/routeviews.json')
-                executor.submit(json_handle.export_IXP_dict,
-                                self.final_ixp2asn, self.homepath + '/database/Merged/IXPIP2ASN.json')
-                executor.submit(json_handle.export_IXP_dict, self.final_sub2name,
-                                self.homepath + '/database/Merged/trIX_subnet2name.json')
-                executor.submit(json_handle.export_IXP_dict, final_subnet2country,
-                                self.homepath + '/database/Merged/sub2country.json')
+                # Merging PDB & PCH IXP memberhip data.
+                [merged_ixp2asn, dirty_count] = dict_merge.merge_ixp2asns(pch_ip2asn, pdb_ip2asn, True, self.subTree)
+                # Merging PCB & PCH with additional membership data.
+                self.final_ixp2asn = dict_merge.merge_ixp2asns(additional_ixp_ip2asn, merged_ixp2asn, False, self.subTree, replace=True)
+                self.asnmemb = asn_hand_info.asn_memb(self.final_ixp2asn, self.subTree)
+                # Compares the IXP names once, to resolve the IXP memberships with set lookups.
+                self.ixp_index = ixp_index.ixp_index()
+                index_data = self.ixp_index.build_index(self.final_sub2name, self.asnmemb, self.config.get('num_of_cores', 1), self.pool_options())
+                with concurrent.futures.ThreadPoolExecutor(max_workers=len(self.merged_files)) as executor:
+                    for data, filename in zip([self.final_ixp2asn, self.final_sub2name, self.asnmemb, final_subnet2country, index_data],
+                                              self.merged_files[:4] + self.merged_files[5:]):
+                        executor.submit(json_handle.export_IXP_dict, data, self.homepath + '/database/Merged/' + filename)
+                self.asnmemb = self.asn_keys(self.asnmemb)
             
-            output.print_db_stats(stats_pdb_ips, stats_pdb_prefixes, stats_pch_ips, stats_pch_prefixes, self.final_ixp2asn, self.final_sub2name, dirty_count, additional_ixp_ip2asn, additional_subnet2name, len(reserved_list), self.print_db, self.homepath + '/')
+                output.print_db_stats(stats_pdb_ips, stats_pdb_prefixes, stats_pch_ips, stats_pch_prefixes, self.final_ixp2asn, self.final_sub2name, dirty_count, additional_ixp_ip2asn, additional_subnet2name, len(reserved_list), self.print_db, self.homepath + '/')
 
         # Adds country and city related information of IXPs
-        self.cc_tree = self.dict2tree(final_subnet2country)
+        if not snapshot_flag:
+            self.cc_tree = self.dict2tree(final_subnet2country)
         # Imports the remote peering datasets
         self.remote_peering = handle_remote.handle_remote(self.homepath, self.libpath).handle_import(json_handle)
         
@@ -245,21 +339,161 @@ class database():
             self.ips_to_file(additional_ixp_ip2asn, additional_info_tree, merged_ixp2asn)
             print("The files ixp_prefixes.txt and ixp_membership.txt have been created.")
 
-    def dict2tree(self, d1):
+        # The snapshot is regenerated after merging, since the .json files have changed.
+        if rebuild_flag and not self.export_snapshot(routeviews_dict, final_subnet2country):
+            # The stages loaded from the merged database and the routeviews have no SubnetTrees.
+            if self.asn_routeviews is None:
+                self.asn_routeviews = self.dict2tree(routeviews_dict, db_snapshot.asn2int)
+            if self.subTree is None:
+                self.subTree = self.dict2tree(self.final_sub2name)
+
+    def pool_options(self):
+        '''
+        Returns the options of the process pools that build the database. Forking from a thread other than the main
+        one, e.g., the reload thread of the server, would copy the locks held by the other threads, so the workers
+        are started by a fork server instead.
+        Output:
+            a) A dictionary with the keyword arguments of the ProcessPoolExecutor.
+        '''
+
+        if sys.version_info >= (3, 7) and threading.current_thread() is not threading.main_thread():
+            start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            return {'mp_context': multiprocessing.get_context(start_method)}
+        return {}
+
+    def load(self):
+        '''
+        Loads the merged database as it is, without updating, merging or compiling it and without printing, e.g., for
+        the library API.
+        Output:
+            a) True if the merged database has been loaded, False if it is missing or cannot be imported.
+        '''
+
+        json_handle = handle_json.handle_json()
+        string_handler.string_handler().import_comparison_cache(self.homepath + self.cache_file)
+        if not self.import_snapshot():
+            [flag, final_subnet2country, routeviews_dict] = self.import_merged(json_handle)
+            if flag:
+                return False
+            self.asn_routeviews = self.dict2tree(routeviews_dict, db_snapshot.asn2int)
+            self.subTree        = self.dict2tree(self.final_sub2name)
+            self.cc_tree        = self.dict2tree(final_subnet2country)
+        self.remote_peering = handle_remote.handle_remote(self.homepath, self.libpath).handle_import(json_handle, False)
+        return True
+
+    def export_snapshot(self, routeviews_dict, final_subnet2country):
+        '''
+        Compiles the merged database to the snapshot file and loads it.
+        Input:
+            a) routeviews_dict: A dictionary with {Subnet}=ASN from routeviews.
+            b) final_subnet2country: A dictionary with {IXP Subnet}=[IXP country, IXP city].
+        Output:
+            a) True if the snapshot has been compiled and loaded, False otherwise.
+        '''
+
+        snapshot = db_snapshot.db_snapshot()
+        stamps = snapshot.stamps([self.homepath + '/database/Merged/' + filename for filename in self.merged_files])
+        if stamps is None:
+            return False
+        try:
+            snapshot.export_snapshot(self.homepath + self.snapshot_file, {
+                'ixp2asn': self.final_ixp2asn,
+                'sub2name': self.final_sub2name,
+                'sub2country': final_subnet2country,
+                'routeviews': routeviews_dict}, {'asn_memb': self.asnmemb, 'ixp_index': self.ixp_index.data}, stamps, {
+                'ixp2asn': lambda asns: db_snapshot.asn2int(asns[0]),
+                'routeviews': db_snapshot.asn2int})
+        except OSError as e:
+            print('Could not export the database snapshot -', e)
+            return False
+        return self.import_snapshot()
+
+    def import_snapshot(self):
+        '''
+        Loads the memory-mapped snapshot of the merged database if it is up-to-date with the .json files.
+        Output:
+            a) True if the snapshot has been loaded, False otherwise.
+        '''
+
+        snapshot = db_snapshot.db_snapshot()
+        stamps = snapshot.stamps([self.homepath + '/database/Merged/' + filename for filename in self.merged_files])
+        if not snapshot.import_snapshot(self.homepath + self.snapshot_file, stamps):
+            return False
+
+        # The tables replace the SubnetTrees and the dictionaries built from the .json files.
+        if self.snapshot is not None:
+            self.snapshot.close()
+        self.snapshot       = snapshot
+        self.final_ixp2asn  = snapshot.tables['ixp2asn']
+        self.subTree        = snapshot.tables['sub2name']
+        self.cc_tree        = snapshot.tables['sub2country']
+        self.asn_routeviews = snapshot.tables['routeviews']
+        self.asnmemb        = self.asn_keys(snapshot.blobs['asn_memb'])
+        self.ixp_index      = ixp_index.ixp_index()
+        self.ixp_index.load_index(snapshot.blobs['ixp_index'])
+        self.final_sub2name = {}
+        return True
+
+    def import_merged(self, json_handle):
+        '''
+        Imports the merged database from the .json files.
+        Input:
+            a) json_handle: The handle_json instance.
+        Output:
+            a) flag: True if a file could not be imported, False otherwise.
+            b) final_subnet2country: A dictionary with {IXP Subnet}=[IXP country, IXP city].
+            c) routeviews_dict: A dictionary with {Subnet}=ASN from routeviews.
+        '''
+
+        results = []
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(self.merged_files)) as executor:
+            for filename in self.merged_files:
+                results.append(executor.submit(json_handle.import_IXP_dict, self.homepath + '/database/Merged/' + filename))
+
+        flag = False
+        for item in results:
+            flag = flag or item.result()[1]
+        if flag:
+            return True, None, None
+
+        self.final_ixp2asn      = results[0].result()[0]
+        self.final_sub2name     = results[1].result()[0]
+        self.asnmemb            = self.asn_keys(results[2].result()[0])
+        self.ixp_index          = ixp_index.ixp_index()
+        self.ixp_index.load_index(results[5].result()[0])
+        return False, results[3].result()[0], results[4].result()[0]
+
+    def dict2tree(self, d1, convert=None):
         '''
         Takes as input a dictionary with Subnets as keys and converts it to a SubnetTree.
         Input:
             a) d1: The dictionary with Subnets as keys.
+            b) convert: The function converting each value before it is stored, None to store the values as they are.
         Output:
             a) tree: The SubnetTree.
         '''
 
         tree = SubnetTree.SubnetTree()
 
-        for node in d1:
-            tree[node] = d1[node]
+        if convert is None:
+            for node in d1:
+                tree[node] = d1[node]
+        else:
+            for node in d1:
+                tree[node] = convert(d1[node])
         return tree
 
+    def asn_keys(self, asnmemb):
+        '''
+        Converts the ASNs of the IXP memberships to integers, as they are compared in the IP paths.
+        Input:
+            a) asnmemb: A dictionary with {ASN}=[[IXP long name, IXP short name],...], with the ASNs in string format.
+        Output:
+            a) A dictionary with {ASN}=[[IXP long name, IXP short name],...], with the ASNs in integer format.
+        '''
+
+        return {int(asn): asnmemb[asn] for asn in asnmemb if asn.isdigit()}
+
     def subs_to_file(self, additional_prefixes, d2, additional_ixp_ip2asn):
         '''
         Prints the IXP subnets with their corresponding IXP names to the ixp_prefixes.txt file.
@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2016 Institute of Computer Science of the Foundation for Research and Technology - Hellas (FORTH)
+# Authors: Michalis Bamiedakis, Dimitris Mavrommatis and George Nomikos
+#
+# Contact Author: George Nomikos
+# Contact Email: gnomikos [at] ics.forth.gr
+#
+# This file is part of traIXroute.
+#
+# traIXroute is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# traIXroute is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with traIXroute.  If not, see <http://www.gnu.org/licenses/>.
+
+from array import array
+from bisect import bisect_right
+from functools import lru_cache
+import ujson
+import socket
+import mmap
+import os
+import sys
+
+# NumPy is optional. If it is available, the lookups of many addresses are vectorized.
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# The first bytes of a snapshot file followed by the format version.
+MAGIC = b'TRIXSNAP'
+VERSION = 2
+
+
+def ip2int(address):
+    '''
+    Converts an IPv4 address (or the network address of a prefix) to an integer.
+    Input:
+        a) address: The IP address or the Subnet in string format.
+    Output:
+        a) The integer value of the address, None if the address is not valid.
+    '''
+
+    try:
+        return int.from_bytes(socket.inet_aton(address.split('/')[0]), 'big')
+    except (OSError, TypeError, AttributeError):
+        return None
+
+
+def ip2int_all(addresses):
+    '''
+    Converts many IPv4 addresses to integers.
+    Input:
+        a) addresses: A list with the IP addresses in string format.
+    Output:
+        a) A NumPy array with the integer values, -1 for the invalid addresses, or a list with None for the invalid
+           addresses if NumPy is not available.
+    '''
+
+    if numpy is None:
+        return [ip2int(address) for address in addresses]
+
+    packed = []
+    valid = []
+    for address in addresses:
+        try:
+            packed.append(socket.inet_aton(address))
+            valid.append(True)
+        except (OSError, TypeError):
+            packed.append(b'\0\0\0\0')
+            valid.append(False)
+    values = numpy.frombuffer(b''.join(packed), dtype='>u4').astype(numpy.int64)
+    values[~numpy.array(valid, dtype=bool)] = -1
+    return values
+
+
+@lru_cache(maxsize=None)
+def asn2int(asn):
+    '''
+    Converts an ASN, or the ASNs of a MOAS prefix joined with "_", to integers. The ASNs are stored and compared as
+    integers and they are formatted back to text only when they are printed.
+    Input:
+        a) asn: The ASN(s) in string format, e.g., 1234_5678.
+    Output:
+        a) A tuple with the integer value of each ASN, e.g., (1234, 5678), empty if there is no valid ASN.
+    '''
+
+    return tuple(int(node) for node in asn.split('_') if node.isdigit())
+
+
+class value_table():
+    '''
+    Holds the interned values of the snapshot, i.e., the distinct ASNs, IXP names and countries/cities,
+    encoded in json format. Each value is decoded only once, the first time it is requested.
+    '''
+
+    def __init__(self, offsets, data):
+        # self.offsets: The start offset of each value in data, followed by the end offset of the last one.
+        self.offsets = offsets
+        # self.data: The json encoded values.
+        self.data = data
+        # self.decoded: A dictionary with {value index}=decoded value.
+        self.decoded = {}
+
+    def __getitem__(self, index):
+        try:
+            return self.decoded[index]
+        except KeyError:
+            value = ujson.loads(bytes(self.data[self.offsets[index]:self.offsets[index + 1]]).decode('utf-8'))
+            self.decoded[index] = value
+            return value
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+
+class prefix_table():
+    '''
+    A read-only longest prefix match table supporting the "in" and [] lookups of a SubnetTree for IPv4 addresses.
+    The prefixes are flattened to disjoint, sorted address ranges which are queried with binary search.
+    '''
+
+    def __init__(self, starts, ends, indexes, values):
+        # self.starts, self.ends: The first and last address of each range.
+        self.starts = starts
+        self.ends = ends
+        # self.indexes: The index of the value of each range in the value table.
+        self.indexes = indexes
+        self.values = values
+
+    def find(self, address):
+        '''
+        Finds the range that contains the given address.
+        Input:
+            a) address: The IP address in integer format.
+        Output:
+            a) The position of the range, -1 if the address is not covered by any prefix.
+        '''
+
+        if address is None:
+            return -1
+        pos = bisect_right(self.starts, address) - 1
+        if pos >= 0 and address <= self.ends[pos]:
+            return pos
+        return -1
+
+    def find_all(self, addresses):
+        '''
+        Finds the ranges that contain each one of the given addresses.
+        Input:
+            a) addresses: The IP addresses in integer format, as returned by ip2int_all.
+        Output:
+            a) A list with the position of the range of each address, -1 if the address is not covered by any prefix.
+        '''
+
+        if numpy is None or not isinstance(addresses, numpy.ndarray):
+            return [self.find(address) for address in addresses]
+        if not len(self.starts):
+            return [-1] * len(addresses)
+
+        starts = numpy.frombuffer(self.starts, dtype=numpy.uint32)
+        ends = numpy.frombuffer(self.ends, dtype=numpy.uint32)
+        valid = addresses >= 0
+        values = numpy.where(valid, addresses, 0).astype(numpy.uint32)
+        positions = numpy.searchsorted(starts, values, side='right') - 1
+        found = valid & (positions >= 0)
+        found &= values <= ends[numpy.maximum(positions, 0)]
+        return numpy.where(found, positions, -1).tolist()
+
+    def value(self, pos):
+        '''
+        Returns the value of a range.
+        Input:
+            a) pos: The position of the range, as returned by find or find_all.
+        Output:
+            a) The value of the range.
+        '''
+
+        return self.values[self.indexes[pos]]
+
+    def __contains__(self, key):
+        return self.find(ip2int(key)) >= 0
+
+    def __getitem__(self, key):
+        pos = self.find(ip2int(key))
+        if pos < 0:
+            raise KeyError(key)
+        return self.values[self.indexes[pos]]
+
+    def __len__(self):
+        return len(self.starts)
+
+
+class db_snapshot():
+    '''
+    Handles the compiled binary snapshot of the merged database. The snapshot is built from the
+    database/Merged .json files, which remain the interchange format, and it is memory-mapped at load time.
+    '''
+
+    def __init__(self):
+        # self.tables: A dictionary with {table name}=prefix_table.
+        self.tables = {}
+        # self.blobs: A dictionary with {blob name}=decoded object.
+        self.blobs = {}
+        self.values = None
+        self.mm = None
+        self.views = []
+
+    def stamps(self, filenames):
+        '''
+        Returns the size and the modification time of the files the snapshot is built from.
+        Input:
+            a) filenames: A list with the .json files.
+        Output:
+            a) A dictionary with {file name}=[size, modification time], None if a file is missing.
+        '''
+
+        try:
+            return {os.path.basename(name): [os.stat(name).st_size, os.stat(name).st_mtime_ns] for name in filenames}
+        except OSError:
+            return None
+
+    def flatten(self, d1, intern, convert=None):
+        '''
+        Converts a dictionary with Subnets as keys to disjoint address ranges, so that each address maps to
+        the value of its longest matching prefix.
+        Input:
+            a) d1: The dictionary with {Subnet}=value.
+            b) intern: The function returning the index of a value in the value table.
+            c) convert: The function converting each value before it is stored, None to store the values as they are.
+        Output:
+            a) starts, ends, indexes: The arrays with the first address, last address and value index of each range.
+        '''
+
+        prefixes = []
+        for subnet in d1:
+            start = ip2int(subnet)
+            if start is None:
+                continue
+            length = int(subnet.split('/')[1]) if '/' in subnet else 32
+            mask = (0xffffffff << (32 - length)) & 0xffffffff
+            start &= mask
+            value = d1[subnet] if convert is None else convert(d1[subnet])
+            prefixes.append((start, length, start | (~mask & 0xffffffff), intern(value)))
+        prefixes.sort()
+
+        starts, ends, indexes = array('I'), array('I'), array('I')
+
+        def emit(first, last, index):
+            if first > last:
+                return
+            # Merges contiguous ranges with the same value.
+            if len(starts) and ends[-1] + 1 == first and indexes[-1] == index:
+                ends[-1] = last
+            else:
+                starts.append(first)
+                ends.append(last)
+                indexes.append(index)
+
+        # The open prefixes covering the current address, the innermost one on top.
+        stack = []
+        cursor = 0
+        for start, _, end, index in prefixes:
+            while stack and stack[-1][0] < start:
+                top_end, top_index = stack.pop()
+                emit(cursor, top_end, top_index)
+                cursor = max(cursor, top_end + 1)
+            if stack:
+                emit(cursor, start - 1, stack[-1][1])
+            cursor = start
+            stack.append((end, index))
+        while stack:
+            top_end, top_index = stack.pop()
+            emit(cursor, top_end, top_index)
+            cursor = max(cursor, top_end + 1)
+
+        return starts, ends, indexes
+
+    def export_snapshot(self, filename, tables, blobs, stamps, converters=None):
+        '''
+        Compiles the given dictionaries to a snapshot file.
+        Input:
+            a) filename: The snapshot file.
+            b) tables: A dictionary with {table name}={Subnet}=value.
+            c) blobs: A dictionary with {blob name}=object to be stored as it is.
+            d) stamps: The stamps of the .json files the snapshot is built from.
+            e) converters: A dictionary with {table name}=function converting the values of the table, e.g., the ASNs to integers.
+        '''
+
+        if converters is None:
+            converters = {}
+        interned = {}
+        offsets = array('I', [0])
+        data = bytearray()
+
+        def intern(value):
+            encoded = ujson.dumps(value)
+            index = interned.get(encoded)
+            if index is None:
+                index = len(interned)
+                interned[encoded] = index
+                data.extend(encoded.encode('utf-8'))
+                offsets.append(len(data))
+            return index
+
+        sections = []
+        header = {'byteorder': sys.byteorder, 'stamps': stamps, 'tables': {}, 'blobs': {}}
+        position = 0
+        for name in tables:
+            for part in self.flatten(tables[name], intern, converters.get(name)):
+                sections.append(part.tobytes())
+            size = len(sections[-1]) // 4
+            header['tables'][name] = [size, position]
+            position += 12 * size
+        for name in blobs:
+            header['blobs'][name] = intern(blobs[name])
+
+        padding = (-len(data)) % 4
+        header['values'] = [len(offsets), position, position + 4 * len(offsets), len(data)]
+        sections.append(offsets.tobytes())
+        sections.append(bytes(data) + b'\0' * padding)
+
+        encoded_header = ujson.dumps(header).encode('utf-8')
+        encoded_header += b' ' * ((-len(encoded_header)) % 4)
+
+        # Writes to a temporary file first, so that a concurrent reader never maps a partial snapshot.
+        with open(filename + '.tmp', 'wb') as f:
+            f.write(MAGIC)
+            f.write(VERSION.to_bytes(4, 'little'))
+            f.write(len(encoded_header).to_bytes(4, 'little'))
+            f.write(encoded_header)
+            for section in sections:
+                f.write(section)
+        os.replace(filename + '.tmp', filename)
+
+    def import_snapshot(self, filename, stamps):
+        '''
+        Memory-maps a snapshot file.
+        Input:
+            a) filename: The snapshot file.
+            b) stamps: The current stamps of the .json files the snapshot has been built from.
+        Output:
+            a) True if the snapshot has been loaded, False if it is missing, corrupted or outdated.
+        '''
+
+        try:
+            with open(filename, 'rb') as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return False
+
+        try:
+            if mm[:8] != MAGIC or int.from_bytes(mm[8:12], 'little') != VERSION:
+                raise ValueError
+            header_size = int.from_bytes(mm[12:16], 'little')
+            header = ujson.loads(mm[16:16 + header_size].decode('utf-8'))
+            if header['byteorder'] != sys.byteorder or array('I').itemsize != 4 or stamps is None or header['stamps'] != stamps:
+                raise ValueError
+        except (ValueError, KeyError):
+            mm.close()
+            return False
+
+        self.mm = mm
+        base = 16 + header_size
+        view = memoryview(mm)
+        self.views.append(view)
+
+        def section(offset, size, kind='I'):
+            part = view[base + offset:base + offset + size * (4 if kind == 'I' else 1)]
+            part = part.cast(kind) if kind == 'I' else part
+            self.views.append(part)
+            return part
+
+        count, offsets, data, length = header['values']
+        self.values = value_table(section(offsets, count), section(data, length, 'B'))
+        for name in header['tables']:
+            size, offset = header['tables'][name]
+            self.tables[name] = prefix_table(
+                section(offset, size), section(offset + 4 * size, size), section(offset + 8 * size, size), self.values)
+        for name in header['blobs']:
+            self.blobs[name] = self.values[header['blobs'][name]]
+        return True
+
+    def close(self):
+        '''
+        Releases the memory-mapped snapshot.
+        '''
+
+        self.tables = {}
+        self.blobs = {}
+        self.values = None
+        for view in reversed(self.views):
+            view.release()
+        self.views = []
+        if self.mm is not None:
+            self.mm.close()
+            self.mm = None
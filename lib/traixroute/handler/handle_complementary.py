@@ -23,6 +23,9 @@
 from traixroute.downloader import download_files
 from traixroute.controller import string_handler
 from shutil import copyfile
+import ipaddress
+import socket
+import gzip
 import sys
 import os
 import SubnetTree
@@ -39,53 +42,126 @@ class asn_handle():
         self.homepath       = downloader.getDestinationPath()
         self.libpath        = libpath
 
-    def routeviews_extract(self, reserved_sub_tree):
+    def open_routeviews(self, binary=False):
         '''
-        Imports the file from routeviews to a Subnet Tree.
+        Opens the routeviews file, preferring the compressed file as it is downloaded. The uncompressed file
+        of older versions and of the default database is also supported.
         Input:
-            a) filename: The file name from routeviews to parse.
-            b) mypath: The directory path of the database folder.
-            c) reserved_sub_tree: The SubnetTree containing the reserved Subnets.
-            d) config: Dictionary that contains the config file.
-            e) db_path: The path to the Database directory.
-        Output: 
-            a) Stree: A SubnetTree containing IXP Subnet-to-ASNs.
-            b) temp_dict: A dictionary containing {IXP Subnet} = AS.
+            a) binary: True to open the file in binary mode.
+        Output:
+            a) The opened file, None if the file was not found.
         '''
 
-        handler = string_handler.string_handler()
-        try:
-            f = open(self.homepath + '/database' + self.route_filename)
-        except:
+        filename = self.homepath + '/database' + self.route_filename
+        if not os.path.exists(filename + '.gz') and not os.path.exists(filename):
             print(self.route_filename + ' was not found.')
             if not self.downloader.download_routeviews():
                 print("Could not download " + self.route_filename +
-                      ". Copying from the default database.")
-                try:
-                    copyfile(self.libpath + '/database/Default' + self.route_filename,
-                             self.homepath + '/database' + self.route_filename)
-                except:
-                    print('Could not copy ' + self.route_filename +
-                          ' from the default database.')
-            try:
-                f = open(self.homepath + '/database' + self.route_filename)
-            except:
-                print('Could not open ' + self.route_filename + '. Exiting.')
-                sys.exit(0)
+                      ". Using the default database.")
 
-        temp_dict = {}
-        Stree = SubnetTree.SubnetTree()
-        for line in f:
-            temp = line.split()
-            myip = handler.extract_ip(temp[0], 'IP')
-            if len(myip):
-                if handler.is_valid_ip_address(myip[0] + '/' + temp[1], 'Subnet', 'RouteViews'):
-                    if not handler.sub_prefix_check(myip[0] + '/' + temp[1], reserved_sub_tree):
-                        Stree[myip[0] + '/' + temp[1]]     = temp[2]
-                        temp_dict[myip[0] + '/' + temp[1]] = temp[2]
+        for filename in [self.homepath + '/database' + self.route_filename,
+                         self.libpath + '/database/Default' + self.route_filename]:
+            if os.path.exists(filename + '.gz'):
+                return gzip.open(filename + '.gz', 'rb' if binary else 'rt')
+            if os.path.exists(filename):
+                return open(filename, 'rb' if binary else 'r')
+        return None
+
+    def routeviews_extract(self, reserved_sub_tree, executor=None, parts=1):
+        '''
+        Imports the Subnet-to-AS mappings from the routeviews file. Without an executor, the (compressed) file is
+        parsed in one pass. Otherwise, the file is decompressed and split in byte ranges ending at line boundaries,
+        which are parsed by the executor, e.g., by a pool of processes.
+        Input:
+            a) reserved_sub_tree: The SubnetTree containing the reserved Subnets.
+            b) executor: The executor parsing the byte ranges, None to parse the file in the current thread.
+            c) parts: The number of byte ranges.
+        Output:
+            a) routeviews_dict: A dictionary containing {Subnet} = AS.
+        '''
+
+        f = self.open_routeviews(executor is not None)
+        if f is None:
+            print('Could not open ' + self.route_filename + '. Exiting.')
+            sys.exit(0)
+
+        if executor is None:
+            with f:
+                return parse_routeviews(f, reserved_sub_tree)
+
+        with f:
+            data = f.read()
+        size = -(-len(data) // max(1, parts))
+        ranges = []
+        start = 0
+        while start < len(data):
+            end = data.find(b'\n', start + size)
+            end = len(data) if end < 0 else end + 1
+            ranges.append(data[start:end])
+            start = end
+        del data
+
+        # The ranges are merged in the file order, so that a Subnet repeated in the file keeps its last AS.
+        routeviews_dict = {}
+        for mappings in executor.map(parse_routeviews_range, ranges):
+            routeviews_dict.update(mappings)
+        return routeviews_dict
+
+
+def parse_routeviews(lines, reserved_sub_tree):
+    '''
+    Parses the lines of the routeviews file.
+    Input:
+        a) lines: The lines, e.g., the opened file.
+        b) reserved_sub_tree: The SubnetTree containing the reserved Subnets.
+    Output:
+        a) routeviews_dict: A dictionary containing {Subnet} = AS.
+    '''
+
+    handler = string_handler.string_handler()
+    # Only the Subnets starting with the first octet of a reserved Subnet are checked against the reserved Subnets.
+    reserved_octets = set()
+    for node in reserved_handle().reserved_list:
+        [first, length] = [int(node.split('.')[0]), int(node.split('/')[1])]
+        span = 1 << (8 - min(length, 8))
+        reserved_octets.update(range(first, first + span))
+
+    # Each line is "Subnet IP<tab>prefix length<tab>AS". The Subnets with an invalid address, an invalid
+    # prefix length or host bits set are skipped.
+    routeviews_dict = {}
+    inet_aton = socket.inet_aton
+    from_bytes = int.from_bytes
+    for line in lines:
+        temp = line.split()
+        if len(temp) < 3 or temp[0].count('.') != 3:
+            continue
+        try:
+            address = from_bytes(inet_aton(temp[0]), 'big')
+            length = int(temp[1])
+        except (OSError, ValueError):
+            continue
+        if not 0 <= length <= 32 or address & (0xffffffff >> length):
+            continue
+        subnet = temp[0] + '/' + str(length)
+        if address >> 24 in reserved_octets and handler.sub_prefix_check(subnet, reserved_sub_tree):
+            continue
+        routeviews_dict[subnet] = temp[2]
+
+    return routeviews_dict
+
+
+def parse_routeviews_range(data):
+    '''
+    Parses a byte range of the routeviews file. It runs in the worker processes when the database is built.
+    Input:
+        a) data: The bytes of the range, ending at a line boundary.
+    Output:
+        a) A dictionary containing {Subnet} = AS.
+    '''
 
-        f.close()
-        return Stree, temp_dict
+    reserved = reserved_handle()
+    reserved.reserved_extract()
+    return parse_routeviews(data.decode('utf-8', 'replace').splitlines(), reserved.reserved_sub_tree)
 
 
 class asn_memb_info():
@@ -176,53 +252,60 @@ class Subnet_handle():
         Stree = SubnetTree.SubnetTree()
         help_tree = SubnetTree.SubnetTree()
         handle_string = string_handler.string_handler()
-        
-        for subnet in sorted(Sub):
-            check = handle_string.sub_prefix_check(subnet, help_tree)
-            
+
+        networks = {}
+        for subnet in Sub:
+            try:
+                networks[subnet] = ipaddress.ip_network(subnet, strict=False)
+            except ValueError:
+                print('Invalid IXP Subnet:', subnet)
+        for subnet in set(Sub) - set(networks):
+            Sub.pop(subnet)
+            final_subnet2country.pop(subnet, None)
+
+        # The Subnets are visited in network order, i.e., by network address and then by prefix length, so that each
+        # prefix is visited before its subprefixes. The prefixes in the tree do not overlap, thus a subprefix can only
+        # be covered by the last prefix inserted to the tree.
+        order = sorted(networks, key=lambda subnet: (networks[subnet].version, int(networks[subnet].network_address), networks[subnet].prefixlen))
+        prefix = None
+        prefix_version = 0
+        prefix_end = -1
+
+        for subnet in order:
+            network = networks[subnet]
+            check = network.version == prefix_version and int(network.network_address) <= prefix_end
+
             # If a subprefix does not exist and it is not a reserved prefix.
             if not check and not handle_string.sub_prefix_check(subnet, additional_tree) and not handle_string.sub_prefix_check(subnet, reserved_sub_tree):
                 Stree[subnet] = Sub[subnet]
                 help_tree[subnet] = subnet
+                prefix = subnet
+                prefix_version = network.version
+                prefix_end = int(network.broadcast_address)
             # If a subprefix exists.
             elif check:
-                # Keep initial tuple to find the corresponding prefix in order to keep only prefix in the last step.
-                initial_tuple = Stree[subnet]
-                # Find the prefix that maps to the initial tuple in order to keep the prefix, update the IXP names and delete subprefix in the last step.
-                prefix = [temp_subnet for temp_subnet, temp_ixp_name in Sub.items() if temp_ixp_name == initial_tuple][0]
-                
-                # Gather the IXP names of existing subprefixes in the Subnet Tree.
+                # Gather the IXP names of the prefix and the subprefix.
                 assign_tuple = []
-                for IXP1 in Stree[subnet]:
+                for IXP1 in Sub[prefix]:
                     for IXP2 in Sub[subnet]:
                         assign_tuple = assign_tuple + handle_string.assign_names(
                                 IXP1[1], IXP2[1], IXP1[0], IXP2[0])
-                
-                # Delete similar IXP names assigned to the same prefixes.
-                deleted = []
-                for i in range(0, len(assign_tuple) - 1):
-                    for j in range(i + 1, len(assign_tuple)):
-                        if len(handle_string.assign_names(assign_tuple[i][0], assign_tuple[j][0], assign_tuple[i][1], assign_tuple[j][1])) == 1:
-                            if j not in deleted:
-                                deleted = [j] + deleted
-                for node in deleted:
-                    del assign_tuple[node]
-
-                # Delete Subprefixes when there are Prefixes with same IXP names.
-                if assign_tuple == Stree[subnet]:
-                    Sub.pop(subnet)
-                    final_subnet2country.pop(subnet)
-                # Keep Prefixes (as dirty) and delete Subprefixes with different IXP names.
-                else:
-                    # Update prefix with the new IXP names
-                    Stree[prefix]     = assign_tuple
-                    Sub[prefix]       = assign_tuple
-                    # Delete subprefix
-                    Sub.pop(subnet)
-                    final_subnet2country.pop(subnet)
+
+                # Delete similar IXP names assigned to the same prefixes, keeping the first of them.
+                assign_tuple = [names for j, names in enumerate(assign_tuple) if not any(
+                        len(handle_string.assign_names(assign_tuple[i][0], names[0], assign_tuple[i][1], names[1])) == 1
+                        for i in range(j))]
+
+                # Keep Prefixes (as dirty) with the new IXP names, when the Subprefixes have different IXP names.
+                if assign_tuple != Sub[prefix]:
+                    Stree[prefix] = assign_tuple
+                    Sub[prefix] = assign_tuple
+                # Delete the Subprefix.
+                Sub.pop(subnet)
+                final_subnet2country.pop(subnet, None)
             else:
                 Sub.pop(subnet)
-                final_subnet2country.pop(subnet)
+                final_subnet2country.pop(subnet, None)
         
         return Stree, Sub, help_tree
 
@@ -20,7 +20,9 @@
 # You should have received a copy of the GNU General Public License
 # along with traIXroute.  If not, see <http://www.gnu.org/licenses/>.
 
+import subprocess
 import ujson
+import json
 import os
 import SubnetTree
 import sys
@@ -61,6 +63,110 @@ class handle_json():
             flag = True
         return data, flag
 
+    def iter_traces(self, filename, chunk_size=1 << 20, max_size=64 << 20):
+        '''
+        Streams the traceroute paths of a .json file without loading the whole file in memory.
+        Both a json array of traceroute paths and newline-delimited json (one traceroute path per line) are supported.
+        Input:
+            a) filename: The .json file to read.
+            b) chunk_size: The number of characters to read from the file at once.
+            c) max_size: The maximum number of characters of a traceroute path, to bound the memory for invalid files.
+        Output:
+            a) A generator of the traceroute paths in the order they appear in the file.
+        '''
+
+        decoder = json.JSONDecoder()
+        whitespace = ' \t\n\r'
+
+        with open(filename, 'r') as fp:
+            buf = ''
+            pos = 0
+            eof = False
+            in_array = None
+
+            while True:
+                # Skips whitespace and the separators of the json array.
+                while True:
+                    while pos < len(buf) and buf[pos] in whitespace:
+                        pos += 1
+                    if pos < len(buf) or eof:
+                        break
+                    buf = fp.read(chunk_size)
+                    pos = 0
+                    eof = not buf
+
+                if pos >= len(buf):
+                    if in_array:
+                        raise ValueError('Unexpected end of file, expected \']\'.')
+                    return
+                if in_array is None:
+                    in_array = buf[pos] == '['
+                    if in_array:
+                        pos += 1
+                        continue
+                if in_array and buf[pos] == ',':
+                    pos += 1
+                    continue
+                if in_array and buf[pos] == ']':
+                    return
+
+                try:
+                    trace, end = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError as error:
+                    # The current traceroute path may have not been read completely, only if the decoder stopped at
+                    # the last token of the buffer or at a string that is not closed in the buffer.
+                    if eof or (error.pos < len(buf) - 16 and not error.msg.startswith('Unterminated string')):
+                        raise
+                    if len(buf) - pos > max_size:
+                        raise ValueError('A traceroute path exceeds ' + str(max_size) + ' characters.')
+                    # The buffer is at least doubled, so that a long traceroute path is decoded a few times only.
+                    data = fp.read(max(chunk_size, len(buf) - pos))
+                    eof = not data
+                    buf = buf[pos:] + data
+                    pos = 0
+                    continue
+                # Drops the consumed part of the buffer.
+                if end > chunk_size:
+                    buf = buf[end:]
+                    end = 0
+                pos = end
+                yield trace
+
+    def iter_scamper(self, filename):
+        '''
+        Streams the traceroute paths of a scamper output file, one json object per line as written by "scamper -O json".
+        Warts files are converted on the fly with sc_warts2json.
+        Input:
+            a) filename: The scamper json or warts file.
+        Output:
+            a) A generator of the scamper traces in the order they appear in the file.
+        '''
+
+        with open(filename, 'rb') as fp:
+            # The warts records start with the magic number 0x1205.
+            is_warts = fp.read(2) == b'\x12\x05'
+
+        if not is_warts:
+            with open(filename, 'r') as fp:
+                for line in fp:
+                    if line.strip():
+                        trace = ujson.loads(line)
+                        if trace.get('type') == 'trace':
+                            yield trace
+            return
+
+        process = subprocess.Popen(['sc_warts2json', filename], stdout=subprocess.PIPE)
+        try:
+            for line in process.stdout:
+                if line.strip():
+                    trace = ujson.loads(line.decode('utf-8'))
+                    if trace.get('type') == 'trace':
+                        yield trace
+        finally:
+            process.stdout.close()
+            if process.wait():
+                raise ValueError('sc_warts2json failed to convert ' + filename + '.')
+
     def export_trace_from_file(self, trace):
         '''
         Exports the traces from an input json-based file to a new file, in json format too. As input example, see Examples/test_traceroute_paths.json
@@ -72,6 +178,7 @@ class handle_json():
             c) trace_dst: A string with the traceroute's destination. The destination might be either IP or url.
             d) trace_src: A string with the traceroute's source. The source might be either IP or url.
             e) trace_info: A string with information related to the current traceroute path.
+        Raises a ValueError if the traceroute path has a wrong format.
         '''
 
         flag = False
@@ -89,10 +196,8 @@ class handle_json():
                 trace_info = trace['info']
             path_to_parse = trace['result']
             len_path = len(path_to_parse)
-        except:
-            print('Wrong json format. Exiting.')
-            print(trace)
-            os._exit(0)
+        except (KeyError, TypeError):
+            raise ValueError('Wrong json format.')
 
         tmp_list = []
         for hop_to_parse in path_to_parse:
@@ -131,16 +236,14 @@ class handle_json():
                     IP = hop_to_parse['from']
                     if('info' in hop_to_parse.keys()):
                         info = str(hop_to_parse['info'])
-                except:
-                    print('Wrong format, hop: ' + str(i + 1) + '. Exiting.')
-                    print(trace)
-                    os._exit(0)
+                except (KeyError, TypeError):
+                    raise ValueError('Wrong format, hop: ' + str(i + 1) + '.')
             current_trace.append(IP)
             current_info.append(info)
 
         return current_trace, current_info, trace_dst, trace_src, trace_info
 
-    def export_trace_from_ripe_file(self, trace):
+    def export_trace_from_ripe_file(self, trace, strict=False):
         '''
         Exports the traces from an input ripe-json-based file to a new file, in json format too. As input example, see Examples/test_traceroute_paths_from_ripe.json
         Input:
@@ -151,9 +254,12 @@ class handle_json():
             c) trace_dst: A string with the traceroute's destination. The destination might be either IP or url.
             d) trace_src: A string with the traceroute's source. The source might be either IP or url.
             e) trace_info: A string with information related to the current traceroute path.
+        If strict is True, a ValueError is raised for the unsupported or invalid traceroute paths instead of printing them.
         '''
         
-        if(trace['af'] != 4 or trace['type'] != 'traceroute'):
+        if trace.get('af') != 4 or trace.get('type') != 'traceroute':
+            if strict:
+                raise ValueError('TraIXroute only supports Traceroute and IPv4 measurements.')
             print('TraIXroute only supports Traceroute and IPv4 measurements. The following traceroute path has been skipped:')
             print(trace)
 
@@ -183,11 +289,49 @@ class handle_json():
                         current_trace.append(ip)
                         current_info.append(delay)
         except KeyError:
+            if strict:
+                raise ValueError('Invalid traceroute path format.')
             print('Invalid traceroute path format. Exiting.')
             print(trace)
 
         return current_trace, current_info, trace_dst, trace_src, trace_info
         
+    def export_trace_from_scamper(self, trace):
+        '''
+        Exports the IP path from a trace in scamper json format.
+        Input:
+            a) trace: The scamper trace.
+        Output:
+            a) current_trace: A list [IP1,IP2,...IPN].
+            b) current_info: A list [string1, string2,...stringN] with the rtts of the replies from each IP respectively.
+            c) trace_dst: A string with the traceroute's destination.
+            d) trace_src: A string with the traceroute's source.
+            e) trace_info: A string with the name of the list the trace belongs to.
+        '''
+
+        current_trace = []
+        current_info = []
+        trace_dst = trace.get('dst', '-')
+        trace_src = trace.get('src', '-')
+        trace_info = trace.get('list_name', '')
+
+        # The replies of each hop, in the order they have been received.
+        replies = {}
+        for reply in trace.get('hops', []):
+            replies.setdefault(reply['probe_ttl'], []).append(reply)
+
+        for ttl in range(1, max(replies) + 1 if replies else 1):
+            if ttl not in replies:
+                current_trace.append('*')
+                current_info.append('')
+                continue
+            ip = replies[ttl][0]['addr']
+            current_trace.append(ip)
+            current_info.append(' '.join(str(round(reply['rtt'], 3)) + ' ms'
+                                         for reply in replies[ttl] if reply['addr'] == ip and 'rtt' in reply))
+
+        return current_trace, current_info, trace_dst, trace_src, trace_info
+
     def choose_ip(self, packet):
         '''
         Returns the first valid IP reply for a given traceroute hop.
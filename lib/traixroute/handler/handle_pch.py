@@ -27,7 +27,6 @@ from traixroute.downloader import download_files
 from shutil import copyfile
 import SubnetTree
 import sys
-import re
 
 
 class pch_handle():
@@ -85,36 +84,28 @@ class pch_handle():
         '''
 
         doc = self.file_opener(self.filename_ixp_membership, 3)
-        tree = SubnetTree.SubnetTree()
         ixpip2asn = {}
-        sub_to_ixp = {}
         hstring = string_handler.string_handler()
-        dumped_ixps = []
-        
+        dumped_ixps = set()
+
         # Skip the first line of the file.
         next(doc)
-        for line in doc:
-            temp_string = line.split(',')
-            if len(temp_string) > 1:
-                ip = hstring.extract_ip(temp_string[1], 'IP')
-
-                for inode in ip:
-                    inode = hstring.clean_ip(inode, 'IP')
-                    if hstring.is_valid_ip_address(inode, 'IP', 'PCH') and temp_string[3].replace(' ', '') != '':
-
-                        subnet = hstring.extract_ip(temp_string[0], 'Subnet')
-                        for snode in subnet:
-                            snode = hstring.clean_ip(snode, 'Subnet')
-                            if hstring.is_valid_ip_address(snode, 'Subnet','PCH'):
-                                tree[snode] = snode
-                                if (inode in tree and inode not in ixpip2asn.keys() and inode not in dumped_ixps and inode not in reserved_tree) or (inode in add_info_tree):
-                                    ixpip2asn[inode] = [
-                                        temp_string[3].replace(' ', '')]
-                                elif inode in ixpip2asn.keys():
-                                    if ixpip2asn[inode] != [temp_string[3].replace(' ', '')]:
-                                        ixpip2asn.pop(inode, None)
-                                        dumped_ixps.append(inode)
-                                tree.remove(snode)
+        rows = [temp_string for temp_string in (line.split(',') for line in doc) if len(temp_string) > 3]
+        [ips, ip_lengths] = hstring.parse_ips([temp_string[1] for temp_string in rows], 'IP')
+        [subnets, subnet_lengths] = hstring.parse_ips([temp_string[0] for temp_string in rows], 'Subnet')
+        for i, temp_string in enumerate(rows):
+            asn = temp_string[3].replace(' ', '')
+            length = subnet_lengths[i]
+            if ip_lengths[i] < 0 or length < 0 or asn == '':
+                continue
+            inode = string_handler.int2ip(ips[i])
+            in_subnet = ips[i] & string_handler.netmasks[length] == subnets[i]
+            if (in_subnet and inode not in ixpip2asn and inode not in dumped_ixps and inode not in reserved_tree) or (inode in add_info_tree):
+                ixpip2asn[inode] = [asn]
+            elif inode in ixpip2asn:
+                if ixpip2asn[inode] != [asn]:
+                    ixpip2asn.pop(inode, None)
+                    dumped_ixps.add(inode)
         doc.close()
         return ixpip2asn
 
@@ -141,56 +132,53 @@ class pch_handle():
 
         # Skip the first line of the file.
         next(doc)
-        for line in doc:
-            temp_string = line.split(',')
-            if len(temp_string) > 6:
-                mykey = temp_string[0]
-                myip = handled_string.extract_ip(temp_string[6], 'Subnet')
-
-                for ips in myip:
-                    # Clean misspelled Subnets.
-                    ips = handled_string.clean_ip(ips, 'Subnet')
+        rows = [temp_string for temp_string in (line.split(',') for line in doc) if len(temp_string) > 6]
+        # Clean misspelled Subnets.
+        prefixes = handled_string.canonical_ips([temp_string[6] for temp_string in rows], 'Subnet')
+        for temp_string, ips in zip(rows, prefixes):
+            mykey = temp_string[0]
 
-                    if ips != '' and handled_string.string_comparison(temp_string[2], 'Active'):
-                        if handled_string.is_valid_ip_address(ips, 'Subnet', 'PCH') and ips not in subnets:
-                            if mykey in long_mem.keys():
-                                IXP_cc[ips] = IXP_region[mykey]
-                                [long_name, short_name] = handled_string.clean_long_short(
-                                    long_mem[mykey], temp_string[1])
-                                if long_name == '':
-                                    long_name = short_name
-                                elif short_name == '':
-                                    short_name = long_name
-                                if len(long_name) > len(short_name):
-                                    subnets[ips] = [[long_name, short_name]]
-                                else:
-                                    subnets[ips] = [[short_name, long_name]]
+            if ips is not None and handled_string.string_comparison(temp_string[2], 'Active'):
+                if ips not in subnets:
+                    if mykey in long_mem.keys():
+                        IXP_cc[ips] = IXP_region[mykey]
+                        [long_name, short_name] = handled_string.clean_long_short(
+                            long_mem[mykey], temp_string[1])
+                        if long_name == '':
+                            long_name = short_name
+                        elif short_name == '':
+                            short_name = long_name
+                        if len(long_name) > len(short_name):
+                            subnets[ips] = [[long_name, short_name]]
+                        else:
+                            subnets[ips] = [[short_name, long_name]]
 
-                            elif temp_string[1] != '':
-                                [long_name, short_name] = handled_string.clean_long_short("", temp_string[1])
-                                if len(short_name) < len(long_name):
-                                    subnets[ips] = [['', short_name]]
-                                else:
-                                    subnets[ips] = [['', long_name]]
-                            else:
-                                continue
-                        elif ips in subnets:
-                            IXP_cc[ips] = IXP_region[mykey]
-                            [long_name, short_name] = handled_string.clean_long_short(
-                                long_mem[mykey], temp_string[1])
-                            if short_name > long_name:
-                                tmp_name_string = long_name
-                                long_name = short_name
-                                short_name = tmp_name_string
-                            assigned_tuple = []
-                            for IXP in subnets[ips]:
-                                assigned_tuple = assigned_tuple + \
-                                    handled_string.assign_names(
-                                        IXP[0], short_name, IXP[1], long_name)
-                            subnets[ips] = assigned_tuple
+                    elif temp_string[1] != '':
+                        [long_name, short_name] = handled_string.clean_long_short("", temp_string[1])
+                        if len(short_name) < len(long_name):
+                            subnets[ips] = [['', short_name]]
+                        else:
+                            subnets[ips] = [['', long_name]]
+                    else:
+                        continue
+                elif ips in subnets:
+                    if mykey in IXP_region:
+                        IXP_cc[ips] = IXP_region[mykey]
+                    [long_name, short_name] = handled_string.clean_long_short(
+                        long_mem.get(mykey, ''), temp_string[1])
+                    if short_name > long_name:
+                        tmp_name_string = long_name
+                        long_name = short_name
+                        short_name = tmp_name_string
+                    assigned_tuple = []
+                    for IXP in subnets[ips]:
+                        assigned_tuple = assigned_tuple + \
+                            handled_string.assign_names(
+                                IXP[0], short_name, IXP[1], long_name)
+                    subnets[ips] = assigned_tuple
 
-                        if ips in subnets:
-                            Subnet_names[ips] = subnets[ips]
+                if ips in subnets:
+                    Subnet_names[ips] = subnets[ips]
 
         doc.close()
         return (subnets, IXP_cc, Subnet_names)
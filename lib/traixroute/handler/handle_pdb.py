@@ -188,32 +188,30 @@ class peering_handle():
         pfxs_dict = {}
         subnet2region = {}
         
-        for node in json_pfx:
-            for subnet in handler.extract_ip(node['prefix'], 'Subnet'):
-                
-                subnet = handler.clean_ip(subnet, 'Subnet')
-                if handler.is_valid_ip_address(subnet, 'Subnet', 'PDB'):
-                    
-                    ixlan_id = node['ixlan_id']
-                    if ixlan_id in ixlan_dict:
-                        ix_id = ixlan_dict[ixlan_id]
+        prefixes = handler.canonical_ips([node['prefix'] for node in json_pfx], 'Subnet')
+        for node, subnet in zip(json_pfx, prefixes):
+            if subnet is not None:
+
+                ixlan_id = node['ixlan_id']
+                if ixlan_id in ixlan_dict:
+                    ix_id = ixlan_dict[ixlan_id]
                         
-                        # Checking if there exists IXP name for the given prefix and if the candidate IXP prefix is already inside the dictionary that aggregates the PDB prefixes
-                        if ix_id in id_to_names and subnet not in pfxs_dict:
-                            if id_to_names != ['', '']:
-                                pfxs_dict[subnet] = [id_to_names[ix_id]]
-                            else:
-                                continue
-                            temp_subnet_tree[subnet]    = [id_to_names[ix_id]]
-                            subnet2region[subnet]       = region_dict[ix_id]
+                    # Checking if there exists IXP name for the given prefix and if the candidate IXP prefix is already inside the dictionary that aggregates the PDB prefixes
+                    if ix_id in id_to_names and subnet not in pfxs_dict:
+                        if id_to_names != ['', '']:
+                            pfxs_dict[subnet] = [id_to_names[ix_id]]
+                        else:
+                            continue
+                        temp_subnet_tree[subnet]    = [id_to_names[ix_id]]
+                        subnet2region[subnet]       = region_dict[ix_id]
                         
-                        elif subnet in pfx_dict:
-                            assign_tuple = []
-                            for IXP in pfx_dict[subnet]:
-                                assign_tuple = assign_tuple + \
-                                    handler.assign_names(IXP[1], id_to_names[ix_id][1], IXP[0], id_to_names[ix_id][0])
-                            pfxs_dict[subnet]       = assign_tuple
-                            subnet2regions[subnet]  = region_dict[ix_id]
+                    elif subnet in pfx_dict:
+                        assign_tuple = []
+                        for IXP in pfx_dict[subnet]:
+                            assign_tuple = assign_tuple + \
+                                handler.assign_names(IXP[1], id_to_names[ix_id][1], IXP[0], id_to_names[ix_id][0])
+                        pfxs_dict[subnet]       = assign_tuple
+                        subnet2regions[subnet]  = region_dict[ix_id]
         
         return (pfxs_dict, temp_subnet_tree, subnet2region)
 
@@ -230,26 +228,18 @@ class peering_handle():
 
         handler = string_handler.string_handler()
         ixp_to_asn = {}
-        dumped_ixps = []
-
-        for node in json_ip:
-            if node['ipaddr4'] is None:
-                temp = ''
-            else:
-                temp = node['ipaddr4']
-            ips = handler.extract_ip(temp, 'IP')
-
-            for ixpip in ips:
-            
-                ixpip = handler.clean_ip(ixpip, 'IP')
-                if handler.is_valid_ip_address(ixpip, 'IP', 'PDB'):
-                    
-                    if (ixpip not in ixp_to_asn.keys() and ixpip not in dumped_ixps and ixpip not in reserved_tree and ixpip in temp_subnet_tree):
-                        ixp_to_asn[ixpip] = [str(node['asn'])]
-                    elif ixpip in ixp_to_asn.keys():
-                        if ixp_to_asn[ixpip] != [str(node['asn'])]:
-                            dumped_ixps.append(ixpip)
-                            ixp_to_asn.pop(ixpip, None)
+        dumped_ixps = set()
+
+        ips = handler.canonical_ips([node['ipaddr4'] for node in json_ip], 'IP')
+        for node, ixpip in zip(json_ip, ips):
+            if ixpip is not None:
+
+                if (ixpip not in ixp_to_asn.keys() and ixpip not in dumped_ixps and ixpip not in reserved_tree and ixpip in temp_subnet_tree):
+                    ixp_to_asn[ixpip] = [str(node['asn'])]
+                elif ixpip in ixp_to_asn.keys():
+                    if ixp_to_asn[ixpip] != [str(node['asn'])]:
+                        dumped_ixps.add(ixpip)
+                        ixp_to_asn.pop(ixpip, None)
 
         return ixp_to_asn
 
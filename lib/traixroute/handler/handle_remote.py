@@ -57,11 +57,12 @@ class handle_remote():
 
         return rp_dataset
 
-    def handle_import(self, json_handle):
+    def handle_import(self, json_handle, export=True):
         '''
         Imports the remote peeing .json dabaset to the database. Otherwise, it lists the available remote peering datasets for each IXP to finally construct an aggregated dataset.
         Input:
             a) json_handle: Instance of the handle_json class to manipulate .json files.
+            b) export: True to export the aggregated dataset to the traIXroute home folder.
         Output:
             a) rp_database: A dictionary {IP}={IXP short name: {IXP Country, IXP City}} containing remote peering related information.
         '''
@@ -73,6 +74,8 @@ class handle_remote():
                 self.directory) if file.endswith(".json")]
 
             rp_database = self.extract_rp_per_ixp(libfiles, json_handle)
+            if not export:
+                return rp_database
 
             if not os.path.exists(self.homedir):
                 os.makedirs(self.homedir)
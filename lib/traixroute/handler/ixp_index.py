@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2016 Institute of Computer Science of the Foundation for Research and Technology - Hellas (FORTH)
+# Authors: Michalis Bamiedakis, Dimitris Mavrommatis and George Nomikos
+#
+# Contact Author: George Nomikos
+# Contact Email: gnomikos [at] ics.forth.gr
+#
+# This file is part of traIXroute.
+#
+# traIXroute is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# traIXroute is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with traIXroute.  If not, see <http://www.gnu.org/licenses/>.
+
+from traixroute.controller import string_handler
+from collections import defaultdict
+from itertools import repeat
+from multiprocessing import cpu_count
+import concurrent.futures
+
+
+def match_names(names, member_names):
+    '''
+    Finds the similar member names of each name. It runs in the worker processes when the index is built.
+    Input:
+        a) names: A list with the cleaned IXP names.
+        b) member_names: A list with the cleaned IXP names with members.
+    Output:
+        a) A list with the positions of the similar member names for each name.
+    '''
+
+    handle = string_handler.string_handler()
+    return [[j for j, member_name in enumerate(member_names) if handle.similar_strings(name, member_name)] for name in names]
+
+
+class ixp_index():
+    '''
+    Indexes the IXP memberships of the ASes, so that the AS_M conditions of the rules are resolved with set lookups.
+    Each distinct pair of IXP long and short names gets an identifier and the names of all the pairs are compared
+    once, when the database is built.
+    '''
+
+    def __init__(self):
+        # self.ids: A dictionary with {(IXP long name, IXP short name)}=IXP identifier.
+        self.ids = {}
+        # self.asn2ids: A dictionary with {ASN in integer format}=set of the identifiers of the IXPs the AS is member of.
+        self.asn2ids = {}
+        # self.similar: A list with the set of the identifiers of the IXPs with similar names for each IXP identifier.
+        self.similar = []
+        # self.data: The index in json format, to be stored with the merged database.
+        self.data = None
+
+    def build_index(self, sub2name, asnmemb, num_of_cores, pool_options=None):
+        '''
+        Builds the index from the merged database.
+        Input:
+            a) sub2name: A dictionary with {IXP Subnet}=[[IXP long name, IXP short name],...].
+            b) asnmemb: A dictionary with {ASN}=[[IXP long name, IXP short name],...].
+            c) num_of_cores: The number of processes to compare the IXP names.
+            d) pool_options: The keyword arguments of the process pool, see database.pool_options.
+        Output:
+            a) The index in json format.
+        '''
+
+        handle = string_handler.string_handler()
+        if num_of_cores < 1:
+            num_of_cores = cpu_count()
+
+        pairs = {}
+        for nodes in list(sub2name.values()) + list(asnmemb.values()):
+            for node in nodes:
+                pairs.setdefault(tuple(node), len(pairs))
+        asn2ids = {asn: sorted({pairs[tuple(node)] for node in asnmemb[asn]}) for asn in asnmemb}
+        members = sorted({pid for ids in asn2ids.values() for pid in ids})
+        pairs = list(pairs)
+
+        # The names are compared after cleaning them, as in string_comparison, and the empty ones never match.
+        names = sorted({handle.string_removal(name) for pair in pairs for name in pair} - {''})
+        name2members = defaultdict(set)
+        for pid in members:
+            for name in pairs[pid]:
+                name2members[handle.string_removal(name)].add(pid)
+        name2members.pop('', None)
+        member_names = sorted(name2members)
+
+        size = max(1, len(names) // (4 * max(1, num_of_cores)))
+        chunks = [names[x:x + size] for x in range(0, len(names), size)]
+        if num_of_cores > 1 and len(chunks) > 1:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=num_of_cores, **(pool_options or {})) as executor:
+                matches = list(executor.map(match_names, chunks, repeat(member_names)))
+        else:
+            matches = [match_names(chunk, member_names) for chunk in chunks]
+        similar_names = dict(zip(names, [match for chunk in matches for match in chunk]))
+
+        similar = []
+        for pair in pairs:
+            similar_ids = set()
+            for name in pair:
+                for j in similar_names.get(handle.string_removal(name), []):
+                    similar_ids |= name2members[member_names[j]]
+            similar.append(sorted(similar_ids))
+
+        data = {'pairs': [list(pair) for pair in pairs], 'asn2ids': asn2ids, 'similar': similar}
+        self.load_index(data)
+        return data
+
+    def load_index(self, data):
+        '''
+        Loads the index from its json format.
+        Input:
+            a) data: The index in json format.
+        '''
+
+        self.data = data
+        self.ids = {tuple(pair): pid for pid, pair in enumerate(data['pairs'])}
+        self.asn2ids = {int(asn): frozenset(ids) for asn, ids in data['asn2ids'].items() if asn.isdigit()}
+        self.similar = [frozenset(ids) for ids in data['similar']]
+
+    def is_member(self, asn, ix_long, ix_short):
+        '''
+        Checks if an AS is member of an IXP with names similar to the given ones.
+        Input:
+            a) asn: The ASN in integer format.
+            b) ix_long, ix_short: The IXP long and short names.
+        Output:
+            a) True if the AS is member of a similar IXP, False if it is not, None if the IXP names are not indexed.
+        '''
+
+        pid = self.ids.get((ix_long, ix_short))
+        if pid is None:
+            return None
+        return not self.similar[pid].isdisjoint(self.asn2ids.get(asn, ()))
@@ -20,18 +20,60 @@
 # You should have received a copy of the GNU General Public License
 # along with traIXroute.  If not, see <http://www.gnu.org/licenses/>.
 
+from traixroute.handler import db_snapshot
 import SubnetTree
 import socket
 import os
 
 
+def extract_paths(db_extract, ip_paths):
+    '''
+    Analyses many IP paths at once. When the database has been loaded from the snapshot, all the hops of the paths
+    are resolved with one lookup per table, otherwise each path is analysed separately.
+    Input:
+        a) db_extract: The database_handle class.
+        b) ip_paths: A list with the IP paths.
+    Output:
+        a) A list with a path_info_extraction instance for each IP path.
+    '''
+
+    ip2asn      = db_extract.final_ixp2asn
+    Subnet_tree = db_extract.subTree
+    prefix2asn  = db_extract.asn_routeviews
+
+    if not all(hasattr(table, 'find_all') for table in (ip2asn, Subnet_tree, prefix2asn)):
+        path_infos = []
+        for ip_path in ip_paths:
+            path_info_extract = path_info_extraction()
+            path_info_extract.path_info_extraction(db_extract, ip_path)
+            path_infos.append(path_info_extract)
+        return path_infos
+
+    hops = [path_cur for ip_path in ip_paths for path_cur in ip_path]
+    addresses = db_snapshot.ip2int_all(hops)
+    ixp_ips = ip2asn.find_all(addresses)
+    ixp_subnets = Subnet_tree.find_all(addresses)
+    prefixes = prefix2asn.find_all(addresses)
+
+    path_infos = []
+    hop = 0
+    for ip_path in ip_paths:
+        path_info_extract = path_info_extraction()
+        path_info_extract.resolve_hops(ixp_ips[hop:hop + len(ip_path)], ixp_subnets[hop:hop + len(ip_path)],
+                                       prefixes[hop:hop + len(ip_path)], ip2asn, Subnet_tree, prefix2asn)
+        path_infos.append(path_info_extract)
+        hop += len(ip_path)
+    return path_infos
+
+
 class path_info_extraction():
     '''
     This module provides the analysis of the path based on the extracted datasets.
     '''
 
     def __init__(self):
-        # self.asn_list: A list with the AS numbers encountered in the IP path.
+        # self.asn_list: A list with the AS numbers encountered in the IP path. The ASNs of each hop are a sequence of
+        # integers, with more than one ASN for MOAS prefixes and none for the unresolved hops.
         self.asn_list = []
         # self.type_vector: A list with the detected types (IXP IP, Prefix,
         # Normal IP) in the IP path.
@@ -59,7 +101,7 @@ class path_info_extraction():
         prefix2asn  = db_extract.asn_routeviews
 
         path_length = len(ip_path)
-        self.asn_list = ['*'] * path_length
+        self.asn_list = [()] * path_length
         self.ixp_long_names = [['No Long Name']] * path_length
         self.ixp_short_names = [['No Short Name']] * path_length
         self.type_vector = ['Unresolved'] * path_length
@@ -72,7 +114,7 @@ class path_info_extraction():
                 if len(Subnet_tree[path_cur]) > 1:
                     self.unsure[i] = '? '
                 # It searches the ASN of the detected IXP IP.
-                self.asn_list[i] = ip2asn[path_cur][0]
+                self.asn_list[i] = db_snapshot.asn2int(ip2asn[path_cur][0])
 
                 # It also searches for the IXP long/short name in the database.
                 self.type_vector[i] = 'IXP IP'
@@ -101,3 +143,39 @@ class path_info_extraction():
             elif path_cur in prefix2asn:
                 self.asn_list[i] = prefix2asn[path_cur]
                 self.type_vector[i] = 'Normal IP'
+
+    def resolve_hops(self, ixp_ips, ixp_subnets, prefixes, ip2asn, Subnet_tree, prefix2asn):
+        '''
+        Analyses an IP path whose hops have already been looked up in the snapshot tables.
+        Input:
+            a) ixp_ips, ixp_subnets, prefixes: The positions of the hops in the IXP IP, IXP Subnet and routeviews tables, -1 if not found.
+            b) ip2asn, Subnet_tree, prefix2asn: The IXP IP, IXP Subnet and routeviews tables.
+        '''
+
+        path_length = len(ixp_ips)
+        self.asn_list = [()] * path_length
+        self.ixp_long_names = [['No Long Name']] * path_length
+        self.ixp_short_names = [['No Short Name']] * path_length
+        self.type_vector = ['Unresolved'] * path_length
+        self.unsure = [''] * path_length
+
+        for i in range(path_length):
+            if ixp_subnets[i] >= 0:
+                temp = Subnet_tree.value(ixp_subnets[i])
+                self.ixp_long_names[i] = [IXP[0] for IXP in temp]
+                self.ixp_short_names[i] = [IXP[1] for IXP in temp]
+                self.ixp_ip_indices.append(i)
+                # If there is an IXP hit.
+                if ixp_ips[i] >= 0:
+                    if len(temp) > 1:
+                        self.unsure[i] = '? '
+                    self.asn_list[i] = ip2asn.value(ixp_ips[i])
+                    self.type_vector[i] = 'IXP IP'
+                # Else if there is an IXP Subnet hit.
+                else:
+                    self.type_vector[i] = 'IXP prefix'
+
+            # Else for the normal IPs, it finds the ASN using the routeviews dataset.
+            elif prefixes[i] >= 0:
+                self.asn_list[i] = prefix2asn.value(prefixes[i])
+                self.type_vector[i] = 'Normal IP'
@@ -1 +1 @@
-__all__ = ['trace_tool']
\ No newline at end of file
+__all__ = ['trace_tool', 'probe_scheduler']
\ No newline at end of file
@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2016 Institute of Computer Science of the Foundation for Research and Technology - Hellas (FORTH)
+# Authors: Michalis Bamiedakis, Dimitris Mavrommatis and George Nomikos
+#
+# Contact Author: George Nomikos
+# Contact Email: gnomikos [at] ics.forth.gr
+#
+# This file is part of traIXroute.
+#
+# traIXroute is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# traIXroute is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with traIXroute.  If not, see <http://www.gnu.org/licenses/>.
+
+from traixroute.tracetools import trace_tool
+from traixroute.handler import handle_json
+from collections import deque
+import subprocess
+import threading
+import binascii
+import asyncio
+import socket
+import queue
+import ujson
+import sys
+
+
+class token_bucket():
+    '''
+    Limits the rate of the probes to the given packets per second.
+    '''
+
+    def __init__(self, rate, size):
+        # self.rate: The packets per second, 0 or less for no limit.
+        self.rate = rate
+        # self.capacity: The maximum number of packets sent in a burst.
+        self.capacity = max(rate, size)
+        self.tokens = self.capacity
+        self.last = None
+
+    async def consume(self, size):
+        '''
+        Waits until the given number of packets can be sent.
+        Input:
+            a) size: The number of packets.
+        '''
+
+        if self.rate <= 0:
+            return
+        loop = asyncio.get_event_loop()
+        while True:
+            now = loop.time()
+            if self.last is not None:
+                self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            if self.tokens >= size:
+                self.tokens -= size
+                return
+            await asyncio.sleep((size - self.tokens) / self.rate)
+
+
+class scamper_session():
+    '''
+    Sends the traces to a long-lived scamper instance through its control socket, i.e., scamper started
+    with "scamper -P port", and receives the results in json format.
+    '''
+
+    def __init__(self, address, arguments):
+        # self.address: The "host:port" of the scamper control socket.
+        host, _, port = address.rpartition(':')
+        self.host = host if host else '127.0.0.1'
+        self.port = int(port)
+        self.arguments = arguments
+        self.reader = None
+        self.writer = None
+        self.receiver = None
+        # self.credits: Released each time scamper is ready to accept one more command.
+        self.credits = None
+        # self.sent: The [destination, future] of the commands waiting to be acknowledged.
+        self.sent = deque()
+        # self.pending: A dictionary with {destination}=deque of the futures waiting for the results.
+        self.pending = {}
+
+    async def connect(self):
+        '''
+        Connects and attaches to the scamper control socket.
+        '''
+
+        self.credits = asyncio.Semaphore(0)
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.write(b'attach format json\n')
+        self.receiver = asyncio.ensure_future(self.receive())
+
+    async def trace(self, IP_name):
+        '''
+        Probes an IP.
+        Input:
+            a) IP_name: The IP to probe.
+        Output:
+            a) route: The IP path list.
+            b) mytime: The list with the hop delays.
+        '''
+
+        await self.credits.acquire()
+        if self.receiver.done():
+            # Lets the next waiting trace fail as well.
+            self.credits.release()
+            raise ConnectionError('The scamper control socket has been closed.')
+        future = asyncio.get_event_loop().create_future()
+        self.sent.append([IP_name, future])
+        self.pending.setdefault(IP_name, deque()).append(future)
+        command = 'trace ' + self.arguments + ' ' + IP_name if self.arguments else 'trace ' + IP_name
+        self.writer.write(command.encode('utf-8') + b'\n')
+        return await future
+
+    async def receive(self):
+        '''
+        Reads the responses of scamper and resolves the futures of the completed traces.
+        '''
+
+        buffered = b''
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                line = line.decode('utf-8').strip()
+                if line == 'MORE':
+                    self.credits.release()
+                elif line.startswith('OK'):
+                    if line != 'OK' and self.sent:
+                        self.sent.popleft()
+                elif line.startswith('ERR'):
+                    if self.sent:
+                        [IP_name, future] = self.sent.popleft()
+                        self.pending[IP_name].remove(future)
+                        print('--> Scamper rejected the probe to', IP_name + ':', line)
+                        future.set_result([[], []])
+                elif line.startswith('DATA'):
+                    # The data are uuencoded, one json object per line once decoded.
+                    data = await self.reader.readexactly(int(line.split(' ')[1]))
+                    for uu_line in data.splitlines():
+                        if uu_line:
+                            buffered += binascii.a2b_uu(uu_line)
+                    *records, buffered = buffered.split(b'\n')
+                    for record in records:
+                        self.resolve(ujson.loads(record.decode('utf-8')))
+        finally:
+            # Unblocks the pending traces if the connection is lost.
+            self.credits.release()
+            for futures in self.pending.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(ConnectionError('The scamper control socket has been closed.'))
+
+    def resolve(self, record):
+        '''
+        Converts a trace in scamper json format to the IP path and the hop delays.
+        Input:
+            a) record: The json object returned by scamper.
+        '''
+
+        if record.get('type') != 'trace' or not self.pending.get(record.get('dst')):
+            return
+        future = self.pending[record['dst']].popleft()
+        [route, mytime, _, _, _] = handle_json.handle_json().export_trace_from_scamper(record)
+        if not future.done():
+            future.set_result([route, mytime])
+
+    async def close(self):
+        '''
+        Detaches from the scamper control socket.
+        '''
+
+        if self.writer is not None:
+            self.writer.write(b'done\n')
+            self.writer.close()
+        if self.receiver is not None:
+            self.receiver.cancel()
+
+
+class probe_scheduler():
+    '''
+    Probes many destinations concurrently, with an event loop running in a background thread. The traces
+    are either sent to a long-lived scamper instance through its control socket or run as traceroute/scamper
+    subprocesses. The number of the traces in flight and the packets per second are limited.
+    '''
+
+    # An estimate of the packets sent per trace, i.e., 3 probes per hop for 16 hops.
+    packets_per_trace = 48
+
+    def __init__(self, selected_tool, arguments, config):
+        # self.selected_tool: 1 for scamper, 0 for traceroute.
+        self.selected_tool = selected_tool
+        self.arguments = arguments.strip()
+        self.tool = trace_tool.trace_tool()
+        # self.pps: The maximum packets per second.
+        self.pps = config.get('probe_pps', 5000)
+        # self.inflight: The maximum number of traces in flight.
+        self.inflight = max(1, config.get('probe_inflight', 200))
+        # self.control: The "host:port" of the scamper control socket, empty to run scamper subprocesses.
+        self.control = config.get('scamper_control', '')
+        # self.results: The probed destinations, consumed by the analysis.
+        self.results = queue.Queue(maxsize=4 * self.inflight)
+        self.use_sudo = False
+        self.error = None
+
+    def probe(self, destinations, ordered=False):
+        '''
+        Probes the given destinations.
+        Input:
+            a) destinations: A list or an iterator with the destination IPs or FQDNs.
+            b) ordered: True to return the results in the order of the destinations.
+        Output:
+            a) A generator of the [destination, IP path, hop delays] of each destination, as the probes complete.
+        '''
+
+        loop = asyncio.new_event_loop()
+        # Before Python 3.8, the subprocesses of a loop outside the main thread are watched from the main thread.
+        if sys.version_info < (3, 8):
+            asyncio.get_child_watcher().attach_loop(loop)
+        thread = threading.Thread(target=self.run_loop, args=(loop, destinations, ordered), daemon=True)
+        thread.start()
+
+        while True:
+            result = self.results.get()
+            if result is None:
+                break
+            yield result
+        thread.join()
+
+        if self.error is not None:
+            print('Error occured. Exiting.', self.error)
+            sys.exit(0)
+
+    def run_loop(self, loop, destinations, ordered):
+        '''
+        Runs the event loop of the probes in the background thread.
+        Input:
+            a) loop: The event loop.
+            b) destinations: The destination IPs or FQDNs.
+            c) ordered: True to return the results in the order of the destinations.
+        '''
+
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(self.run(destinations, ordered))
+        except Exception as e:
+            self.error = e
+        finally:
+            loop.close()
+            self.results.put(None)
+
+    async def run(self, destinations, ordered):
+        '''
+        Starts the probes as long as the limits allow it.
+        Input:
+            a) destinations: The destination IPs or FQDNs.
+            b) ordered: True to return the results in the order of the destinations.
+        '''
+
+        loop = asyncio.get_event_loop()
+        semaphore = asyncio.Semaphore(self.inflight)
+        bucket = token_bucket(self.pps, self.packets_per_trace)
+        completed = asyncio.Queue(maxsize=self.inflight)
+        forwarder = asyncio.ensure_future(self.forward(completed, ordered))
+
+        session = None
+        if self.selected_tool and self.control:
+            session = scamper_session(self.control, self.arguments)
+            await session.connect()
+
+        tasks = set()
+        try:
+            for index, destination in enumerate(destinations):
+                await semaphore.acquire()
+                if self.error is not None:
+                    break
+                await bucket.consume(self.packets_per_trace)
+                task = asyncio.ensure_future(self.probe_destination(index, destination, session, semaphore, completed))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.wait(tasks)
+        finally:
+            if session is not None:
+                await session.close()
+        await completed.put(None)
+        await forwarder
+
+    async def probe_destination(self, index, destination, session, semaphore, completed):
+        '''
+        Probes a destination.
+        Input:
+            a) index: The position of the destination in the input.
+            b) destination: The destination IP or FQDN.
+            c) session: The scamper_session instance, None to run subprocesses.
+            d) semaphore: The semaphore of the traces in flight.
+            e) completed: The queue of the completed probes.
+        '''
+
+        try:
+            dst_ip = destination.replace(' ', '')
+            IP_name = await self.resolve(dst_ip)
+            if IP_name is None:
+                print('--> ' + dst_ip + ' has wrong address format. Expected an IPv4 format or a valid url.')
+                [route, mytime] = [[], []]
+            elif session is not None:
+                [route, mytime] = await session.trace(IP_name)
+            else:
+                [route, mytime] = await self.run_tool(IP_name)
+
+            if IP_name is not None and not len(route):
+                if self.selected_tool:
+                    print('--> Scamper returned an empty IP path for ' + dst_ip + '.')
+                else:
+                    print('--> Traceroute returned an empty IP path for ' + dst_ip + '.')
+            await completed.put([index, [dst_ip, route, mytime]])
+        except Exception as e:
+            self.error = e
+        finally:
+            semaphore.release()
+
+    async def resolve(self, IP_name):
+        '''
+        Resolves a domain name given as destination instead of an IP address.
+        Input:
+            a) IP_name: The destination IP or FQDN.
+        Output:
+            a) The IP address, None if it cannot be resolved.
+        '''
+
+        try:
+            socket.inet_aton(IP_name)
+            return IP_name
+        except (OSError, ValueError):
+            pass
+        try:
+            addresses = await asyncio.get_event_loop().getaddrinfo(IP_name, None, family=socket.AF_INET)
+            return addresses[0][4][0]
+        except (OSError, UnicodeError, IndexError):
+            return None
+
+    async def run_tool(self, IP_name):
+        '''
+        Probes an IP with a traceroute or scamper subprocess.
+        Input:
+            a) IP_name: The IP to probe.
+        Output:
+            a) route: The IP path list.
+            b) mytime: The list with the hop delays.
+        '''
+
+        if self.selected_tool:
+            [name, command] = ['Scamper', self.tool.scamper_command(IP_name, self.arguments)]
+        else:
+            [name, command] = ['Traceroute', self.tool.traceroute_command(IP_name, self.arguments)]
+
+        whole = None
+        if not self.use_sudo:
+            whole = await self.run_command(command)
+            if whole is None and not self.use_sudo:
+                print(name + ' failed. Trying to run with sudo..')
+                self.use_sudo = True
+        if whole is None:
+            whole = await self.run_command(['sudo'] + command)
+        if whole is None:
+            raise RuntimeError(name + ' failed for ' + IP_name + '.')
+
+        if self.selected_tool:
+            return self.tool.parse_scamper(whole)
+        return self.tool.parse_traceroute(whole)
+
+    async def run_command(self, command):
+        '''
+        Runs a probing command.
+        Input:
+            a) command: The list with the command line arguments.
+        Output:
+            a) The output of the command, None if it failed.
+        '''
+
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+            output, _ = await process.communicate()
+        except OSError:
+            return None
+        if process.returncode:
+            return None
+        return output.decode('utf-8')
+
+    async def forward(self, completed, ordered):
+        '''
+        Passes the completed probes to the analysis.
+        Input:
+            a) completed: The queue of the completed probes.
+            b) ordered: True to pass the probes in the order of the destinations.
+        '''
+
+        buffered = {}
+        next_index = 0
+        while True:
+            item = await completed.get()
+            if item is None:
+                break
+            [index, result] = item
+            if not ordered:
+                await self.put(result)
+                continue
+            buffered[index] = result
+            while next_index in buffered:
+                await self.put(buffered.pop(next_index))
+                next_index += 1
+        # Passes the rest, if a probe has failed.
+        for index in sorted(buffered):
+            await self.put(buffered[index])
+
+    async def put(self, result):
+        '''
+        Waits until the analysis has room for one more result, without blocking the event loop.
+        Input:
+            a) result: The [destination, IP path, hop delays] of a destination.
+        '''
+
+        while True:
+            try:
+                self.results.put_nowait(result)
+                return
+            except queue.Full:
+                await asyncio.sleep(0.05)
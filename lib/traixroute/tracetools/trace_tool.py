@@ -19,146 +19,72 @@
 # You should have received a copy of the GNU General Public License
 # along with traIXroute.  If not, see <http://www.gnu.org/licenses/>.
 
-from traixroute.controller import string_handler
-import subprocess
-import socket
-import sys
-import os
+from traixroute.handler import handle_json
+import ujson
 
 
 class trace_tool():
     '''
-    The module is responsible for probing using either traceroute or scamper mechanism.
+    The module builds the traceroute and scamper command lines and parses their output. The probes are run by the
+    probe scheduler.
     '''
 
-    def trace_call(self, IP_name, classic, arguments):
+    def scamper_command(self, IP_name, arguments):
         '''
-        Calls scamper and extracting the route from the text file. 
-        Input: 
+        Returns the scamper command line to probe an IP.
+        Input:
             a) IP_name: The IP to probe.
-            b) classic: Flag to enable scamper or traceroute.
-            c) arguments: The arguments of the selected tool.
-        Output: 
-            a) route: The IP path list.
-            b) mytime: The list with the hop delays.
+            b) arguments: The scamper arguments.
+        Output:
+            a) The list with the command line arguments.
         '''
 
-        # A domain name has been given as destination to send the probe instead
-        # of an IP address.
-        string_handle = string_handler.string_handler()
-        arguments = arguments.strip()
-        if not string_handle.is_valid_ip_address(IP_name, 'IP', 'CommandLine'):
-            try:
-                IP_name = socket.gethostbyname(IP_name)
-            except:
-                print('--> ' + IP_name +
-                      ' has wrong address format. Expected an IPv4 format or a valid url.')
-                return [], []
-
-        if classic:
-            [route, mytime] = self.scamper_call(IP_name, arguments)
-            if not len(route):
-                print('--> Scamper returned an empty IP path. You may use "sudo" in the beginning or the scamper arguments might be wrong.')
-        elif not classic:
-            [route, mytime] = self.traceroute_call(IP_name, arguments)
-            if not len(route):
-                print(
-                    '--> Traceroute returned an empty IP path. You may use "sudo" in the beginning.')
-
-        return [route, mytime]
+        if arguments == '':
+            return str('scamper -O json -i ' + IP_name).split(" ")
+        return ['scamper', '-O', 'json', '-I', 'trace ' + arguments + ' ' + IP_name]
 
-    def scamper_call(self, IP_name, arguments):
+    def parse_scamper(self, whole):
         '''
-        Calls Scamper with the proper arguments and returns the hop delays in ms.
+        Extracts the route from the scamper output in json format.
         Input:
-            a) IP_name: The IP to probe.
-            b) arguments: The scamper arguments. 
-        Output: 
+            a) whole: The scamper output.
+        Output:
             a) route: The IP path list.
             b) mytime: The list with the hop delays.
         '''
 
-        if arguments == '':
-            try:
-                whole = subprocess.check_output(
-                    str('scamper -i ' + IP_name).split(" "), shell=False)
-            except:
-                try:
-                    print('Scamper failed. Trying to run with sudo..')
-                    whole = subprocess.check_output(
-                        str('sudo scamper -i ' + IP_name).split(" "), shell=False)
-                except Exception as e:
-                    print('Error occured. Exiting.', e)
-                    sys.exit(0)
-        else:
-            arguments = 'trace ' + arguments + ' ' + IP_name
-            try:
-                whole = subprocess.check_output(
-                    ['scamper', '-I', arguments], shell=False)
-            except:
-                try:
-                    print('Scamper failed. Trying to run with sudo..')
-                    whole = subprocess.check_output(
-                        ['sudo', 'scamper', '-I', arguments], shell=False)
-                except Exception as e:
-                    print('Error occured. Exiting.', e)
-                    sys.exit(0)
+        for line in whole.split('\n'):
+            if line.strip():
+                trace = ujson.loads(line)
+                if trace.get('type') == 'trace':
+                    [route, mytime, _, _, _] = handle_json.handle_json().export_trace_from_scamper(trace)
+                    return [route, mytime]
+        return [[], []]
 
-        whole = whole.decode('utf-8')
-        splitted = whole.split('\n')
-        rows = len(splitted) - 2
-        route = [0 for x in range(0, rows)]
-        mytime = ['-' for x in range(0, rows)]
+    def traceroute_command(self, IP_name, arguments):
+        '''
+        Returns the traceroute command line to probe an IP.
+        Input:
+            a) IP_name: The IP to probe.
+            b) arguments: The traceroute arguments.
+        Output:
+            a) The list with the command line arguments.
+        '''
 
-        for i in range(1, rows + 1):
-            pos = 0
-            temp = splitted[i].split(' ')
-            while temp[pos] == '':
-                pos = pos + 1
-            if i:
-                route[i - 1] = temp[pos + 2]
-                if len(temp) > pos + 4:
-                    mytime[i - 1] = temp[pos + 4] + ' ' + temp[pos + 5]
-            i = i + 1
-        return [route, mytime]
+        if arguments != '':
+            return str('traceroute ' + IP_name + ' ' + arguments).split(" ")
+        return str('traceroute ' + IP_name).split(" ")
 
-    def traceroute_call(self, IP_name, arguments):
+    def parse_traceroute(self, whole):
         '''
-        Calls traceroute with the proper arguments and returns the hop delays in ms.
+        Extracts the route from the traceroute text output.
         Input:
-            a) IP_name: The IP to probe.
-            b) arguments: The traceroute arguments. 
-        Output: 
+            a) whole: The traceroute output.
+        Output:
             a) route: The IP path list.
             b) mytime: The list with the hop delays.
         '''
 
-        if arguments != '':
-            try:
-                whole = subprocess.check_output(
-                    str('traceroute ' + IP_name + ' ' + arguments).split(" "), shell=False)
-            except:
-                try:
-                    print('Traceroute failed. Trying to run with sudo..')
-                    whole = subprocess.check_output(
-                        str('sudo traceroute ' + IP_name + ' ' + arguments).split(" "), shell=False)
-                except Exception as e:
-                    print('Error occured. Exiting.', e)
-                    sys.exit(0)
-        else:
-            try:
-                whole = subprocess.check_output(
-                    str('traceroute ' + IP_name).split(" "), shell=False)
-            except:
-                try:
-                    print('Traceroute failed. Trying to run with sudo..')
-                    whole = subprocess.check_output(
-                        str('sudo traceroute ' + IP_name).split(" "), shell=False)
-                except Exception as e:
-                    print('Error occured. Exiting.', e)
-                    sys.exit(0)
-
-        whole = whole.decode('utf-8')
         splitted = whole.split("\n")
         rows = len(splitted) - 2
         route = [0 for x in range(0, rows)]